@@ -1,26 +1,59 @@
+import logging
+
 import uvicorn
-from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.events import QueueManager
 
-from a2a.server.tasks import InMemoryTaskStore
+from a2a.server.tasks import InMemoryPushNotificationConfigStore, TaskStore
 from a2a.types import (
     AgentCapabilities,
     AgentCard,
 )
 
+from server.a2a2.agent_execution.admission import AdmissionController
 from server.a2a2.agent_execution.runtime_agent_executor import RuntimeAgentExecutor
+from server.a2a2.apps.jsonrpc.drain import GracefulServer
 from server.a2a2.apps.jsonrpc.runtime_fastapi_app import RuntimeA2AFastAPIApplication
+from server.a2a2.request_handlers.runtime_request_handler import RuntimeRequestHandler
+from server.background.base import JobStore
+from server.background.memory import LocalJobStore
+from server.background.scheduler import BackgroundScheduler
 from server.common.model import AgentConfig
 from server.conf import settings
+from server.config_store.api import APIAgentConfigStore
 from server.config_store.base import AgentConfigStore
 from server.config_store.default import DefaultAgentConfigStore
-from server.libs.redis.client import RedisConfig
+from server.dedup.base import DedupStore
+from server.dedup.deduplicator import MessageDeduplicator
+from server.dedup.memory import LocalDedupStore
+from server.libs.redis.client import RedisConfig, get_redis_client
 from server.loader.base import AgentLoader
 from server.loader.default import DefaultAgentLoader
+from server.memoize.memoizer import Memoizer
 from server.notifier.base import Notifier
 from server.notifier.redis import RedisNotifier
+from server.notifier.redis_stream import RedisStreamNotifier
+from server.push.base import PushRetryQueue
+from server.push.dispatcher import PushDispatcher
+from server.push.memory import LocalRetryQueue
+from server.rate_limiter.base import RateLimiter
+from server.rate_limiter.memory import LocalRateLimiter
+from server.task_store.memory import BoundedInMemoryTaskStore
+
+logger = logging.getLogger(__name__)
 
 
 def init_agent_config_store() -> AgentConfigStore:
+    if settings.CONFIG_API_URL:
+        return APIAgentConfigStore(
+            settings.CONFIG_API_URL,
+            config_json_path=settings.CONFIG_API_JSON_PATH,
+            timeout=settings.CONFIG_API_TIMEOUT,
+            version_json_path=settings.CONFIG_API_VERSION_JSON_PATH,
+            incremental=settings.CONFIG_API_INCREMENTAL,
+            item_url=settings.CONFIG_API_ITEM_URL,
+            negative_ttl=settings.CONFIG_API_NEGATIVE_TTL_SECONDS,
+            retry_interval=settings.CONFIG_API_RETRY_INTERVAL_SECONDS,
+        )
     # todo 后续改为从配置中加载
     helloworld_agent_card = AgentCard(
         name='Hello World Agent',
@@ -77,15 +110,167 @@ def init_agent_config_store() -> AgentConfigStore:
     return DefaultAgentConfigStore(agent_configs=[hello_agent_config, weather_agent_config, travel_agent_config])
 
 
-def init_agent_loader() -> AgentLoader:
-    # todo 后续改为从配置中加载
-    return DefaultAgentLoader()
+def init_agent_loader(agent_config_store: AgentConfigStore | None = None) -> AgentLoader:
+    agent_loader = DefaultAgentLoader(
+        max_size=settings.AGENT_EXECUTOR_CACHE_SIZE,
+        idle_seconds=settings.AGENT_EXECUTOR_IDLE_SECONDS,
+    )
+    if agent_config_store is None:
+        return agent_loader
+    # AGENT_PREWARM 在启动时（lifespan）加载完agent config 后处理
+    agent_config_store.add_listener(agent_loader.retain)
+    return agent_loader
+
+
+def init_task_store() -> TaskStore:
+    if settings.TASK_STORE_TYPE == 'database':
+        from server.libs.database.engine import DatabaseConfig, get_async_engine
+        from server.task_store.database import WriteBehindDatabaseTaskStore
+
+        return WriteBehindDatabaseTaskStore(
+            get_async_engine(DatabaseConfig.from_settings()),
+            table_name=settings.TASK_STORE_TABLE,
+            flush_interval=settings.TASK_STORE_FLUSH_INTERVAL_SECONDS,
+            flush_batch_size=settings.TASK_STORE_FLUSH_BATCH_SIZE,
+        )
+    if settings.TASK_STORE_TYPE == 'redis':
+        from server.task_store.redis import RedisTaskStore
+
+        return RedisTaskStore(
+            get_redis_client(RedisConfig.from_settings()),
+            key_prefix=settings.REDIS_KEY_PREFIX,
+            terminal_ttl=settings.TASK_STORE_TERMINAL_TTL_SECONDS,
+        )
+    return BoundedInMemoryTaskStore(
+        max_tasks=settings.TASK_STORE_MAX_TASKS,
+        max_bytes=settings.TASK_STORE_MAX_BYTES,
+        terminal_ttl=settings.TASK_STORE_TERMINAL_TTL_SECONDS,
+        ttl=settings.TASK_STORE_TTL_SECONDS,
+        max_history=settings.TASK_STORE_MAX_HISTORY,
+        spill_dir=settings.TASK_STORE_SPILL_DIR,
+    )
+
+
+def init_queue_manager() -> QueueManager | None:
+    if settings.QUEUE_MANAGER_TYPE == 'redis':
+        from server.queue_manager.redis import RedisStreamQueueManager
+
+        return RedisStreamQueueManager(
+            get_redis_client(RedisConfig.from_settings()),
+            key_prefix=settings.REDIS_KEY_PREFIX,
+            stream_maxlen=settings.QUEUE_STREAM_MAXLEN,
+            stream_ttl=settings.QUEUE_STREAM_TTL_SECONDS,
+        )
+    # 默认使用 InMemoryQueueManager
+    return None
+
+
+def init_rate_limiter() -> RateLimiter:
+    if settings.RATE_LIMITER_TYPE == 'redis':
+        from server.rate_limiter.redis import RedisRateLimiter
+
+        return RedisRateLimiter(
+            get_redis_client(RedisConfig.from_settings()),
+            key_prefix=settings.REDIS_KEY_PREFIX,
+            prefetch=settings.RATE_LIMIT_PREFETCH,
+            prefetch_ttl=settings.RATE_LIMIT_PREFETCH_TTL_SECONDS,
+        )
+    return LocalRateLimiter()
+
+
+def init_dedup_store() -> DedupStore:
+    if settings.MESSAGE_DEDUP_TYPE == 'redis':
+        from server.dedup.redis import RedisDedupStore
+
+        return RedisDedupStore(get_redis_client(RedisConfig.from_settings()), key_prefix=settings.REDIS_KEY_PREFIX)
+    return LocalDedupStore(settings.MESSAGE_DEDUP_MAX_SIZE)
+
+
+def init_deduplicator() -> MessageDeduplicator | None:
+    if not settings.MESSAGE_DEDUP_TYPE:
+        return None
+    return MessageDeduplicator(
+        init_dedup_store(),
+        ttl=settings.MESSAGE_DEDUP_TTL_SECONDS,
+        pending_ttl=settings.MESSAGE_DEDUP_PENDING_TTL_SECONDS,
+    )
+
+
+def init_memoizer() -> Memoizer:
+    if settings.MEMOIZE_CACHE_TYPE == 'redis':
+        from server.memoize.redis import RedisResultCache
+
+        return Memoizer(shared=RedisResultCache(
+            get_redis_client(RedisConfig.from_settings()), key_prefix=settings.REDIS_KEY_PREFIX,
+        ))
+    return Memoizer()
+
+
+def init_background_job_store() -> JobStore:
+    if settings.BACKGROUND_JOB_STORE_TYPE == 'redis':
+        from server.background.redis import RedisJobStore
+
+        if not settings.BACKGROUND_JOB_OWNER:
+            raise ValueError('BACKGROUND_JOB_OWNER is required when BACKGROUND_JOB_STORE_TYPE is redis')
+        return RedisJobStore(
+            get_redis_client(RedisConfig.from_settings()),
+            owner=settings.BACKGROUND_JOB_OWNER,
+            key_prefix=settings.REDIS_KEY_PREFIX,
+        )
+    if not settings.BACKGROUND_JOB_STORE_PATH:
+        logger.warning('BACKGROUND_JOB_STORE_PATH is not set, background jobs will be lost on restart')
+    return LocalJobStore(settings.BACKGROUND_JOB_STORE_PATH)
+
+
+def init_background_scheduler() -> BackgroundScheduler | None:
+    if not settings.BACKGROUND_JOB_STORE_TYPE:
+        return None
+    return BackgroundScheduler(
+        init_background_job_store(),
+        workers=settings.BACKGROUND_WORKERS,
+        max_queued=settings.BACKGROUND_MAX_QUEUED,
+        max_attempts=settings.BACKGROUND_MAX_ATTEMPTS,
+    )
+
+
+def init_push_retry_queue() -> PushRetryQueue:
+    if settings.PUSH_RETRY_QUEUE_TYPE == 'redis':
+        from server.push.redis import RedisRetryQueue
+
+        return RedisRetryQueue(
+            get_redis_client(RedisConfig.from_settings()), key_prefix=settings.REDIS_KEY_PREFIX,
+        )
+    return LocalRetryQueue(settings.PUSH_RETRY_QUEUE_PATH)
+
+
+def init_push_dispatcher() -> PushDispatcher | None:
+    if not settings.PUSH_NOTIFICATION_ENABLED:
+        return None
+    return PushDispatcher(
+        InMemoryPushNotificationConfigStore(),
+        init_push_retry_queue(),
+        workers=settings.PUSH_WORKERS,
+        max_pending=settings.PUSH_MAX_PENDING,
+        coalesce_window=settings.PUSH_COALESCE_SECONDS,
+        timeout=settings.PUSH_TIMEOUT_SECONDS,
+        max_connections_per_host=settings.PUSH_MAX_CONNECTIONS_PER_HOST,
+        max_attempts=settings.PUSH_MAX_ATTEMPTS,
+        allowed_hosts=settings.PUSH_ALLOWED_HOSTS,
+    )
 
 
 def init_notifier() -> Notifier | None:
     # todo 后续改为从配置中加载
     if settings.NOTIFIER_TYPE == 'redis':
         return RedisNotifier(RedisConfig.from_settings(), settings.NOTIFIED_REDIS_CHANNEL)
+    if settings.NOTIFIER_TYPE == 'redis_stream':
+        return RedisStreamNotifier(
+            RedisConfig.from_settings(),
+            settings.NOTIFIED_REDIS_CHANNEL or 'agent_config_updates',
+            consumer_name=settings.NOTIFIER_CONSUMER_NAME,
+            maxlen=settings.NOTIFIER_STREAM_MAXLEN,
+            offset_ttl=settings.NOTIFIER_OFFSET_TTL_SECONDS,
+        )
     return None
 
 
@@ -104,16 +289,24 @@ if __name__ == '__main__':
         supports_authenticated_extended_card=True,
     )
     agent_config_store = init_agent_config_store()
-    agent_loader = init_agent_loader()
+    agent_loader = init_agent_loader(agent_config_store)
     notifier = init_notifier()
-    # todo 有机会试下DatabaseTaskStore
-    # request_handler = RuntimeRequestHandler(
-    #     agent_executor=RuntimeAgentExecutor(agent_config_store, agent_loader),
-    #     task_store=InMemoryTaskStore(),
-    # )
-    request_handler = DefaultRequestHandler(
-        agent_executor=RuntimeAgentExecutor(agent_config_store, agent_loader),
-        task_store=InMemoryTaskStore(),
+    admission = AdmissionController(
+        default_limit=settings.AGENT_MAX_CONCURRENCY,
+        default_max_queue=settings.AGENT_MAX_QUEUE,
+        default_max_wait=settings.AGENT_MAX_WAIT_SECONDS,
+        namespace_limits=settings.NAMESPACE_MAX_CONCURRENCY,
+    )
+    push_dispatcher = init_push_dispatcher()
+    request_handler = RuntimeRequestHandler(
+        agent_executor=RuntimeAgentExecutor(agent_loader, admission, init_memoizer()),
+        task_store=init_task_store(),
+        queue_manager=init_queue_manager(),
+        push_config_store=push_dispatcher.config_store if push_dispatcher else None,
+        push_sender=push_dispatcher,
+        deduplicator=init_deduplicator(),
+        scheduler=init_background_scheduler(),
+        agent_config_store=agent_config_store,
     )
 
     server = RuntimeA2AFastAPIApplication(
@@ -121,6 +314,20 @@ if __name__ == '__main__':
         notifier=notifier,
         agent_card=public_agent_card,
         http_handler=request_handler,
+        admission=admission,
+        rate_limiter=init_rate_limiter(),
+        fast_json=settings.JSON_FAST_PATH,
+        metrics=settings.METRICS_ENABLED,
+        admin_token=settings.ADMIN_TOKEN,
+        loop_block_threshold=settings.LOOP_BLOCK_THRESHOLD_SECONDS,
+        drain_timeout=settings.SHUTDOWN_DRAIN_TIMEOUT_SECONDS,
+        readiness_delay=settings.SHUTDOWN_READINESS_DELAY_SECONDS,
     )
 
-    uvicorn.run(server.build(), host=settings.UVICORN_HOST, port=settings.UVICORN_PORT)
+    config = uvicorn.Config(
+        server.build(),
+        host=settings.UVICORN_HOST,
+        port=settings.UVICORN_PORT,
+        timeout_graceful_shutdown=settings.SHUTDOWN_GRACEFUL_TIMEOUT_SECONDS,
+    )
+    GracefulServer(config, server.drain).run()
@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import math
+import time
+
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
+
+from a2a.types import JSONRPCError
+from a2a.utils.errors import ServerError
+
+from server.common.model import AgentConfig
+
+logger = logging.getLogger(__name__)
+
+# JSON-RPC 服务端自定义错误码（-32000 ~ -32099），对应 HTTP 429
+OVERLOADED_ERROR_CODE = -32029
+
+
+class AdmissionRejected(ServerError):
+    def __init__(self, key: str, retry_after: int, reason: str) -> None:
+        error = JSONRPCError(
+            code=OVERLOADED_ERROR_CODE,
+            message=f'{key} is overloaded, {reason}',
+            data={'retry_after': retry_after},
+        )
+        super().__init__(error=error)
+        self.error: JSONRPCError = error
+        self.key = key
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimiter:
+    """并发上限 + 有界等待队列，队列满或等待超过 max_wait 时拒绝。"""
+
+    def __init__(self, key: str, limit: int, max_queue: int, max_wait: float) -> None:
+        self.key = key
+        self.limit = limit
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        self.timeouts = 0
+        # 执行耗时的指数移动平均，用于估算 Retry-After
+        self._avg_seconds = 1.0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    def full(self) -> bool:
+        return self._semaphore.locked() and self.waiting >= self.max_queue
+
+    def retry_after(self) -> int:
+        rounds = (self.waiting + 1) / self.limit
+        return min(60, max(1, math.ceil(self._avg_seconds * rounds)))
+
+    async def acquire(self) -> None:
+        if self.full():
+            self.rejected += 1
+            raise AdmissionRejected(self.key, self.retry_after(), 'wait queue is full')
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.max_wait or None)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            self.timeouts += 1
+            raise AdmissionRejected(self.key, self.retry_after(), f'waited more than {self.max_wait}s')
+        finally:
+            self.waiting -= 1
+        self.active += 1
+
+    def release(self, elapsed: float | None) -> None:
+        """elapsed 为 None 表示未执行（后续的limiter 拒绝），不计入耗时。"""
+        self.active -= 1
+        if elapsed is not None:
+            self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * elapsed
+        self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'limit': self.limit,
+            'active': self.active,
+            'waiting': self.waiting,
+            'rejected': self.rejected,
+            'timeouts': self.timeouts,
+        }
+
+
+class AdmissionController:
+    """按agent 和namespace 控制并发执行数。
+
+    agent 的上限由 AgentConfig.max_concurrency/max_queue/max_wait_seconds 配置，未配置时使用默认值；
+    namespace 的上限由 namespace_limits 配置。上限为 0 表示不限制。
+    """
+
+    def __init__(
+            self,
+            default_limit: int = 0,
+            default_max_queue: int = 100,
+            default_max_wait: float = 10,
+            namespace_limits: Dict[str, int] | None = None,
+    ) -> None:
+        self.default_limit = default_limit
+        self.default_max_queue = default_max_queue
+        self.default_max_wait = default_max_wait
+        self.namespace_limits = namespace_limits or {}
+        self._agents: Dict[str, ConcurrencyLimiter] = {}
+        self._namespaces: Dict[str, ConcurrencyLimiter] = {}
+
+    def _agent_limiter(self, agent_config: AgentConfig) -> ConcurrencyLimiter | None:
+        limit = agent_config.max_concurrency if agent_config.max_concurrency is not None else self.default_limit
+        max_queue = agent_config.max_queue if agent_config.max_queue is not None else self.default_max_queue
+        max_wait = agent_config.max_wait_seconds if agent_config.max_wait_seconds is not None \
+            else self.default_max_wait
+        key = agent_config.namespace_name
+        limiter = self._agents.get(key)
+        if not limit:
+            self._agents.pop(key, None)
+            return None
+        if limiter is None or (limiter.limit, limiter.max_queue, limiter.max_wait) != (limit, max_queue, max_wait):
+            # 配置变更后新建，执行中的请求仍释放到原limiter
+            limiter = ConcurrencyLimiter(key, limit, max_queue, max_wait)
+            self._agents[key] = limiter
+        return limiter
+
+    def _namespace_limiter(self, namespace: str) -> ConcurrencyLimiter | None:
+        limit = self.namespace_limits.get(namespace)
+        if not limit:
+            return None
+        limiter = self._namespaces.get(namespace)
+        if limiter is None:
+            limiter = ConcurrencyLimiter(namespace, limit, self.default_max_queue, self.default_max_wait)
+            self._namespaces[namespace] = limiter
+        return limiter
+
+    def check(self, agent_config: AgentConfig) -> AdmissionRejected | None:
+        """不排队的快速检查，等待队列已满时返回拒绝原因。"""
+        for limiter in (self._namespace_limiter(agent_config.namespace), self._agent_limiter(agent_config)):
+            if limiter is not None and limiter.full():
+                limiter.rejected += 1
+                return AdmissionRejected(limiter.key, limiter.retry_after(), 'wait queue is full')
+        return None
+
+    @asynccontextmanager
+    async def admit(self, agent_config: AgentConfig) -> AsyncIterator[None]:
+        acquired = []
+        try:
+            # 先占agent 的名额再占namespace 的名额，排在繁忙agent 后面的请求不占用namespace 的名额
+            for limiter in (self._agent_limiter(agent_config), self._namespace_limiter(agent_config.namespace)):
+                if limiter is not None:
+                    await limiter.acquire()
+                    acquired.append(limiter)
+        except BaseException:
+            for limiter in acquired:
+                limiter.release(None)
+            raise
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - start
+            for limiter in acquired:
+                limiter.release(elapsed)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            'agents': {key: limiter.stats() for key, limiter in self._agents.items()},
+            'namespaces': {key: limiter.stats() for key, limiter in self._namespaces.items()},
+        }
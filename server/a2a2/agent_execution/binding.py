@@ -0,0 +1,23 @@
+from a2a.server.context import ServerCallContext
+
+from server.common.model import AgentConfig
+
+AGENT_BINDING = 'agent_binding'
+
+
+class AgentBinding:
+    """请求所属的agent，由路由解析一次后经 ServerCallContext.state 传递到 RuntimeAgentExecutor。"""
+    __slots__ = ('agent_config',)
+
+    def __init__(self, agent_config: AgentConfig) -> None:
+        self.agent_config = agent_config
+
+    @property
+    def namespace_name(self) -> str:
+        return self.agent_config.namespace_name
+
+
+def get_binding(context: ServerCallContext | None) -> AgentBinding | None:
+    if context is None:
+        return None
+    return context.state.get(AGENT_BINDING)
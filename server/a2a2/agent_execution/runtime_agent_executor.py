@@ -1,47 +1,64 @@
-from typing import Tuple
+import functools
 
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events import EventQueue
 
-from server.common.model import X_AGENT_NAME, X_AGENT_NAMESPACE
-from server.config_store.base import AgentConfigStore
+from server.a2a2.agent_execution.admission import AdmissionController
+from server.a2a2.agent_execution.binding import get_binding
+from server.common.model import AgentConfig
 from server.loader.base import AgentLoader
+from server.memoize.memoizer import Memoizer
+from server.profiling.attribution import bind_agent
 
 
 class RuntimeAgentExecutor(AgentExecutor):
 
-    def __init__(self, agent_config_store: AgentConfigStore, agent_loader: AgentLoader):
-        self.agent_config_store = agent_config_store
+    def __init__(
+            self,
+            agent_loader: AgentLoader,
+            admission: AdmissionController | None = None,
+            memoizer: Memoizer | None = None,
+    ):
         self.agent_loader = agent_loader
+        self.admission = admission
+        self.memoizer = memoizer
 
     async def execute(
             self, context: RequestContext, event_queue: EventQueue
     ) -> None:
-        namespace, name = _get_agent(context)
-        agent_config = await self.agent_config_store.get(namespace, name)
-        if not agent_config:
-            raise Exception('agent config not found')
-        agent_executor = self.agent_loader.load_executor(agent_config)
-        await agent_executor.execute(context, event_queue)
+        agent_config = _get_agent_config(context)
+        # 执行在 DefaultRequestHandler 创建的后台task 中
+        bind_agent(agent_config.namespace_name)
+        if self.memoizer is not None and agent_config.memoization is not None:
+            # 命中时不占用并发配额，也不加载executor
+            await self.memoizer.execute(
+                agent_config, agent_config.memoization, context, event_queue,
+                functools.partial(self._execute, agent_config, context),
+            )
+            return
+        await self._execute(agent_config, context, event_queue)
+
+    async def _execute(self, agent_config: AgentConfig, context: RequestContext, event_queue: EventQueue) -> None:
+        if self.admission is None:
+            async with self.agent_loader.use(agent_config) as agent_executor:
+                await agent_executor.execute(context, event_queue)
+            return
+        async with self.admission.admit(agent_config), self.agent_loader.use(agent_config) as agent_executor:
+            await agent_executor.execute(context, event_queue)
 
     async def cancel(
             self, context: RequestContext, event_queue: EventQueue
     ) -> None:
-        namespace, name = _get_agent(context)
-        agent_config = await self.agent_config_store.get(namespace, name)
-        if not agent_config:
-            raise Exception('agent config not found')
-        agent_executor = self.agent_loader.load_executor(agent_config)
-        await agent_executor.cancel(context, event_queue)
+        agent_config = _get_agent_config(context)
+        bind_agent(agent_config.namespace_name)
+        async with self.agent_loader.use(agent_config) as agent_executor:
+            await agent_executor.cancel(context, event_queue)
 
 
-def _get_agent(context: RequestContext) -> Tuple[str, str]:
+def _get_agent_config(context: RequestContext) -> AgentConfig:
     if not context.call_context:
         raise Exception('context.call_context is none')
-    namespace = context.call_context.state["headers"].pop(X_AGENT_NAMESPACE)
-    if not namespace:
-        raise Exception(f'agent id not found in state {X_AGENT_NAMESPACE}')
-    name = context.call_context.state["headers"].pop(X_AGENT_NAME)
-    if not name:
-        raise Exception(f'agent id not found in state {X_AGENT_NAME}')
-    return namespace, name
+    binding = get_binding(context.call_context)
+    if binding is None:
+        raise Exception('agent binding not found in call context')
+    return binding.agent_config
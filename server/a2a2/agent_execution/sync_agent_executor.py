@@ -0,0 +1,150 @@
+import asyncio
+import functools
+import inspect
+import threading
+import weakref
+
+from abc import abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+from a2a.server.agent_execution import AgentExecutor, RequestContext
+from a2a.server.events import EventQueue
+
+from server.metrics.runtime import SYNC_EXECUTOR_CALLS
+
+
+class BlockingProxy:
+    """在worker 线程中调用事件循环上的异步对象，协程方法在循环中执行并阻塞等待结果。
+
+        updater = BlockingProxy(TaskUpdater(event_queue, context.task_id, context.context_id), loop)
+        updater.update_status(TaskState.working)
+    """
+
+    def __init__(self, target: Any, loop: asyncio.AbstractEventLoop) -> None:
+        self._target = target
+        self._loop = loop
+
+    @property
+    def target(self) -> Any:
+        return self._target
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def call(*args: Any, **kwargs: Any) -> Any:
+            result = attr(*args, **kwargs)
+            if inspect.isawaitable(result):
+                return asyncio.run_coroutine_threadsafe(_await(result), self._loop).result()
+            return result
+
+        return call
+
+
+async def _await(awaitable: Any) -> Any:
+    return await awaitable
+
+
+class SyncAgentExecutor(AgentExecutor):
+    """同步实现的agent 基类，execute_sync/cancel_sync 在该agent 独享的有界线程池中执行，不阻塞事件循环。
+
+    传入的 event_queue 为 BlockingProxy，enqueue_event 等调用会回到事件循环中执行；
+    需要 TaskUpdater 等其他异步对象时使用 self.blocking(obj)，如
+    self.blocking(TaskUpdater(event_queue.target, context.task_id, context.context_id))。
+    线程池大小由类属性 max_workers 指定。
+    """
+    max_workers: int = 4
+
+    def __init__(self, max_workers: int | None = None) -> None:
+        self.max_workers = max_workers or self.max_workers
+        self._pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix=type(self).__name__)
+        self._lock = threading.Lock()
+        self._active = 0
+        self._queued = 0
+        self._completed = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        _executors.add(self)
+
+    @abstractmethod
+    def execute_sync(self, context: RequestContext, event_queue: BlockingProxy) -> None:
+        pass
+
+    def cancel_sync(self, context: RequestContext, event_queue: BlockingProxy) -> None:
+        raise Exception('cancel not supported')
+
+    async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
+        await self._submit(self.execute_sync, context, event_queue)
+
+    async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
+        await self._submit(self.cancel_sync, context, event_queue)
+
+    def blocking(self, target: Any) -> BlockingProxy:
+        """仅在 execute_sync/cancel_sync 中调用。"""
+        if self._loop is None:
+            raise RuntimeError('blocking() must be called from execute_sync/cancel_sync')
+        return BlockingProxy(target, self._loop)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'active': self._active,
+                'queued': self._queued,
+                'completed': self._completed,
+            }
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _submit(
+            self,
+            fn: Callable[[RequestContext, BlockingProxy], None],
+            context: RequestContext,
+            event_queue: EventQueue,
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        with self._lock:
+            self._queued += 1
+        future = self._pool.submit(self._run, fn, context, BlockingProxy(event_queue, loop))
+        future.add_done_callback(self._on_done)
+        # 线程无法被中断，请求被取消后已开始的 execute_sync 会继续执行完，未开始的不再执行
+        await asyncio.wrap_future(future)
+
+    def _on_done(self, future: Future) -> None:
+        if future.cancelled():
+            # 排队期间被取消（请求取消或 close），_run 不会执行
+            with self._lock:
+                self._queued -= 1
+
+    def _run(self, fn: Callable[[RequestContext, BlockingProxy], None], context: RequestContext,
+             event_queue: BlockingProxy) -> None:
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+        try:
+            fn(context, event_queue)
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._completed += 1
+
+
+# 存活的 SyncAgentExecutor，供指标回调读取
+_executors: 'weakref.WeakSet[SyncAgentExecutor]' = weakref.WeakSet()
+
+
+def _samples() -> List[Any]:
+    counts: Dict[tuple, int] = {}
+    for executor in list(_executors):
+        stats = executor.stats()
+        name = type(executor).__name__
+        for state in ('active', 'queued'):
+            counts[(name, state)] = counts.get((name, state), 0) + stats[state]
+    return list(counts.items())
+
+
+SYNC_EXECUTOR_CALLS.set_callback(_samples)
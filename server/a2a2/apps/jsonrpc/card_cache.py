@@ -0,0 +1,116 @@
+import hashlib
+import logging
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Dict, Iterable
+
+from a2a.types import AgentCard
+
+from server.common.model import AgentConfig
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedCard:
+    card: AgentCard
+    body: bytes
+    etag: str
+
+
+@dataclass(frozen=True)
+class _CacheEntry:
+    # 以AgentConfig 对象本身作为版本标识，store 中替换了config 即视为失效
+    source: AgentConfig
+    card: CachedCard
+    extended_card: CachedCard | None
+    modified_card: CachedCard | None = None
+
+
+def serialize_card(card: AgentCard) -> CachedCard:
+    body = card.model_dump_json(exclude_none=True, by_alias=True).encode()
+    return CachedCard(card=card, body=body, etag=f'"{hashlib.sha1(body).hexdigest()}"')
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    # If-None-Match 使用弱比较，见 RFC 9110 13.1.2
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*' or candidate.removeprefix('W/') == etag:
+            return True
+    return False
+
+
+class AgentCardCache:
+    """agent card 预序列化缓存，避免每次GET 都做 pydantic 校验与序列化。
+
+    card_modifier 仅在声明为纯函数（pure_card_modifier=True）时缓存其结果。
+    """
+
+    def __init__(
+            self,
+            card_modifier: Callable[[AgentCard], AgentCard] | None = None,
+            pure_card_modifier: bool = False,
+    ) -> None:
+        self.card_modifier = card_modifier
+        self.pure_card_modifier = pure_card_modifier
+        self._entries: Dict[str, _CacheEntry] = {}
+
+    def put(self, agent_config: AgentConfig) -> None:
+        try:
+            self._entries[agent_config.namespace_name] = self._build(agent_config)
+        except Exception as e:
+            # 非法card 不影响其他agent，GET 时再暴露错误
+            self._entries.pop(agent_config.namespace_name, None)
+            logger.error(f'Failed to serialize agent card for {agent_config.namespace_name}: {str(e)}')
+
+    def put_all(self, agent_configs: Iterable[AgentConfig]) -> None:
+        self.clear()
+        for agent_config in agent_configs:
+            self.put(agent_config)
+
+    def invalidate(self, agent_config: AgentConfig) -> None:
+        self._entries.pop(agent_config.namespace_name, None)
+
+    def clear(self) -> None:
+        self._entries = {}
+
+    def get_card(self, agent_config: AgentConfig) -> CachedCard:
+        return self._get_entry(agent_config).card
+
+    def get_extended_card(self, agent_config: AgentConfig) -> CachedCard | None:
+        return self._get_entry(agent_config).extended_card
+
+    def get_modified_card(self, agent_config: AgentConfig) -> CachedCard:
+        if self.card_modifier is None:
+            return self.get_card(agent_config)
+        entry = self._get_entry(agent_config)
+        if entry.modified_card is not None:
+            return entry.modified_card
+        modified_card = serialize_card(self.card_modifier(entry.card.card))
+        if self.pure_card_modifier:
+            self._entries[agent_config.namespace_name] = _CacheEntry(
+                entry.source, entry.card, entry.extended_card, modified_card
+            )
+        return modified_card
+
+    def _get_entry(self, agent_config: AgentConfig) -> _CacheEntry:
+        entry = self._entries.get(agent_config.namespace_name)
+        if entry is None or entry.source is not agent_config:
+            entry = self._build(agent_config)
+            self._entries[agent_config.namespace_name] = entry
+        return entry
+
+    def _build(self, agent_config: AgentConfig) -> _CacheEntry:
+        card = serialize_card(agent_config.get_card())
+        extended_card = serialize_card(agent_config.get_extended_card()) if agent_config.extended_card else None
+        modified_card = None
+        if self.card_modifier and self.pure_card_modifier:
+            modified_card = serialize_card(self.card_modifier(card.card))
+        return _CacheEntry(agent_config, card, extended_card, modified_card)
+
+    def __len__(self) -> int:
+        return len(self._entries)
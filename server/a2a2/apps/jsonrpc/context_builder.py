@@ -0,0 +1,20 @@
+from a2a.server.apps import CallContextBuilder
+from a2a.server.apps.jsonrpc.jsonrpc_app import DefaultCallContextBuilder
+from a2a.server.context import ServerCallContext
+from starlette.requests import Request
+
+from server.a2a2.agent_execution.binding import AGENT_BINDING
+
+
+class RuntimeCallContextBuilder(CallContextBuilder):
+    """在 builder 构造的 ServerCallContext 中加入路由解析出的 AgentBinding（request.state.agent_binding）。"""
+
+    def __init__(self, builder: CallContextBuilder | None = None) -> None:
+        self.builder = builder or DefaultCallContextBuilder()
+
+    def build(self, request: Request) -> ServerCallContext:
+        context = self.builder.build(request)
+        binding = getattr(request.state, AGENT_BINDING, None)
+        if binding is not None:
+            context.state[AGENT_BINDING] = binding
+        return context
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import socket
+
+from types import FrameType
+from typing import Awaitable, Callable, Collection
+
+import uvicorn
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# JSON-RPC 服务端自定义错误码，对应 HTTP 503，客户端应重试到其他副本
+DRAINING_ERROR_CODE = -32031
+
+
+class Inflight:
+    """在途的HTTP 请求数，SSE 等流式响应到发送完毕为止。"""
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    async def wait_idle(self, timeout: float) -> bool:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self.count and loop.time() < deadline:
+            await asyncio.sleep(0.05)
+        return not self.count
+
+
+class InflightMiddleware:
+    """统计在途请求的ASGI 中间件，不包装响应体，对流式响应没有额外开销。"""
+
+    def __init__(self, app: ASGIApp, inflight: Inflight, exclude: Collection[str] = ()) -> None:
+        self.app = app
+        self.inflight = inflight
+        self.exclude = frozenset(exclude)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or scope['path'] in self.exclude:
+            await self.app(scope, receive, send)
+            return
+        self.inflight.count += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.inflight.count -= 1
+
+
+class GracefulServer(uvicorn.Server):
+    """收到 SIGTERM/SIGINT 后先执行 drain（期间继续服务，/readyz 返回503），完成后再按uvicorn 的流程退出。
+
+    drain 期间再次收到信号时立即进入uvicorn 的退出流程。
+    """
+
+    def __init__(self, config: uvicorn.Config, drain: Callable[[], Awaitable[None]]) -> None:
+        super().__init__(config)
+        self.drain = drain
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._drain_requested = False
+        self._drain_task: asyncio.Task | None = None
+
+    async def startup(self, sockets: list[socket.socket] | None = None) -> None:
+        self._loop = asyncio.get_running_loop()
+        await super().startup(sockets)
+
+    def handle_exit(self, sig: int, frame: FrameType | None) -> None:
+        if self._loop is None or self._drain_requested or self.should_exit:
+            super().handle_exit(sig, frame)
+            return
+        self._drain_requested = True
+        logger.info(f'received signal {sig}, start draining')
+        # 信号处理函数可能在事件循环内部的任意位置被调用，由事件循环调度
+        self._loop.call_soon_threadsafe(self._start_drain, sig, frame)
+
+    def _start_drain(self, sig: int, frame: FrameType | None) -> None:
+        self._drain_task = asyncio.create_task(self._drain_and_exit(sig, frame))
+
+    async def _drain_and_exit(self, sig: int, frame: FrameType | None) -> None:
+        try:
+            await self.drain()
+        except Exception:
+            logger.exception('drain failed')
+        super().handle_exit(sig, frame)
@@ -0,0 +1,47 @@
+"""JSON-RPC 响应及SSE 事件的快速序列化。
+
+pydantic 模型（包括JSON-RPC 信封）直接由 pydantic-core 一次序列化为bytes，不经过 model_dump 生成的中间dict
+及 json.dumps；SSE 帧使用预先编码的常量拼接。orjson 可用时用于请求体解析及普通dict 的序列化。
+"""
+import json
+
+from typing import Any
+
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+_SSE_PREFIX = b'data: '
+_SSE_SUFFIX = b'\r\n\r\n'
+
+
+def dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def loads(data: bytes | str) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def model_bytes(model: BaseModel) -> bytes:
+    return model.__pydantic_serializer__.to_json(model, exclude_none=True)
+
+
+def sse_event(data: bytes) -> bytes:
+    # JSON 中的换行均已转义，可以直接作为单行 data
+    return _SSE_PREFIX + data + _SSE_SUFFIX
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
@@ -0,0 +1,75 @@
+import asyncio
+import hmac
+import logging
+
+from fastapi import FastAPI, Query
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+from server.profiling.memory import tracemalloc_diff
+from server.profiling.sampler import StackSampler
+
+logger = logging.getLogger(__name__)
+
+_COLLAPSED_MEDIA_TYPE = 'text/plain; charset=utf-8'
+
+
+class ProfilingAdmin:
+    """运行中的进程按需采集CPU/内存profile，返回可直接生成火焰图的折叠栈。
+
+    需要携带 Authorization: Bearer <token>，同一时刻只允许一个profile。
+    """
+
+    def __init__(self, token: str, max_seconds: float = 60) -> None:
+        self.token = token
+        self.max_seconds = max_seconds
+        self._lock = asyncio.Lock()
+
+    def add_routes_to_app(self, app: FastAPI, prefix: str = '/admin/profile') -> None:
+        app.get(f'{prefix}/cpu')(self.profile_cpu)
+        app.get(f'{prefix}/memory')(self.profile_memory)
+
+    async def profile_cpu(
+            self,
+            request: Request,
+            seconds: float = Query(10, gt=0),
+            interval: float = Query(0.005, ge=0.001, le=1),
+    ) -> Response:
+        """采样事件循环线程的调用栈，以agent 为根节点，(idle) 为循环空闲的样本数。"""
+        if (rejected := self._check(request, seconds)) is not None:
+            return rejected
+        async with self._lock:
+            logger.info(f'start cpu profile for {seconds}s')
+            sampler = StackSampler(asyncio.get_running_loop(), interval)
+            sampler.start()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                await asyncio.to_thread(sampler.stop)
+        return Response(sampler.collapsed(), media_type=_COLLAPSED_MEDIA_TYPE,
+                        headers={'X-Profile-Samples': str(sampler.samples)})
+
+    async def profile_memory(
+            self,
+            request: Request,
+            seconds: float = Query(10, gt=0),
+            frames: int = Query(25, ge=1, le=100),
+            limit: int = Query(200, ge=1),
+    ) -> Response:
+        """对比间隔 seconds 的两次 tracemalloc 快照，权重为新增的字节数。"""
+        if (rejected := self._check(request, seconds)) is not None:
+            return rejected
+        async with self._lock:
+            logger.info(f'start memory profile for {seconds}s')
+            collapsed = await tracemalloc_diff(seconds, frames, limit)
+        return Response(collapsed, media_type=_COLLAPSED_MEDIA_TYPE)
+
+    def _check(self, request: Request, seconds: float) -> Response | None:
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() != 'bearer' or not hmac.compare_digest(token.encode(), self.token.encode()):
+            return JSONResponse({'error': 'Unauthorized'}, status_code=401)
+        if seconds > self.max_seconds:
+            return JSONResponse({'error': f'seconds must be <= {self.max_seconds}'}, status_code=400)
+        if self._lock.locked():
+            return JSONResponse({'error': 'Another profile is running'}, status_code=409)
+        return None
@@ -1,16 +1,28 @@
 import asyncio
+import base64
+import hashlib
 import logging
+import math
+import time
+import uuid
 
-from collections.abc import Callable
+from collections.abc import AsyncGenerator, Callable
 from contextlib import asynccontextmanager
-from typing import Any, AsyncIterator
+from enum import Enum
+from typing import Any, AsyncIterator, Iterable, List, Tuple, get_args
 
+from a2a.extensions.common import HTTP_EXTENSION_HEADER
 from a2a.server.apps import CallContextBuilder, JSONRPCApplication
 from a2a.server.context import ServerCallContext
 from a2a.server.request_handlers.request_handler import RequestHandler
 from a2a.types import (
+    A2AError,
     A2ARequest,
     AgentCard,
+    JSONRPCError,
+    JSONRPCErrorResponse,
+    JSONRPCResponse,
+    SendStreamingMessageResponse,
 )
 from a2a.utils.constants import (
     AGENT_CARD_WELL_KNOWN_PATH,
@@ -20,18 +32,52 @@ from a2a.utils.constants import (
 )
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
-from fastapi import FastAPI
+from fastapi import FastAPI, Query
+from sse_starlette.sse import EventSourceResponse
 from starlette.requests import Request
-from starlette.responses import JSONResponse, Response
+from starlette.responses import JSONResponse, Response, StreamingResponse
 
-from server.common.model import X_AGENT_NAME, X_AGENT_NAMESPACE
+from server.a2a2.agent_execution.admission import AdmissionController
+from server.a2a2.agent_execution.binding import AGENT_BINDING, AgentBinding
+from server.a2a2.apps.jsonrpc import fast_json
+from server.a2a2.apps.jsonrpc.card_cache import AgentCardCache, CachedCard, etag_matches, serialize_card
+from server.a2a2.apps.jsonrpc.context_builder import RuntimeCallContextBuilder
+from server.a2a2.apps.jsonrpc.drain import DRAINING_ERROR_CODE, Inflight, InflightMiddleware
+from server.a2a2.apps.jsonrpc.profiling_admin import ProfilingAdmin
+from server.common.model import AgentConfig, SyncOperation, namespace_name
 from server.conf import settings
 from server.config_store.base import AgentConfigStore
-from server.notifier.base import Notifier
+from server.loader.base import AgentLoader
+from server.metrics import runtime as runtime_metrics
+from server.metrics.registry import REGISTRY
+from server.metrics.runtime import CURRENT_REQUEST, RequestTimer
+from server.notifier.base import Notifier, NotifierResyncRequired
+from server.profiling.attribution import bind_agent
+from server.profiling.loop_monitor import LoopMonitor
+from server.push.dispatcher import PushDispatcher
+from server.queue_manager.redis import RedisStreamQueueManager
+from server.rate_limiter.base import RATE_LIMITED_ERROR_CODE, RateLimiter
+from server.utils.backoff import Backoff
 
 logger = logging.getLogger(__name__)
 
 
+_STREAM_CHUNK_SIZE = 64 * 1024
+# 需要准入控制的JSON-RPC 方法
+_ADMISSION_METHODS = ('message/send', 'message/stream')
+# 作为指标label 的JSON-RPC 方法，其他值记为 unknown
+_METHODS = frozenset(
+    request_type.model_fields['method'].default
+    for request_type in get_args(A2ARequest.model_fields['root'].annotation)
+)
+
+
+class AgentListView(str, Enum):
+    FULL = 'full'
+    # 仅返回 namespace/name，不含card
+    SUMMARY = 'summary'
+
+
 class RuntimeA2AFastAPIApplication(JSONRPCApplication):
     def __init__(
             self,
@@ -43,12 +89,41 @@ class RuntimeA2AFastAPIApplication(JSONRPCApplication):
             context_builder: CallContextBuilder | None = None,
             card_modifier: Callable[[AgentCard], AgentCard] | None = None,
             extended_card_modifier: Callable[[AgentCard, ServerCallContext], AgentCard] | None = None,
+            pure_card_modifier: bool = False,
+            admission: AdmissionController | None = None,
+            rate_limiter: RateLimiter | None = None,
+            fast_json: bool = False,
+            metrics: bool = True,
+            admin_token: str | None = None,
+            loop_block_threshold: float = 0,
+            drain_timeout: float = 20,
+            readiness_delay: float = 0,
     ) -> None:
         super().__init__(
-            agent_card, http_handler, extended_agent_card, context_builder, card_modifier, extended_card_modifier
+            agent_card, http_handler, extended_agent_card, RuntimeCallContextBuilder(context_builder),
+            card_modifier, extended_card_modifier,
         )
         self.agent_config_store = agent_config_store
         self.notifier = notifier
+        # card_modifier 为纯函数时，其结果也可以缓存
+        self.card_cache = AgentCardCache(card_modifier, pure_card_modifier)
+        self._list_epoch = uuid.uuid4().hex[:8]
+        self.admission = admission
+        self.rate_limiter = rate_limiter
+        self.fast_json = fast_json
+        self.metrics = metrics
+        if metrics:
+            self._register_metrics()
+        # 未配置token 时不开放profile 端点
+        self.profiling_admin = ProfilingAdmin(admin_token, settings.PROFILE_MAX_SECONDS) if admin_token else None
+        self.loop_block_threshold = loop_block_threshold
+        # drain 时先只让 /readyz 返回503，等待 readiness_delay 使负载均衡摘除本副本后再拒绝新的执行请求
+        self.drain_timeout = drain_timeout
+        self.readiness_delay = readiness_delay
+        self.ready = True
+        self.draining = False
+        self.inflight = Inflight()
+        self._drain_task: asyncio.Task | None = None
 
     def add_routes_to_app(
             self,
@@ -59,6 +134,13 @@ class RuntimeA2AFastAPIApplication(JSONRPCApplication):
     ) -> None:
         app.get('')(self.list_agents)
         app.get('/')(self.list_agents)
+        app.get('/readyz')(self.handle_readiness)
+        if self.admission is not None:
+            app.get('/admission')(self.admission_stats)
+        if self.metrics:
+            app.get('/metrics')(self.handle_metrics)
+        if self.profiling_admin is not None:
+            self.profiling_admin.add_routes_to_app(app)
         agent_rpc_url = f'/{{namespace}}/{{name}}{rpc_url}'
         app.post(
             agent_rpc_url,
@@ -100,34 +182,236 @@ class RuntimeA2AFastAPIApplication(JSONRPCApplication):
             namespace: str,
             name: str,
     ) -> Response:
-        # 便于下游链路识别agent id，参见 DefaultCallContextBuilder
-        request.scope['headers'].append((X_AGENT_NAMESPACE.encode(), namespace.encode()))
-        request.scope['headers'].append((X_AGENT_NAME.encode(), name.encode()))
+        if self.fast_json:
+            try:
+                # starlette 的 request.json() 会复用 _json
+                request._json = fast_json.loads(await request.body())
+            except ValueError:
+                # 交由默认流程返回 JSON parse error
+                pass
+        if not self.metrics:
+            return await self._dispatch(request, namespace, name)
+
+        try:
+            body = await request.json()
+            method = body.get('method') if isinstance(body, dict) else None
+        except Exception:
+            method = None
+        agent = namespace_name(namespace, name)
+        timer = RequestTimer(agent, method if method in _METHODS else 'unknown')
+        CURRENT_REQUEST.set(timer)
+        response = await self._dispatch(request, namespace, name)
+        if response.status_code == 404:
+            # 未知agent 不作为label，避免任意路径产生大量时间序列
+            timer.agent = 'unknown'
+        if response.status_code != 200 and not timer.error:
+            timer.error = f'http_{response.status_code}'
+        if not isinstance(response, EventSourceResponse):
+            timer.finish()
+        return response
+
+    async def _dispatch(self, request: Request, namespace: str, name: str) -> Response:
+        agent_config = await self._resolve(namespace, name)
+        if agent_config is None:
+            return _agent_not_found(namespace, name)
+        bind_agent(agent_config.namespace_name)
+        if self.draining:
+            rejected = await self._reject_when_draining(request)
+            if rejected is not None:
+                return rejected
+        # 经 RuntimeCallContextBuilder 进入 ServerCallContext，后台执行的 execute/cancel 不再查询config store
+        setattr(request.state, AGENT_BINDING, AgentBinding(agent_config))
+        if self.admission is not None or self.rate_limiter is not None:
+            rejected = await self._check_quota(request, agent_config)
+            if rejected is not None:
+                return rejected
         return await self._handle_requests(request)
 
+    def _generate_error_response(self, request_id: str | int | None, error: JSONRPCError | A2AError) -> JSONResponse:
+        timer = CURRENT_REQUEST.get()
+        if timer is not None:
+            timer.error = type(error.root if isinstance(error, A2AError) else error).__name__
+        return super()._generate_error_response(request_id, error)
+
+    def _create_response(
+            self,
+            context: ServerCallContext,
+            handler_result: AsyncGenerator[SendStreamingMessageResponse] | JSONRPCErrorResponse | JSONRPCResponse,
+    ) -> Response:
+        timer = CURRENT_REQUEST.get()
+        if timer is not None:
+            if isinstance(handler_result, AsyncGenerator):
+                handler_result = _timed_stream(handler_result, timer)
+            else:
+                timer.error = _error_class(handler_result)
+        if not self.fast_json:
+            return super()._create_response(context, handler_result)
+        headers = {}
+        if exts := context.activated_extensions:
+            headers[HTTP_EXTENSION_HEADER] = ', '.join(sorted(exts))
+        if isinstance(handler_result, AsyncGenerator):
+            async def event_generator(
+                    stream: AsyncGenerator[SendStreamingMessageResponse],
+            ) -> AsyncGenerator[bytes]:
+                async for item in stream:
+                    yield fast_json.sse_event(fast_json.model_bytes(item.root))
+
+            return EventSourceResponse(event_generator(handler_result), headers=headers)
+        model = handler_result if isinstance(handler_result, JSONRPCErrorResponse) else handler_result.root
+        return fast_json.FastJSONResponse(fast_json.model_bytes(model), headers=headers)
+
+    async def _resolve(self, namespace: str, name: str) -> AgentConfig | None:
+        try:
+            return await self.agent_config_store.get(namespace, name)
+        except ValueError:
+            return None
+
+    async def _check_quota(self, request: Request, agent_config: AgentConfig) -> Response | None:
+        """message/send、message/stream 的限流及准入检查，超限时直接返回 429，不进入request handler。
+
+        查询、取消等已有task 的操作不受限制；排队超时等由 RuntimeAgentExecutor 以JSON-RPC 错误返回。
+        """
+        try:
+            body = await request.json()
+        except Exception:
+            return None
+        if not isinstance(body, dict) or body.get('method') not in _ADMISSION_METHODS:
+            return None
+        if self.rate_limiter is not None and agent_config.rate_limit is not None:
+            key = agent_config.namespace_name
+            if agent_config.rate_limit.per_caller:
+                key = f'{key}:{self._caller(request)}'
+            wait = await self.rate_limiter.acquire(key, agent_config.rate_limit)
+            if wait > 0:
+                error = JSONRPCError(code=RATE_LIMITED_ERROR_CODE, message=f'rate limit of {key} exceeded',
+                                     data={'retry_after': math.ceil(wait)})
+                return _retry_later(body.get('id'), error, math.ceil(wait))
+        if self.admission is not None:
+            rejected = self.admission.check(agent_config)
+            if rejected is not None:
+                return _retry_later(body.get('id'), rejected.error, rejected.retry_after)
+        return None
+
+    async def _reject_when_draining(self, request: Request) -> Response | None:
+        """drain 期间拒绝新的执行，查询、取消及重新订阅已有task 照常处理。"""
+        try:
+            body = await request.json()
+        except Exception:
+            return None
+        if not isinstance(body, dict) or body.get('method') not in _ADMISSION_METHODS:
+            return None
+        error = JSONRPCError(code=DRAINING_ERROR_CODE, message='server is shutting down, retry on another replica',
+                             data={'retry_after': 1})
+        return _retry_later(body.get('id'), error, 1, status_code=503)
+
+    def _caller(self, request: Request) -> str:
+        user = self._context_builder.build(request).user
+        if user.is_authenticated:
+            return user.user_name
+        return request.client.host if request.client else 'anonymous'
+
+    async def admission_stats(self) -> Response:
+        return JSONResponse(self.admission.stats())
+
+    async def handle_readiness(self) -> Response:
+        if not self.ready:
+            return JSONResponse({'status': 'draining', 'inflight': self.inflight.count}, status_code=503)
+        return JSONResponse({'status': 'ready'})
+
+    async def drain(self, timeout: float | None = None, readiness_delay: float | None = None) -> None:
+        """优雅退出，可重复调用，只执行一次。
+
+        1. /readyz 返回503，等待 readiness_delay 秒使负载均衡摘除本副本
+        2. 拒绝新的 message/send、message/stream，等待在途请求、SSE 流、producer 及后台任务结束
+        3. 超过 timeout 秒仍未结束的经executor 的cancel 取消
+        """
+        if self._drain_task is None:
+            self._drain_task = asyncio.create_task(self._drain(
+                self.drain_timeout if timeout is None else timeout,
+                self.readiness_delay if readiness_delay is None else readiness_delay,
+            ))
+        await self._drain_task
+
+    async def _drain(self, timeout: float, readiness_delay: float) -> None:
+        self.ready = False
+        if readiness_delay > 0:
+            await asyncio.sleep(readiness_delay)
+        self.draining = True
+        handler = self.handler.request_handler
+        running_agents = getattr(handler, '_running_agents', {})
+        background_scheduler = getattr(handler, 'scheduler', None)
+        logger.info(f'draining {self.inflight.count} requests, {len(running_agents)} producers')
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while loop.time() < deadline:
+            if not self.inflight.count and not running_agents and (
+                    background_scheduler is None or background_scheduler.idle):
+                logger.info('drained')
+                return
+            await asyncio.sleep(0.05)
+        # 超时后不再开始排队的后台任务，取消仍在执行的producer
+        if background_scheduler is not None:
+            background_scheduler.stop()
+        cancel_running = getattr(handler, 'cancel_running', None)
+        if cancel_running is not None:
+            canceled = await cancel_running()
+            logger.warning(f'drain timeout after {timeout}s, canceled {canceled} producers')
+        if not await self.inflight.wait_idle(1):
+            logger.warning(f'{self.inflight.count} requests are still in flight after drain')
+
+    async def handle_metrics(self) -> Response:
+        return Response(REGISTRY.render(), media_type='text/plain; version=0.0.4; charset=utf-8')
+
+    def _register_metrics(self) -> None:
+        # 抓取时读取运行时状态，请求路径上没有额外开销
+        handler = self.handler.request_handler
+        running_agents = getattr(handler, '_running_agents', None)
+        if running_agents is not None:
+            runtime_metrics.ACTIVE_PRODUCERS.set_callback(lambda: [((), len(running_agents))])
+        queues = getattr(getattr(handler, '_queue_manager', None), '_task_queue', None)
+        if queues is not None:
+            runtime_metrics.EVENT_QUEUES.set_callback(lambda: [((), len(queues))])
+            runtime_metrics.EVENT_QUEUE_DEPTH.set_callback(
+                lambda: [((), sum(queue.queue.qsize() for queue in list(queues.values())))]
+            )
+        runtime_metrics.DRAINING.set_callback(lambda: [((), 0 if self.ready else 1)])
+        runtime_metrics.INFLIGHT_REQUESTS.set_callback(lambda: [((), self.inflight.count)])
+        runtime_metrics.AGENT_CONFIGS.set_callback(lambda: [((), len(self.agent_config_store.snapshot))])
+        if self.notifier is not None:
+            runtime_metrics.NOTIFIER_LAG.set_callback(
+                lambda: [((), self.notifier.lag_seconds)] if self.notifier.lag_seconds is not None else []
+            )
+        if self.admission is not None:
+            runtime_metrics.ADMISSION_ACTIVE.set_callback(lambda: self._admission_samples('active'))
+            runtime_metrics.ADMISSION_WAITING.set_callback(lambda: self._admission_samples('waiting'))
+            runtime_metrics.ADMISSION_REJECTED.set_callback(lambda: self._admission_samples('rejected'))
+
+    def _admission_samples(self, field: str) -> List[Tuple[Tuple[str, str], float]]:
+        stats = self.admission.stats()
+        return [
+            ((scope.removesuffix('s'), key), values[field])
+            for scope in ('agents', 'namespaces')
+            for key, values in stats[scope].items()
+        ]
+
     async def handle_get_agent_card(
             self,
+            request: Request,
             namespace: str,
             name: str,
-    ) -> JSONResponse:
-        agent_config = await self.agent_config_store.get(namespace, name)
-        card_to_serve = agent_config.get_card()
-        if self.card_modifier:
-            card_to_serve = self.card_modifier(card_to_serve)
-
-        return JSONResponse(
-            card_to_serve.model_dump(
-                exclude_none=True,
-                by_alias=True,
-            )
-        )
+    ) -> Response:
+        agent_config = await self._resolve(namespace, name)
+        if agent_config is None:
+            return _agent_not_found(namespace, name)
+        card_to_serve = self.card_cache.get_modified_card(agent_config)
+        return _card_response(request, card_to_serve, settings.AGENT_CARD_CACHE_CONTROL)
 
     async def handle_get_authenticated_extended_agent_card(
             self,
             request: Request,
             namespace: str,
             name: str,
-    ) -> JSONResponse:
+    ) -> Response:
         logger.warning(
             'HTTP GET for authenticated extended card has been called by a client. '
             'This endpoint is deprecated in favor of agent/authenticatedExtendedCard '
@@ -138,22 +422,21 @@ class RuntimeA2AFastAPIApplication(JSONRPCApplication):
                 {'error': 'Extended agent card not supported or not enabled.'},
                 status_code=404,
             )
-        agent_config = await self.agent_config_store.get(namespace, name)
-        card_to_serve = agent_config.get_extended_card()
+        agent_config = await self._resolve(namespace, name)
+        if agent_config is None:
+            return _agent_not_found(namespace, name)
+        cached_card = self.card_cache.get_extended_card(agent_config)
 
         if self.extended_card_modifier:
+            # extended_card_modifier 依赖请求上下文，结果不可缓存
             context = self._context_builder.build(request)
             # If no base extended card is provided, pass the public card to the modifier
-            base_card = card_to_serve if card_to_serve else self.agent_card
-            card_to_serve = self.extended_card_modifier(base_card, context)
+            base_card = cached_card.card if cached_card else self.agent_card
+            modified_card = self.extended_card_modifier(base_card, context)
+            cached_card = serialize_card(modified_card) if modified_card else None
 
-        if card_to_serve:
-            return JSONResponse(
-                card_to_serve.model_dump(
-                    exclude_none=True,
-                    by_alias=True,
-                )
-            )
+        if cached_card:
+            return _card_response(request, cached_card, settings.EXTENDED_AGENT_CARD_CACHE_CONTROL)
         # If supports_authenticated_extended_card is true, but no
         # extended_agent_card was provided, and no modifier produced a card,
         # return a 404.
@@ -162,23 +445,101 @@ class RuntimeA2AFastAPIApplication(JSONRPCApplication):
             status_code=404,
         )
 
-    async def list_agents(self) -> JSONResponse:
-        agent_configs = await self.agent_config_store.list()
-        serialized_configs = [agent_config.model_dump(exclude_none=True) for agent_config in agent_configs]
-        return JSONResponse(content=serialized_configs)
+    async def list_agents(
+            self,
+            request: Request,
+            namespace: str | None = None,
+            prefix: str | None = None,
+            cursor: str | None = None,
+            limit: int | None = Query(default=None, ge=1, le=settings.LIST_AGENTS_MAX_LIMIT),
+            view: AgentListView = AgentListView.FULL,
+    ) -> Response:
+        etag = self._list_etag(namespace, prefix, cursor, limit, view)
+        headers = {'ETag': etag}
+        if etag_matches(request.headers.get('if-none-match'), etag):
+            return Response(status_code=304, headers=headers)
+
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError:
+            return JSONResponse({'error': f'Invalid cursor: {cursor}'}, status_code=400)
+
+        if limit is None and namespace is None and prefix is None and after is None:
+            agent_configs = await self.agent_config_store.list()
+            # 不分页时流式输出，内存占用不随agent 数量增长
+            return StreamingResponse(
+                _stream_json_array(agent_configs, view), media_type='application/json', headers=headers
+            )
+
+        agent_configs, next_after = await self.agent_config_store.query(namespace, prefix, after, limit)
+        if limit is None:
+            return StreamingResponse(
+                _stream_json_array(agent_configs, view), media_type='application/json', headers=headers
+            )
+        return JSONResponse(
+            {
+                'agents': [_dump_agent_config(agent_config, view) for agent_config in agent_configs],
+                'next_cursor': encode_cursor(next_after) if next_after else None,
+            },
+            headers=headers,
+        )
+
+    def _list_etag(self, *query: Any) -> str:
+        # 不同实例的version 不可比较，带上实例epoch 避免跨副本误判304
+        query_hash = hashlib.sha1(repr(query).encode()).hexdigest()[:16]
+        return f'"{self._list_epoch}-{self.agent_config_store.version}-{query_hash}"'
 
     async def sync_agent_config(
             self,
     ):
-        async for agent_config in await self.notifier.watch():
-            logger.debug(f'sync agent config {agent_config}')
-            await self.agent_config_store.sync_agent_config(agent_config)
+        # 断线后以抖动退避重连，监听协程不会因为一次连接错误永久退出
+        backoff = Backoff(settings.NOTIFIER_RECONNECT_MIN_SECONDS, settings.NOTIFIER_RECONNECT_MAX_SECONDS)
+        reconnecting = False
+        # reload 失败时保持为 True，下次重连时重试
+        resync = False
+
+        async def reload() -> None:
+            nonlocal resync
+            await self.reload_agent_config()
+            resync = False
+
+        while True:
+            try:
+                # 无法重放断开期间的变更时全量reload；先订阅再reload，reload 期间的变更不会丢失
+                needs_reload = resync or (reconnecting and not self.notifier.replayable)
+                async for agent_config in self.notifier.watch(reload if needs_reload else None):
+                    backoff.reset()
+                    await self.apply_agent_config(agent_config)
+                delay = backoff.next()
+                logger.warning(f'watch agent config ended, reconnect in {delay:.2f}s')
+            except asyncio.CancelledError:
+                raise
+            except NotifierResyncRequired as e:
+                delay = backoff.next()
+                logger.warning(f'notifier requires resync, reload in {delay:.2f}s: {str(e)}')
+                resync = True
+            except Exception as e:
+                delay = backoff.next()
+                logger.error(f'watch agent config failed, retry in {delay:.2f}s: {str(e)}')
+            reconnecting = True
+            await asyncio.sleep(delay)
+
+    async def apply_agent_config(self, agent_config: AgentConfig) -> None:
+        logger.debug(f'sync agent config {agent_config}')
+        await self.agent_config_store.sync_agent_config(agent_config)
+        if agent_config.sync_operation == SyncOperation.UPSERT:
+            self.card_cache.put(agent_config)
+        elif agent_config.sync_operation == SyncOperation.DELETE:
+            self.card_cache.invalidate(agent_config)
 
     async def reload_agent_config(
             self,
     ):
         logger.info('reload agent config')
+        start = time.perf_counter()
         await self.agent_config_store.reload()
+        runtime_metrics.CONFIG_RELOAD_DURATION.observe(time.perf_counter() - start)
+        self.card_cache.put_all(await self.agent_config_store.list())
 
     def build(
             self,
@@ -195,7 +556,18 @@ class RuntimeA2AFastAPIApplication(JSONRPCApplication):
             component_schemas = openapi_schema.setdefault('components', {}).setdefault('schemas', {})
             component_schemas.update(defs)
             component_schemas['A2ARequest'] = a2a_request_schema
+            # 启动时预先序列化所有agent card
+            agent_configs = await self.agent_config_store.list()
+            self.card_cache.put_all(agent_configs)
+            handler = self.handler.request_handler
+            agent_loader = getattr(getattr(handler, 'agent_executor', None), 'agent_loader', None)
+            if settings.AGENT_PREWARM and isinstance(agent_loader, AgentLoader):
+                agent_loader.prewarm(
+                    agent_config for agent_config in agent_configs
+                    if '*' in settings.AGENT_PREWARM or agent_config.namespace_name in settings.AGENT_PREWARM
+                )
 
+            scheduler = None
             if settings.CONFIG_RELOAD_INTERVAL_SECONDS > 0:
                 scheduler = AsyncIOScheduler()
                 scheduler.add_job(
@@ -206,12 +578,118 @@ class RuntimeA2AFastAPIApplication(JSONRPCApplication):
                     coalesce=False,
                     replace_existing=True,
                 )
+                scheduler.start()
             # create sync config task
-            if self.notifier:
-                asyncio.create_task(self.sync_agent_config())
+            sync_task = asyncio.create_task(self.sync_agent_config()) if self.notifier else None
+            loop_monitor = LoopMonitor(self.loop_block_threshold) if self.loop_block_threshold > 0 else None
+            if loop_monitor is not None:
+                loop_monitor.start()
+            # 继续重试上次退出前未投递成功的推送
+            push_dispatcher = getattr(handler, '_push_sender', None)
+            if isinstance(push_dispatcher, PushDispatcher):
+                push_dispatcher.start()
+            # 恢复上次退出前未完成的后台任务
+            background_scheduler = getattr(handler, 'scheduler', None)
+            if background_scheduler is not None:
+                await background_scheduler.start()
             yield
+            # 未经 GracefulServer 触发时（如直接使用其他ASGI server）在关闭阶段drain，此时已不再接收新连接
+            await self.drain(readiness_delay=0)
+            if scheduler is not None:
+                scheduler.shutdown(wait=False)
+            if sync_task is not None:
+                sync_task.cancel()
+                await asyncio.gather(sync_task, return_exceptions=True)
+            if background_scheduler is not None:
+                await background_scheduler.close(0)
+            if isinstance(push_dispatcher, PushDispatcher):
+                await push_dispatcher.close()
+            queue_manager = getattr(handler, '_queue_manager', None)
+            if isinstance(queue_manager, RedisStreamQueueManager):
+                await queue_manager.shutdown()
+            # 释放executor（包括进程隔离的worker 进程）及各store 的连接，写缓冲的task store 在此落库
+            for resource in (agent_loader, getattr(handler, 'task_store', None), self.agent_config_store):
+                close = getattr(resource, 'close', None)
+                if close is not None:
+                    try:
+                        await close()
+                    except Exception:
+                        logger.exception(f'Failed to close {type(resource).__name__}')
+            if loop_monitor is not None:
+                await loop_monitor.stop()
 
         app = FastAPI(lifespan=lifespan, redoc_url='/redocs', **kwargs)
+        app.add_middleware(InflightMiddleware, inflight=self.inflight, exclude=('/readyz', '/metrics'))
         self.add_routes_to_app(app, agent_card_url, rpc_url, extended_agent_card_url)
 
         return app
+
+
+async def _timed_stream(
+        stream: AsyncGenerator[SendStreamingMessageResponse],
+        timer: RequestTimer,
+) -> AsyncGenerator[SendStreamingMessageResponse]:
+    try:
+        async for item in stream:
+            timer.first_event()
+            if not timer.error:
+                timer.error = _error_class(item)
+            yield item
+    finally:
+        timer.finish()
+
+
+def _error_class(result: Any) -> str:
+    error = getattr(getattr(result, 'root', result), 'error', None)
+    return type(error).__name__ if error is not None else ''
+
+
+def _agent_not_found(namespace: str, name: str) -> Response:
+    return JSONResponse({'error': f'Agent {namespace}/{name} not found.'}, status_code=404)
+
+
+def _retry_later(request_id: Any, error: JSONRPCError, retry_after: int, status_code: int = 429) -> Response:
+    return JSONResponse(
+        {'jsonrpc': '2.0', 'id': request_id, 'error': error.model_dump(exclude_none=True)},
+        status_code=status_code,
+        headers={'Retry-After': str(retry_after)},
+    )
+
+
+def _card_response(request: Request, cached_card: CachedCard, cache_control: str) -> Response:
+    headers = {'ETag': cached_card.etag, 'Cache-Control': cache_control}
+    if etag_matches(request.headers.get('if-none-match'), cached_card.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached_card.body, media_type='application/json', headers=headers)
+
+
+def encode_cursor(namespace_name: str) -> str:
+    return base64.urlsafe_b64encode(namespace_name.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> str:
+    try:
+        return base64.urlsafe_b64decode(cursor.encode()).decode()
+    except Exception as e:
+        raise ValueError(f'Invalid cursor: {cursor}') from e
+
+
+def _dump_agent_config(agent_config: AgentConfig, view: AgentListView) -> dict[str, Any]:
+    if view == AgentListView.SUMMARY:
+        return agent_config.model_dump(include={'namespace', 'name'})
+    return agent_config.model_dump(exclude_none=True)
+
+
+async def _stream_json_array(agent_configs: Iterable[AgentConfig], view: AgentListView) -> AsyncIterator[bytes]:
+    include = {'namespace', 'name'} if view == AgentListView.SUMMARY else None
+    # 按块输出，避免每个agent 一次send
+    chunk = bytearray(b'[')
+    for i, agent_config in enumerate(agent_configs):
+        if i:
+            chunk += b','
+        chunk += agent_config.model_dump_json(include=include, exclude_none=True).encode()
+        if len(chunk) >= _STREAM_CHUNK_SIZE:
+            yield bytes(chunk)
+            chunk.clear()
+    chunk += b']'
+    yield bytes(chunk)
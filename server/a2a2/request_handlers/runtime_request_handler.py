@@ -1,14 +1,21 @@
 import asyncio
+import functools
 import logging
+import time
+import uuid
 
-from typing import cast
+from datetime import datetime, timezone
+from typing import Any, Dict, cast
 
+from a2a.auth.user import UnauthenticatedUser
 from a2a.server.agent_execution import (
     AgentExecutor,
+    RequestContext,
     RequestContextBuilder,
 )
 from a2a.server.context import ServerCallContext
 from a2a.server.events import (
+    EventConsumer,
     EventQueue,
     QueueManager,
 )
@@ -22,21 +29,39 @@ from a2a.server.tasks import (
 )
 from a2a.types import (
     InvalidParamsError,
+    Message,
+    MessageSendConfiguration,
     MessageSendParams,
     Task,
+    TaskIdParams,
+    TaskNotFoundError,
     TaskState,
+    TaskStatus,
 )
+from a2a.utils import new_agent_text_message
 from a2a.utils.errors import ServerError
+from a2a.utils.task import apply_history_length
 from a2a.utils.telemetry import SpanKind, trace_class
 
+from server.a2a2.agent_execution.admission import AdmissionRejected
+from server.a2a2.agent_execution.binding import AGENT_BINDING, AgentBinding, get_binding
+from server.background.base import BackgroundJob, JobInterrupted, JobUser
+from server.background.scheduler import BackgroundScheduler
+from server.common.events import TERMINAL_TASK_STATES
+from server.common.model import AgentConfig
+from server.config_store.base import AgentConfigStore
+from server.dedup.deduplicator import MessageDeduplicator
+
 logger = logging.getLogger(__name__)
 
-TERMINAL_TASK_STATES = {
-    TaskState.completed,
-    TaskState.canceled,
-    TaskState.failed,
-    TaskState.rejected,
-}
+# ServerCallContext.state 中的标记，后台执行提交时创建的task 按新task 执行
+_BACKGROUND_NEW_TASK = 'background_new_task'
+# ServerCallContext.state 中的标记，由 BackgroundScheduler 执行
+_BACKGROUND_JOB = 'background_job'
+# 退出时等待executor cancel 产生的事件被消费的时间
+_CANCEL_FLUSH_SECONDS = 1
+# 后台任务记录中不保存的请求头
+_CREDENTIAL_HEADERS = frozenset({'authorization', 'proxy-authorization', 'cookie'})
 
 
 @trace_class(kind=SpanKind.SERVER)
@@ -50,9 +75,251 @@ class RuntimeRequestHandler(DefaultRequestHandler):
             push_config_store: PushNotificationConfigStore | None = None,
             push_sender: PushNotificationSender | None = None,
             request_context_builder: RequestContextBuilder | None = None,
+            deduplicator: MessageDeduplicator | None = None,
+            scheduler: BackgroundScheduler | None = None,
+            agent_config_store: AgentConfigStore | None = None,
     ) -> None:
         super().__init__(agent_executor, task_store, queue_manager, push_config_store, push_sender,
                          request_context_builder)
+        self.deduplicator = deduplicator
+        # 非阻塞的 message/send 交给 scheduler 执行，为空时与 DefaultRequestHandler 一致在当前进程中直接执行
+        self.scheduler = scheduler
+        # 后台任务执行时从中获取agent 的最新配置，为空时使用提交时的配置
+        self.agent_config_store = agent_config_store
+        if scheduler is not None:
+            scheduler.bind(self._run_background_job, self._abandon_background_job)
+        # task_id -> 执行中producer 的调用上下文，退出时用于调用executor 的cancel
+        self._producer_contexts: Dict[str, ServerCallContext | None] = {}
+        self.shutting_down = False
+
+    async def on_message_send(
+            self,
+            params: MessageSendParams,
+            context: ServerCallContext | None = None,
+    ) -> Message | Task:
+        if self.deduplicator is None or not params.message.message_id:
+            return await self._send_message(params, context)
+        # 客户端超时后使用相同的 messageId 重试，复用执行中或已完成的结果
+        key = self._dedup_key(params, context)
+        result, replayed = await self.deduplicator.run(key, functools.partial(self._send_message, params, context))
+        if replayed and isinstance(result, Task):
+            # 保存的是首次返回时的task，返回其最新状态
+            result = await self.task_store.get(result.id, context) or result
+            if params.configuration:
+                result = apply_history_length(result, params.configuration.history_length)
+        return result
+
+    def _dedup_key(self, params: MessageSendParams, context: ServerCallContext | None) -> str:
+        # messageId 由客户端生成，按调用方及 contextId 隔离，不同调用方之间不会拿到对方的结果
+        binding = get_binding(context)
+        caller = context.user.user_name if context is not None and context.user.is_authenticated else ''
+        return ':'.join((
+            binding.namespace_name if binding else '',
+            caller,
+            params.message.context_id or '',
+            params.message.message_id,
+        ))
+
+    async def on_cancel_task(
+            self,
+            params: TaskIdParams,
+            context: ServerCallContext | None = None,
+    ) -> Task | None:
+        if self.scheduler is not None and await self.scheduler.cancel(params.id):
+            # 尚未开始执行的后台任务直接取消
+            task = await self._finish_task(params.id, TaskState.canceled, None, context)
+            if task is None:
+                raise ServerError(error=TaskNotFoundError())
+            return task
+        return await super().on_cancel_task(params, context)
+
+    async def _send_message(
+            self,
+            params: MessageSendParams,
+            context: ServerCallContext | None = None,
+    ) -> Message | Task:
+        binding = get_binding(context)
+        if (
+                self.scheduler is None
+                or binding is None
+                or params.configuration is None
+                or params.configuration.blocking is not False
+        ):
+            return await super().on_message_send(params, context)
+        return await self._submit_background_job(params, context, binding, self.scheduler, params.configuration)
+
+    async def _submit_background_job(
+            self,
+            params: MessageSendParams,
+            context: ServerCallContext | None,
+            binding: AgentBinding,
+            scheduler: BackgroundScheduler,
+            configuration: MessageSendConfiguration,
+    ) -> Task:
+        """保存 submitted 状态的task 并提交后台执行，立即返回该task。"""
+        message = params.message
+        existing = await self.task_store.get(message.task_id, context) if message.task_id else None
+        if existing:
+            if existing.status.state in TERMINAL_TASK_STATES:
+                raise ServerError(
+                    error=InvalidParamsError(
+                        message=f'Task {existing.id} is in terminal state: {existing.status.state}'
+                    )
+                )
+            # 与 TaskManager.update_with_message 一致，状态中的消息移入history，新消息在执行时追加
+            history = list(existing.history or [])
+            if existing.status.message:
+                history.append(existing.status.message)
+            task = existing.model_copy(update={'status': _status(TaskState.submitted), 'history': history})
+        else:
+            task = Task(
+                id=message.task_id or str(uuid.uuid4()),
+                context_id=message.context_id or str(uuid.uuid4()),
+                status=_status(TaskState.submitted),
+                history=[message],
+            )
+        if self._push_config_store and configuration.push_notification_config:
+            await self._push_config_store.set_info(task.id, configuration.push_notification_config)
+        await self.task_store.save(task, context)
+        job = BackgroundJob(
+            task_id=task.id,
+            agent_config=binding.agent_config,
+            params=params.model_copy(update={
+                'message': message.model_copy(update={'task_id': task.id, 'context_id': task.context_id}),
+            }),
+            new_task=existing is None,
+            created_at=time.time(),
+            user_name=context.user.user_name if context is not None and context.user.is_authenticated else None,
+            headers={
+                name: value for name, value in (context.state.get('headers') or {}).items()
+                if name.lower() not in _CREDENTIAL_HEADERS
+            } if context is not None else {},
+            requested_extensions=sorted(context.requested_extensions) if context is not None else [],
+        )
+        try:
+            await scheduler.submit(job)
+        except AdmissionRejected:
+            if existing:
+                await self.task_store.save(existing, context)
+            else:
+                await self.task_store.delete(task.id, context)
+            raise
+        return apply_history_length(task, configuration.history_length)
+
+    async def _run_background_job(self, job: BackgroundJob) -> None:
+        agent_config = await self._resolve_agent_config(job)
+        context = self._job_context(job, agent_config, {_BACKGROUND_NEW_TASK: job.new_task, _BACKGROUND_JOB: True})
+        _, task_id, queue, result_aggregator, producer_task = await self._setup_message_execution(job.params, context)
+        consumer = EventConsumer(queue)
+        producer_task.add_done_callback(consumer.agent_task_callback)
+        event = None
+        try:
+            async for event in result_aggregator.consume_and_emit(consumer):
+                await self._send_push_notification_if_needed(task_id, result_aggregator)
+        finally:
+            await self._cleanup_producer(producer_task, task_id)
+        if producer_task.cancelled() and self.shutting_down:
+            raise JobInterrupted()
+        if isinstance(event, Message):
+            # agent 直接返回 Message 时，提交时创建的task 以该消息结束
+            await self._finish_task(task_id, TaskState.completed, event, context)
+
+    async def _abandon_background_job(self, job: BackgroundJob, reason: str) -> None:
+        context = self._job_context(job, job.agent_config, {})
+        message = new_agent_text_message(f'Background execution failed: {reason}', job.params.message.context_id,
+                                         job.task_id)
+        await self._finish_task(job.task_id, TaskState.failed, message, context)
+
+    async def _resolve_agent_config(self, job: BackgroundJob) -> AgentConfig:
+        if self.agent_config_store is None:
+            return job.agent_config
+        try:
+            return await self.agent_config_store.get(job.agent_config.namespace, job.agent_config.name)
+        except ValueError:
+            # agent 在排队或重启期间被删除，任务由 scheduler 标记为失败
+            raise ValueError(f'agent {job.agent_config.namespace_name} no longer exists') from None
+
+    def _job_context(self, job: BackgroundJob, agent_config: AgentConfig, state: Dict[str, Any]) -> ServerCallContext:
+        """按提交时保存的调用方信息重建 ServerCallContext。"""
+        return ServerCallContext(
+            state={'headers': dict(job.headers), 'method': 'message/send', AGENT_BINDING: AgentBinding(agent_config),
+                   **state},
+            user=JobUser(job.user_name) if job.user_name is not None else UnauthenticatedUser(),
+            requested_extensions=set(job.requested_extensions),
+        )
+
+    async def cancel_running(
+            self,
+            reason: str = 'interrupted by server shutdown',
+            timeout: float = _CANCEL_FLUSH_SECONDS,
+    ) -> int:
+        """退出前取消仍在执行的producer，返回取消的数量。
+
+        先调用executor 的cancel（agent 可以产生 canceled 事件），再取消producer 并关闭事件队列，
+        等待中的请求及SSE 流随之结束。所有producer 同时取消，executor 的cancel 及事件的发送共用 timeout，
+        超时后直接关闭队列。未进入终态的task 标记为 failed，客户端可以重试；
+        后台任务保留记录，由重启后的 BackgroundScheduler 恢复。
+        """
+        self.shutting_down = True
+        running = list(self._running_agents.items())
+        deadline = asyncio.get_running_loop().time() + timeout
+        results = await asyncio.gather(
+            *(self._cancel_producer(task_id, producer_task, reason, deadline) for task_id, producer_task in running),
+            return_exceptions=True,
+        )
+        for (task_id, _), result in zip(running, results):
+            if isinstance(result, Exception):
+                logger.error(f'Failed to cancel task {task_id} on shutdown: {str(result)}')
+        return len(running)
+
+    async def _cancel_producer(self, task_id: str, producer_task: asyncio.Task, reason: str, deadline: float) -> None:
+        loop = asyncio.get_running_loop()
+        context = self._producer_contexts.get(task_id)
+        task = await self.task_store.get(task_id, context)
+        queue = await self._queue_manager.get(task_id)
+        if task is not None and queue is not None:
+            try:
+                await asyncio.wait_for(
+                    self.agent_executor.cancel(
+                        RequestContext(task_id=task_id, context_id=task.context_id, task=task, call_context=context),
+                        queue,
+                    ),
+                    max(0.0, deadline - loop.time()),
+                )
+            except (Exception, asyncio.TimeoutError) as e:
+                logger.warning(f'Failed to cancel task {task_id} on shutdown: {str(e) or type(e).__name__}')
+        producer_task.cancel()
+        if queue is not None:
+            try:
+                await asyncio.wait_for(queue.close(), max(0.0, deadline - loop.time()))
+            except asyncio.TimeoutError:
+                await queue.close(immediate=True)
+        if context is None or not context.state.get(_BACKGROUND_JOB):
+            message = new_agent_text_message(reason, task.context_id if task else None, task_id)
+            await self._finish_task(task_id, TaskState.failed, message, context)
+
+    async def _cleanup_producer(self, producer_task: asyncio.Task, task_id: str) -> None:
+        try:
+            await super()._cleanup_producer(producer_task, task_id)
+        finally:
+            if self._running_agents.get(task_id) is None:
+                self._producer_contexts.pop(task_id, None)
+
+    async def _finish_task(
+            self,
+            task_id: str,
+            state: TaskState,
+            message: Message | None,
+            context: ServerCallContext | None,
+    ) -> Task | None:
+        task = await self.task_store.get(task_id, context)
+        if task is None or task.status.state in TERMINAL_TASK_STATES:
+            return task
+        task = task.model_copy(update={'status': _status(state, message)})
+        await self.task_store.save(task, context)
+        if self._push_sender:
+            await self._push_sender.send_notification(task)
+        return task
 
     async def _setup_message_execution(
             self,
@@ -72,6 +339,9 @@ class RuntimeRequestHandler(DefaultRequestHandler):
             initial_message=params.message,
         )
         task: Task | None = await task_manager.get_task()
+        if task and context is not None and context.state.get(_BACKGROUND_NEW_TASK):
+            # 提交时保存的task 只用于查询，执行时按新task 处理
+            task = None
 
         if task:
             if task.status.state in TERMINAL_TASK_STATES:
@@ -121,7 +391,11 @@ class RuntimeRequestHandler(DefaultRequestHandler):
         producer_task = asyncio.create_task(
             self._run_event_stream(request_context, queue)
         )
+        self._producer_contexts[task_id] = context
         await self._register_producer(task_id, producer_task)
 
         return task_manager, task_id, queue, result_aggregator, producer_task
 
+
+def _status(state: TaskState, message: Message | None = None) -> TaskStatus:
+    return TaskStatus(state=state, message=message, timestamp=datetime.now(timezone.utc).isoformat())
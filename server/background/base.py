@@ -0,0 +1,67 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List
+
+from a2a.auth.user import User
+from a2a.types import MessageSendParams
+from pydantic import BaseModel
+
+from server.common.model import AgentConfig
+
+
+class JobInterrupted(Exception):
+    """执行被进程退出中断，保留任务记录等待重启后恢复。"""
+
+
+class JobUser(User):
+    """提交后台任务的已认证调用方。"""
+
+    def __init__(self, user_name: str) -> None:
+        self._user_name = user_name
+
+    @property
+    def is_authenticated(self) -> bool:
+        return True
+
+    @property
+    def user_name(self) -> str:
+        return self._user_name
+
+
+class BackgroundJob(BaseModel):
+    """非阻塞 message/send 的后台执行记录，重启后据此重新执行或标记失败。"""
+    task_id: str
+    # 提交时的agent config，执行时以 config store 中的最新配置为准
+    agent_config: AgentConfig
+    # message.task_id/context_id 已指向提交时创建的task
+    params: MessageSendParams
+    # 提交时新建的task（而非已有task 的后续消息），执行时按新task 处理
+    new_task: bool
+    # 已开始执行的次数
+    attempts: int = 0
+    # 提交时间（time.time()）
+    created_at: float
+    # 提交请求的调用方，执行时据此重建 ServerCallContext；未认证时为空
+    user_name: str | None = None
+    # 不包含 Authorization、Cookie 等凭证，任务记录会写入文件或redis
+    headers: Dict[str, str] = {}
+    requested_extensions: List[str] = []
+
+    @property
+    def namespace(self) -> str:
+        return self.agent_config.namespace
+
+
+class JobStore(ABC):
+    """持久化的后台任务记录，提交时写入，执行结束后删除。"""
+
+    @abstractmethod
+    async def save(self, job: BackgroundJob) -> None:
+        pass
+
+    @abstractmethod
+    async def delete(self, task_id: str) -> None:
+        pass
+
+    @abstractmethod
+    async def list(self) -> List[BackgroundJob]:
+        pass
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import os
+
+from typing import Dict, List
+
+from server.background.base import BackgroundJob, JobStore
+
+logger = logging.getLogger(__name__)
+
+# 日志行数超过 记录数 * _COMPACT_RATIO（且不少于 _COMPACT_MIN_LINES）时重写文件
+_COMPACT_RATIO = 2
+_COMPACT_MIN_LINES = 1000
+
+
+class LocalJobStore(JobStore):
+    """单节点的后台任务记录。
+
+    配置 path 时以追加日志的方式持久化（每行为 "+<job json>" 或 "-<task_id>"），重启时回放，
+    日志过长时压缩为当前的记录。未配置 path 时只保存在内存中，重启后丢失。
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path
+        self._jobs: Dict[str, BackgroundJob] = {}
+        self._lines = 0
+        self._write_lock = asyncio.Lock()
+        if path:
+            self._load(path)
+
+    async def save(self, job: BackgroundJob) -> None:
+        self._jobs[job.task_id] = job
+        await self._append(f'+{job.model_dump_json()}\n')
+
+    async def delete(self, task_id: str) -> None:
+        if self._jobs.pop(task_id, None) is not None:
+            await self._append(f'-{task_id}\n')
+
+    async def list(self) -> List[BackgroundJob]:
+        return list(self._jobs.values())
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def _load(self, path: str) -> None:
+        try:
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    self._lines += 1
+                    line = line.rstrip('\n')
+                    try:
+                        if line.startswith('+'):
+                            job = BackgroundJob.model_validate_json(line[1:])
+                            self._jobs[job.task_id] = job
+                        elif line.startswith('-'):
+                            self._jobs.pop(line[1:], None)
+                    except ValueError as e:
+                        # 进程崩溃时最后一行可能不完整
+                        logger.warning(f'Skip invalid background job record in {path}: {str(e)}')
+        except FileNotFoundError:
+            return
+        logger.info(f'loaded {len(self._jobs)} background jobs from {path}')
+
+    async def _append(self, line: str) -> None:
+        path = self.path
+        if not path:
+            return
+        async with self._write_lock:
+            if self._lines >= max(_COMPACT_MIN_LINES, len(self._jobs) * _COMPACT_RATIO):
+                data = ''.join(f'+{job.model_dump_json()}\n' for job in self._jobs.values())
+                await asyncio.to_thread(self._rewrite, path, data)
+                self._lines = len(self._jobs)
+            else:
+                await asyncio.to_thread(self._write, path, line)
+                self._lines += 1
+
+    def _write(self, path: str, line: str) -> None:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _rewrite(self, path: str, data: str) -> None:
+        tmp = f'{path}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
@@ -0,0 +1,44 @@
+import logging
+
+from typing import List
+
+from redis.asyncio import Redis, RedisCluster
+from redis.exceptions import RedisError
+
+from server.background.base import BackgroundJob, JobStore
+
+logger = logging.getLogger(__name__)
+
+
+class RedisJobStore(JobStore):
+    """保存在redis hash 中的后台任务记录，按 owner 区分副本，同名副本重启后接管。
+
+    owner 必须在重启前后保持不变（如 StatefulSet 的pod 名称），每次部署都变化的名称（Deployment 的pod 名称、
+    hostname）会使重启前留下的任务无人接管。redis 不可用时提交照常执行，只是重启后无法恢复。
+    """
+
+    def __init__(self, client: Redis | RedisCluster, owner: str, key_prefix: str = 'a2a') -> None:
+        if not owner:
+            raise ValueError('owner of RedisJobStore must be a name that is stable across restarts')
+        self.client = client
+        self.key = f'{key_prefix}:background:{owner}'
+
+    async def save(self, job: BackgroundJob) -> None:
+        try:
+            await self.client.hset(self.key, job.task_id, job.model_dump_json())  # type: ignore[misc]
+        except RedisError as e:
+            logger.warning(f'Failed to save background job of task {job.task_id}: {str(e)}')
+
+    async def delete(self, task_id: str) -> None:
+        try:
+            await self.client.hdel(self.key, task_id)  # type: ignore[misc]
+        except RedisError as e:
+            logger.warning(f'Failed to delete background job of task {task_id}: {str(e)}')
+
+    async def list(self) -> List[BackgroundJob]:
+        try:
+            values = await self.client.hvals(self.key)  # type: ignore[misc]
+        except RedisError as e:
+            logger.warning(f'Failed to list background jobs: {str(e)}')
+            return []
+        return [BackgroundJob.model_validate_json(value) for value in values]
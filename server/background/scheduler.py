@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import time
+
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List
+
+from server.a2a2.agent_execution.admission import AdmissionRejected
+from server.background.base import BackgroundJob, JobInterrupted, JobStore
+from server.background.memory import LocalJobStore
+from server.metrics.runtime import BACKGROUND_JOBS, BACKGROUND_RECOVERED, BACKGROUND_WAIT
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundScheduler:
+    """非阻塞 message/send 的后台执行。
+
+    - 最多 workers 个任务同时执行，排队的任务总数超过 max_queued 时拒绝提交
+    - 按namespace 分别排队，轮流取出，单个namespace 的大量提交不会饿死其他namespace
+    - 任务记录在提交时写入 store，执行结束后删除；start 时恢复上次退出前未完成的任务：
+      未开始执行的重新排队，已执行 max_attempts 次的交给 on_abandon（标记task 失败）
+    """
+
+    def __init__(
+            self,
+            store: JobStore | None = None,
+            workers: int = 64,
+            max_queued: int = 10000,
+            max_attempts: int = 1,
+    ) -> None:
+        self.store = store or LocalJobStore()
+        self.workers = workers
+        self.max_queued = max_queued
+        self.max_attempts = max_attempts
+        self._runner: Callable[[BackgroundJob], Awaitable[None]] | None = None
+        self._on_abandon: Callable[[BackgroundJob, str], Awaitable[None]] | None = None
+        # namespace -> 排队的任务，轮转顺序即调度顺序
+        self._queues: OrderedDict[str, Deque[BackgroundJob]] = OrderedDict()
+        self._queued = 0
+        self._ready = asyncio.Semaphore(0)
+        # task_id -> 执行中的任务
+        self._running: Dict[str, BackgroundJob] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._closed = False
+        BACKGROUND_JOBS.set_callback(self._samples)
+
+    def bind(
+            self,
+            runner: Callable[[BackgroundJob], Awaitable[None]],
+            on_abandon: Callable[[BackgroundJob, str], Awaitable[None]],
+    ) -> None:
+        """runner 执行任务；on_abandon 在任务不再执行时调用，参数为原因。"""
+        self._runner = runner
+        self._on_abandon = on_abandon
+
+    async def submit(self, job: BackgroundJob) -> None:
+        if self._closed:
+            raise AdmissionRejected(job.namespace, 1, 'server is shutting down')
+        if self._queued >= self.max_queued:
+            raise AdmissionRejected(job.namespace, 1, 'background queue is full')
+        await self.store.save(job)
+        self._start_workers()
+        self._enqueue(job)
+
+    async def cancel(self, task_id: str) -> bool:
+        """取消尚未开始执行的任务，任务已开始或不存在时返回 False。"""
+        for namespace, queue in self._queues.items():
+            for job in queue:
+                if job.task_id == task_id:
+                    queue.remove(job)
+                    self._queued -= 1
+                    if not queue:
+                        del self._queues[namespace]
+                    await self.store.delete(task_id)
+                    return True
+        return False
+
+    async def start(self) -> None:
+        """恢复上次退出前未完成的任务并启动执行。"""
+        assert self._runner is not None, 'bind() must be called before start()'
+        assert self._on_abandon is not None, 'bind() must be called before start()'
+        if self._tasks or self._closed:
+            return
+        for job in await self.store.list():
+            if job.task_id in self._running or self._is_queued(job.task_id):
+                continue
+            if job.attempts >= self.max_attempts:
+                BACKGROUND_RECOVERED.inc('abandoned')
+                logger.warning(f'background job of task {job.task_id} was interrupted by restart, abandon it')
+                await self._abandon(job, 'interrupted by server restart')
+                continue
+            BACKGROUND_RECOVERED.inc('requeued')
+            self._enqueue(job)
+        self._start_workers()
+
+    @property
+    def idle(self) -> bool:
+        return not self._queued and not self._running
+
+    def stop(self) -> None:
+        """不再接受提交，也不再开始排队中的任务，执行中的任务不受影响。"""
+        self._closed = True
+
+    async def close(self, timeout: float = 5) -> None:
+        """不再接受提交，等待执行中的任务结束（最多 timeout 秒）。
+
+        排队及未结束的任务保留在 store 中，下次 start 时恢复。
+        """
+        self.stop()
+        if not self._tasks:
+            return
+        deadline = time.monotonic() + timeout
+        while self._running and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        if self._running:
+            logger.warning(f'{len(self._running)} background jobs are still running on close')
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'workers': self.workers,
+            'running': len(self._running),
+            'queued': {namespace: len(queue) for namespace, queue in self._queues.items()},
+        }
+
+    def _enqueue(self, job: BackgroundJob) -> None:
+        self._queues.setdefault(job.namespace, deque()).append(job)
+        self._queued += 1
+        self._ready.release()
+
+    def _next(self) -> BackgroundJob | None:
+        if not self._queues or self._closed:
+            # 任务在排队期间被取消，或正在退出（排队的任务保留在 store 中）
+            return None
+        namespace, queue = self._queues.popitem(last=False)
+        job = queue.popleft()
+        self._queued -= 1
+        if queue:
+            # 轮到下一个namespace
+            self._queues[namespace] = queue
+        return job
+
+    def _is_queued(self, task_id: str) -> bool:
+        return any(job.task_id == task_id for queue in self._queues.values() for job in queue)
+
+    def _start_workers(self) -> None:
+        if self._tasks or self._closed:
+            return
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def _worker(self) -> None:
+        while True:
+            await self._ready.acquire()
+            job = self._next()
+            if job is None:
+                continue
+            BACKGROUND_WAIT.observe(time.time() - job.created_at, job.namespace)
+            self._running[job.task_id] = job
+            try:
+                job.attempts += 1
+                await self.store.save(job)
+                assert self._runner is not None
+                await self._runner(job)
+            except asyncio.CancelledError:
+                # 关闭时仍未结束，保留记录
+                raise
+            except JobInterrupted:
+                logger.info(f'background job of task {job.task_id} is interrupted, keep it for recovery')
+            except Exception as e:
+                logger.exception(f'background job of task {job.task_id} failed')
+                await self._abandon(job, str(e) or type(e).__name__)
+            else:
+                await self.store.delete(job.task_id)
+            finally:
+                self._running.pop(job.task_id, None)
+
+    async def _abandon(self, job: BackgroundJob, reason: str) -> None:
+        try:
+            assert self._on_abandon is not None
+            await self._on_abandon(job, reason)
+        except Exception:
+            logger.exception(f'Failed to abandon background job of task {job.task_id}')
+        await self.store.delete(job.task_id)
+
+    def _samples(self) -> List[Any]:
+        samples = [((namespace, 'queued'), len(queue)) for namespace, queue in self._queues.items()]
+        running: Dict[str, int] = {}
+        for job in self._running.values():
+            running[job.namespace] = running.get(job.namespace, 0) + 1
+        samples.extend(((namespace, 'running'), count) for namespace, count in running.items())
+        return samples
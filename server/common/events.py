@@ -0,0 +1,33 @@
+import json
+
+from typing import Dict, Type
+
+from a2a.server.events import Event
+from a2a.types import Message, Task, TaskArtifactUpdateEvent, TaskState, TaskStatusUpdateEvent
+
+TERMINAL_TASK_STATES = {
+    TaskState.completed,
+    TaskState.canceled,
+    TaskState.failed,
+    TaskState.rejected,
+}
+
+_EVENT_TYPES: Dict[str, Type[Message | Task | TaskStatusUpdateEvent | TaskArtifactUpdateEvent]] = {
+    'message': Message,
+    'task': Task,
+    'status-update': TaskStatusUpdateEvent,
+    'artifact-update': TaskArtifactUpdateEvent,
+}
+
+
+def dump_event(event: Event) -> str:
+    return event.model_dump_json(exclude_none=True)
+
+
+def parse_event(data: str | bytes) -> Event:
+    """按 kind 字段还原跨进程/跨节点传输的事件。"""
+    payload = json.loads(data)
+    event_type = _EVENT_TYPES.get(payload.get('kind'))
+    if event_type is None:
+        raise ValueError(f'Unknown event kind: {payload.get("kind")}')
+    return event_type.model_validate(payload)
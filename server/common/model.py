@@ -1,11 +1,8 @@
 from enum import Enum
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 from a2a.types import AgentCard
-from pydantic import BaseModel
-
-X_AGENT_NAMESPACE = 'x-agent-namespace'
-X_AGENT_NAME = 'x-agent-name'
+from pydantic import BaseModel, Field
 
 
 class RedisClusterType(str, Enum):
@@ -19,11 +16,56 @@ class SyncOperation(str, Enum):
     DELETE = 'delete'
 
 
+class RateLimit(BaseModel):
+    # 每秒补充的令牌数
+    rate: float = Field(gt=0)
+    # 桶容量，即允许的突发请求数，默认与 rate 相同
+    burst: int | None = None
+    # 按调用方分别限流，False 时所有调用方共享一个桶
+    per_caller: bool = True
+
+    @property
+    def capacity(self) -> float:
+        return float(self.burst) if self.burst else max(1.0, self.rate)
+
+
+class ProcessIsolation(BaseModel):
+    # worker 进程数，即该agent 的最大并行执行数
+    workers: int = Field(default=1, ge=1)
+    # 每个worker 执行多少个task 后重建，0 表示不重建
+    max_tasks_per_worker: int = 0
+    # 单个worker 的内存（RLIMIT_AS）及CPU 时间（RLIMIT_CPU）上限，0 表示不限制
+    memory_limit_mb: int = 0
+    cpu_time_limit_seconds: int = 0
+
+
+class Memoization(BaseModel):
+    # 缓存结果的有效期及每个agent 最多缓存的结果数（LRU 淘汰）
+    ttl_seconds: float = Field(default=300, gt=0)
+    max_entries: int = Field(default=1000, ge=1)
+    # 参与计算缓存key 的 message.metadata 字段，其他metadata 被忽略
+    metadata_keys: List[str] = []
+    # 同时写入redis 层，所有副本共享结果（需要 MEMOIZE_CACHE_TYPE=redis）
+    shared: bool = False
+
+
 class AgentConfig(BaseModel):
     namespace: str
     name: str
     card: Dict[str, Any]
     extended_card: Dict[str, Any] | None = None
+    # executor 的导入路径，如 agent.helloworld.agent_executor:HelloWorldAgentExecutor，首次使用时才import
+    executor: str | None = None
+    # 并发执行上限、等待队列长度及最长等待时间，未配置时使用全局默认值，max_concurrency=0 表示不限制
+    max_concurrency: int | None = None
+    max_queue: int | None = None
+    max_wait_seconds: float | None = None
+    # 请求限流，未配置时不限流
+    rate_limit: RateLimit | None = None
+    # 配置后executor 运行在独立的worker 进程池中
+    process_isolation: ProcessIsolation | None = None
+    # 相同输入总是得到相同输出的agent 可以开启结果缓存，命中时不执行agent，直接重放缓存的事件
+    memoization: Memoization | None = None
 
     sync_operation: SyncOperation | None = None
 
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 from pathlib import Path
+from typing import Dict, List
 from urllib.parse import quote_plus
 
 from pydantic import field_validator
@@ -27,6 +28,11 @@ class Settings(BaseSettings):
     DB_DATABASE: str = "test"
     DB_ECHO: bool = False
     DB_CHARSET: str = "utf8mb4"
+    # 连接池上限为 DB_POOL_SIZE + DB_MAX_OVERFLOW
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 3600
 
     SQLALCHEMY_DATABASE_URL: str = ""
 
@@ -58,11 +64,137 @@ class Settings(BaseSettings):
     # unicorn
     UVICORN_HOST: str = "0.0.0.0"
     UVICORN_PORT: int = 9999
+    # 收到 SIGTERM 后 /readyz 先返回503 的时间，之后拒绝新的执行请求
+    # 并等待在途请求结束（最多 SHUTDOWN_DRAIN_TIMEOUT_SECONDS），
+    # 再等待剩余连接关闭 SHUTDOWN_GRACEFUL_TIMEOUT_SECONDS（uvicorn 只支持整数秒）；
+    # 三者之和应小于 terminationGracePeriodSeconds
+    SHUTDOWN_READINESS_DELAY_SECONDS: float = 5
+    SHUTDOWN_DRAIN_TIMEOUT_SECONDS: float = 20
+    SHUTDOWN_GRACEFUL_TIMEOUT_SECONDS: int = 3
 
+    # notifier: redis(pub/sub) / redis_stream
     NOTIFIER_TYPE: str | None = None
     NOTIFIED_REDIS_CHANNEL: str | None = None
+    # redis_stream 模式下用于持久化offset，默认取hostname；重启后接续需要重启前后不变的名称（如 StatefulSet 的pod 名称）
+    NOTIFIER_CONSUMER_NAME: str | None = None
+    # offset 的有效期，不再使用的consumer 的offset 过期后删除
+    NOTIFIER_OFFSET_TTL_SECONDS: int = 7 * 24 * 60 * 60
+    NOTIFIER_STREAM_MAXLEN: int = 10000
+    NOTIFIER_RECONNECT_MIN_SECONDS: float = 0.5
+    NOTIFIER_RECONNECT_MAX_SECONDS: float = 30
 
     CONFIG_RELOAD_INTERVAL_SECONDS: int = 10 * 60
+    # 配置了 CONFIG_API_URL 时从http api 加载agent config
+    CONFIG_API_URL: str | None = None
+    CONFIG_API_JSON_PATH: str = "data"
+    CONFIG_API_VERSION_JSON_PATH: str = "version"
+    CONFIG_API_INCREMENTAL: bool = False
+    CONFIG_API_TIMEOUT: int = 10
+    # 单个agent config 的url，如 http://host/agents/{namespace}/{name}，配置后未命中时按需拉取
+    CONFIG_API_ITEM_URL: str | None = None
+    CONFIG_API_NEGATIVE_TTL_SECONDS: float = 30
+    # 首次加载失败后重试的最小间隔
+    CONFIG_API_RETRY_INTERVAL_SECONDS: float = 5
+
+    # task store: memory / database / redis
+    TASK_STORE_TYPE: str = "memory"
+    # memory 模式下task 数量及序列化后总字节数的上限，超过时淘汰最久未访问的task
+    TASK_STORE_MAX_TASKS: int = 100000
+    TASK_STORE_MAX_BYTES: int = 512 * 1024 * 1024
+    # memory 模式下非终态task 的过期时间，0 表示不过期
+    TASK_STORE_TTL_SECONDS: int = 0
+    # 每个task 保留的history 条数，0 表示不限制；配置 TASK_STORE_SPILL_DIR 时更早的history 转存到文件
+    TASK_STORE_MAX_HISTORY: int = 100
+    TASK_STORE_SPILL_DIR: str | None = None
+    TASK_STORE_TABLE: str = "tasks"
+    TASK_STORE_FLUSH_INTERVAL_SECONDS: float = 0.2
+    TASK_STORE_FLUSH_BATCH_SIZE: int = 200
+    # 终态task 在redis/memory 中的保留时间
+    TASK_STORE_TERMINAL_TTL_SECONDS: int = 24 * 60 * 60
+
+    # queue manager: memory / redis
+    QUEUE_MANAGER_TYPE: str = "memory"
+    QUEUE_STREAM_MAXLEN: int = 1000
+    QUEUE_STREAM_TTL_SECONDS: int = 60 * 60
+
+    # rate limiter: memory（单节点）/ redis（所有副本共享配额），限流规则见 AgentConfig.rate_limit
+    RATE_LIMITER_TYPE: str = "memory"
+    # redis 模式下每次预取的令牌数及本地令牌的有效期
+    RATE_LIMIT_PREFETCH: int = 5
+    RATE_LIMIT_PREFETCH_TTL_SECONDS: float = 1.0
+
+    # message/send 按调用方 + contextId + messageId 去重: memory（单节点LRU）/ redis（所有副本共享）/ 为空时关闭
+    MESSAGE_DEDUP_TYPE: str | None = None
+    MESSAGE_DEDUP_TTL_SECONDS: float = 10 * 60
+    MESSAGE_DEDUP_MAX_SIZE: int = 10000
+    # 执行中标记的有效期，持有的副本崩溃后，重试在过期后重新执行
+    MESSAGE_DEDUP_PENDING_TTL_SECONDS: float = 5 * 60
+
+    # agent 结果缓存（AgentConfig.memoization）: memory / redis（本地LRU + 所有副本共享的redis 层）
+    MEMOIZE_CACHE_TYPE: str = "memory"
+
+    # 非阻塞 message/send（configuration.blocking=false）的后台执行，见 server/background/scheduler.py
+    # 任务记录: memory（配置 BACKGROUND_JOB_STORE_PATH 时持久化到本地文件，否则只在内存中，重启后丢失）
+    # / redis / 为空时关闭，在请求进程中直接执行
+    BACKGROUND_JOB_STORE_TYPE: str | None = None
+    BACKGROUND_JOB_STORE_PATH: str | None = None
+    # redis 模式下区分副本，必须配置，且重启前后不变（如 StatefulSet 的pod 名称），否则重启前的任务无人接管
+    BACKGROUND_JOB_OWNER: str | None = None
+    BACKGROUND_WORKERS: int = 64
+    BACKGROUND_MAX_QUEUED: int = 10000
+    # 重启时已执行过该次数的任务标记为失败而不是重新执行
+    BACKGROUND_MAX_ATTEMPTS: int = 1
+
+    # push notification（tasks/pushNotificationConfig/*），由后台协程投递，见 server/push/dispatcher.py
+    # 推送地址由客户端指定，开启前应配置 PUSH_ALLOWED_HOSTS
+    PUSH_NOTIFICATION_ENABLED: bool = False
+    # 允许推送的主机名，"." 开头时匹配该域名及其子域名；为空时不限制
+    PUSH_ALLOWED_HOSTS: List[str] = []
+    PUSH_WORKERS: int = 8
+    PUSH_MAX_PENDING: int = 10000
+    # 同一task 在该时间内的多次状态更新只推送最后一次
+    PUSH_COALESCE_SECONDS: float = 0.1
+    PUSH_TIMEOUT_SECONDS: float = 10
+    PUSH_MAX_CONNECTIONS_PER_HOST: int = 10
+    PUSH_MAX_ATTEMPTS: int = 8
+    # 重试队列: memory（配置 PUSH_RETRY_QUEUE_PATH 时持久化到本地文件）/ redis（所有副本共享）
+    # 注意：重启后或由其他副本重试需要推送的token，token 以明文随失败的推送写入该文件（权限 0600）或redis，
+    # 需限制文件及redis 的访问；不能接受时保持 PUSH_RETRY_QUEUE_PATH 为空，重试队列只保存在内存中
+    PUSH_RETRY_QUEUE_TYPE: str = "memory"
+    PUSH_RETRY_QUEUE_PATH: str | None = None
+
+    # task/event 在redis 中的key 前缀
+    REDIS_KEY_PREFIX: str = "a2a"
+
+    # JSON-RPC 响应及SSE 事件使用快速序列化，见 server/a2a2/apps/jsonrpc/fast_json.py
+    JSON_FAST_PATH: bool = False
+
+    # 暴露 Prometheus 格式的 /metrics 端点
+    METRICS_ENABLED: bool = True
+    # /admin/profile/* 端点的 Bearer token，为空时不开放
+    ADMIN_TOKEN: str | None = None
+    PROFILE_MAX_SECONDS: float = 60
+    # 事件循环被阻塞超过该时长时记录调用栈及所属agent（启动心跳协程及watch 线程），0 表示关闭，排查时按需开启
+    LOOP_BLOCK_THRESHOLD_SECONDS: float = 0
+
+    # agent card 响应的 Cache-Control
+    AGENT_CARD_CACHE_CONTROL: str = "public, max-age=60"
+    EXTENDED_AGENT_CARD_CACHE_CONTROL: str = "private, no-cache"
+    # list_agents 单页最大条数
+    LIST_AGENTS_MAX_LIMIT: int = 1000
+
+    # 启动时预加载executor 的agent（namespace/name），"*" 表示全部，默认首次请求时才加载
+    AGENT_PREWARM: List[str] = []
+    # 缓存的executor 数量上限及空闲回收时间，0 表示不限制
+    AGENT_EXECUTOR_CACHE_SIZE: int = 256
+    AGENT_EXECUTOR_IDLE_SECONDS: int = 30 * 60
+
+    # 每个agent 默认的并发执行上限（0 表示不限制）、等待队列长度和最长等待时间
+    AGENT_MAX_CONCURRENCY: int = 0
+    AGENT_MAX_QUEUE: int = 100
+    AGENT_MAX_WAIT_SECONDS: float = 10
+    # 每个namespace 的并发执行上限，如 {"default": 100}
+    NAMESPACE_MAX_CONCURRENCY: Dict[str, int] = {}
 
 
 settings = Settings()
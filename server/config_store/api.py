@@ -1,56 +1,254 @@
+import hashlib
+import json
 import logging
+import time
 
-from typing import Dict, List
+from typing import Any, Dict, List, Sequence
 
 import httpx
 
-from server.common.model import AgentConfig, namespace_name
+from pydantic import ValidationError
+
+from server.common.model import AgentConfig, SyncOperation, namespace_name
 from server.config_store.base import AgentConfigStore
 from server.utils.map import extract_nested_data
+from server.utils.single_flight import SingleFlight
+from server.utils.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
 
 class APIAgentConfigStore(AgentConfigStore):
-    # todo 后续支持api方式获取agent config
-    def __init__(self, url: str, config_json_path: str = 'data', timeout: int = 10):
+    """从http api 获取agent config。
+
+    reload 使用长连接池和条件请求（If-None-Match/If-Modified-Since），304 时不做任何处理；
+    incremental=True 时携带 ?since=<version> 只拉取变更（sync_operation=delete 表示删除），
+    全量拉取时也只重新校验内容有变化的config，最后整体替换索引。
+    请求失败、全量结果为空或变更后的config 校验失败时保留原有的config；首次加载失败后 list 最多每
+    retry_interval 秒重试一次，不会在上游故障时放大请求。
+
+    配置了 item_url（如 http://host/agents/{namespace}/{name}）时 get 未命中会按需拉取单个config：
+    同一agent 的并发未命中只发起一次请求，不存在的agent 在 negative_ttl 内直接返回未找到。
+    """
+
+    def __init__(
+            self,
+            url: str,
+            config_json_path: str = 'data',
+            timeout: int = 10,
+            version_json_path: str = 'version',
+            incremental: bool = False,
+            max_connections: int = 10,
+            item_url: str | None = None,
+            item_json_path: str = 'data',
+            negative_ttl: float = 30,
+            negative_cache_size: int = 10000,
+            retry_interval: float = 5,
+    ):
         self.url = url
         self.config_json_path = config_json_path
+        self.version_json_path = version_json_path
         self.timeout = timeout
-        self._agent_config_cache: Dict[str, AgentConfig] = {}
-
-    async def list(self) -> List[AgentConfig]:
-        # 从http url 中获取agent config list
-        agent_configs = await self.read_url()
-        self._agent_config_cache = {agent_config.namespace_name: agent_config for agent_config in agent_configs}
-        return agent_configs
-
-    async def read_url(self) -> List[AgentConfig]:
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                response = await client.get(self.url)
-                response.raise_for_status()
-                raw_data = response.json()
-                agent_config_data = extract_nested_data(raw_data, self.config_json_path)
-                if not agent_config_data or not isinstance(agent_config_data, list):
-                    raise ValueError(f'No valid agent config data found in path {self.config_json_path}')
-                return [AgentConfig.parse_obj(config) for config in agent_config_data if config]
-            except httpx.HTTPError as e:
-                # 处理HTTP相关错误（连接超时、网络错误、状态码错误等）
-                logger.error(f'HTTP request failed: {str(e)}')
-            except ValueError as e:
-                # 处理JSON解析错误
-                logger.error(f'Failed to parse config response: {str(e)}')
-        return []
+        self.incremental = incremental
+        self.max_connections = max_connections
+        # 原始config 的摘要，用于跳过未变化config 的校验
+        self._raw_digests: Dict[str, str] = {}
+        self._client: httpx.AsyncClient | None = None
+        self._etag: str | None = None
+        self._last_modified: str | None = None
+        self._remote_version: str | None = None
+        self._loaded = False
+        self.retry_interval = retry_interval
+        self._retry_at = 0.0
+        self.item_url = item_url
+        self.item_json_path = item_json_path
+        self._not_found: TTLCache[str, bool] = TTLCache(negative_cache_size, negative_ttl)
+        self._single_flight: SingleFlight[AgentConfig | None] = SingleFlight()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+            )
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def list(self) -> Sequence[AgentConfig]:
+        if not self._loaded and time.monotonic() >= self._retry_at:
+            self._retry_at = time.monotonic() + self.retry_interval
+            await self.reload()
+        return await super().list()
+
+    async def reload(self) -> None:
+        since = self._remote_version if self.incremental and self._loaded else None
+        raw_data = await self.read_url(since)
+        if raw_data is None:
+            return
+        agent_config_data = extract_nested_data(raw_data, self.config_json_path)
+        if agent_config_data is None or not isinstance(agent_config_data, list):
+            logger.error(f'No valid agent config data found in path {self.config_json_path}')
+            return
+        if since is None:
+            if not agent_config_data:
+                # 与单条删除不同，全量结果为空更可能是上游故障，不清空已有的config
+                logger.error('Empty agent config list from config api, keep current agent configs')
+                return
+            self._apply_full(agent_config_data)
+        else:
+            self._apply_delta(agent_config_data)
+        version = extract_nested_data(raw_data, self.version_json_path) if isinstance(raw_data, dict) else None
+        self._remote_version = str(version) if version is not None else None
+        self._loaded = True
+
+    async def read_url(self, since: str | None = None) -> Any:
+        """请求config api，未变化（304）或失败时返回 None。"""
+        headers = {}
+        if self._etag:
+            headers['If-None-Match'] = self._etag
+        if self._last_modified:
+            headers['If-Modified-Since'] = self._last_modified
+        params = {'since': since} if since is not None else None
+        try:
+            response = await self.client.get(self.url, headers=headers, params=params)
+            if response.status_code == 304:
+                logger.debug('agent config not modified')
+                return None
+            response.raise_for_status()
+            raw_data = response.json()
+        except httpx.HTTPError as e:
+            # 处理HTTP相关错误（连接超时、网络错误、状态码错误等）
+            logger.error(f'HTTP request failed: {str(e)}')
+            return None
+        except ValueError as e:
+            # 处理JSON解析错误
+            logger.error(f'Failed to parse config response: {str(e)}')
+            return None
+        self._etag = response.headers.get('etag')
+        self._last_modified = response.headers.get('last-modified')
+        return raw_data
+
+    def _apply_full(self, agent_config_data: List[Dict[str, Any]]) -> None:
+        agent_configs: Dict[str, AgentConfig] = {}
+        digests: Dict[str, str] = {}
+        changed = 0
+        for config in agent_config_data:
+            if not config:
+                continue
+            namespace, name = config.get('namespace'), config.get('name')
+            if not isinstance(namespace, str) or not isinstance(name, str):
+                logger.error(f'Skip agent config without namespace or name: {config}')
+                continue
+            key = namespace_name(namespace, name)
+            digest = _digest(config)
+            current = self.snapshot.get(key)
+            if current is not None and self._raw_digests.get(key) == digest:
+                # 未变化，复用已校验的对象（card 缓存也随之复用）
+                agent_configs[key] = current
+                digests[key] = digest
+                continue
+            agent_config = _parse(config)
+            if agent_config is None:
+                if current is not None:
+                    # 变更后的config 无效，保留原有的config，下次reload 时重新校验
+                    logger.warning(f'keep previous agent config of {key}')
+                    agent_configs[key] = current
+                    if key in self._raw_digests:
+                        digests[key] = self._raw_digests[key]
+                continue
+            agent_configs[key] = agent_config
+            digests[key] = digest
+            changed += 1
+        removed = sum(1 for agent_config in self.snapshot.configs if agent_config.namespace_name not in agent_configs)
+        if changed or removed:
+            logger.info(f'agent config reloaded, {changed} changed, {removed} removed')
+            self.replace_all(agent_configs.values())
+            self._raw_digests = digests
+
+    def _apply_delta(self, agent_config_data: List[Dict[str, Any]]) -> None:
+        if not agent_config_data:
+            return
+        upserts: List[AgentConfig] = []
+        deletes: List[str] = []
+        digests = dict(self._raw_digests)
+        for config in agent_config_data:
+            agent_config = _parse(config) if config else None
+            if agent_config is None:
+                continue
+            key = agent_config.namespace_name
+            if agent_config.sync_operation == SyncOperation.DELETE:
+                deletes.append(key)
+                digests.pop(key, None)
+            else:
+                upserts.append(agent_config)
+                digests[key] = _digest(config)
+        logger.info(f'agent config delta applied, {len(agent_config_data)} changes')
+        self._set_snapshot(self.snapshot.with_changes(upserts, deletes))
+        self._raw_digests = digests
 
     async def get(self, namespace: str, name: str) -> AgentConfig:
         _name = namespace_name(namespace, name)
-        if _name in self._agent_config_cache:
-            return self._agent_config_cache[_name]
-        raise ValueError(f'No agent config found for agent {namespace_name}')
+        agent_config = self.snapshot.get(_name)
+        if agent_config is not None:
+            return agent_config
+        if self.item_url and _name not in self._not_found:
+            item_url = self.item_url
+            agent_config = await self._single_flight.do(_name, lambda: self._fetch_one(item_url, namespace, name))
+            if agent_config is not None:
+                return agent_config
+        raise ValueError(f'No agent config found for agent {_name}')
+
+    async def _fetch_one(self, item_url: str, namespace: str, name: str) -> AgentConfig | None:
+        _name = namespace_name(namespace, name)
+        try:
+            response = await self.client.get(item_url.format(namespace=namespace, name=name))
+            if response.status_code == 404:
+                self._not_found.set(_name, True)
+                return None
+            response.raise_for_status()
+            config = extract_nested_data(response.json(), self.item_json_path) if self.item_json_path \
+                else response.json()
+        except httpx.HTTPError as e:
+            # 上游异常不做negative cache，并发请求已由single flight 合并
+            logger.error(f'HTTP request failed: {str(e)}')
+            return None
+        except ValueError as e:
+            logger.error(f'Failed to parse config response: {str(e)}')
+            return None
+        agent_config = _parse(config) if isinstance(config, dict) else None
+        if agent_config is None or agent_config.namespace_name != _name:
+            self._not_found.set(_name, True)
+            return None
+        # 请求期间 reload/notifier 可能已经写入
+        existing = self.snapshot.get(_name)
+        if existing is not None:
+            return existing
+        await self.upsert(agent_config)
+        return agent_config
 
     async def upsert(self, agent_config: AgentConfig):
-        self._agent_config_cache[agent_config.namespace_name] = agent_config
+        await super().upsert(agent_config)
+        self._raw_digests.pop(agent_config.namespace_name, None)
+        self._not_found.pop(agent_config.namespace_name)
 
     async def delete(self, agent_config: AgentConfig):
-        del self._agent_config_cache[agent_config.namespace_name]
+        await super().delete(agent_config)
+        self._raw_digests.pop(agent_config.namespace_name, None)
+
+
+def _digest(config: Dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(config, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
+def _parse(config: Dict[str, Any]) -> AgentConfig | None:
+    try:
+        return AgentConfig.model_validate(config)
+    except ValidationError as e:
+        logger.error(f'Failed to parse AgentConfig: {str(e)}')
+        return None
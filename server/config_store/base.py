@@ -1,21 +1,73 @@
+import logging
+
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Callable, Iterable, List, Sequence, Tuple
+
+from server.common.model import AgentConfig, SyncOperation, namespace_name
+from server.config_store.snapshot import AgentConfigSnapshot
 
-from server.common.model import AgentConfig, SyncOperation
+logger = logging.getLogger(__name__)
 
 
 class AgentConfigStore(ABC):
-    @abstractmethod
-    async def list(self) -> List[AgentConfig]:
-        pass
+    """agent config 存储，所有读请求都基于当前的不可变快照。
+
+    upsert/delete/reload 生成新快照后整体替换，读者无需加锁，get 为一次dict 查找。
+    快照替换后依次回调 add_listener 注册的监听者（如 executor 缓存失效）。
+    """
+    _snapshot: AgentConfigSnapshot = AgentConfigSnapshot()
+    _listeners: Tuple[Callable[[AgentConfigSnapshot], None], ...] = ()
+
+    @property
+    def snapshot(self) -> AgentConfigSnapshot:
+        return self._snapshot
+
+    def add_listener(self, listener: Callable[[AgentConfigSnapshot], None]) -> None:
+        self._listeners = self._listeners + (listener,)
+
+    def _set_snapshot(self, snapshot: AgentConfigSnapshot) -> None:
+        self._snapshot = snapshot
+        for listener in self._listeners:
+            try:
+                listener(snapshot)
+            except Exception as e:
+                logger.error(f'agent config listener failed: {str(e)}')
+
+    @property
+    def version(self) -> int:
+        # 配置每变更一次（upsert/delete/reload）递增，用于 list 的 ETag
+        return self._snapshot.version
+
+    async def list(self) -> Sequence[AgentConfig]:
+        return self._snapshot.configs
+
+    async def list_namespace(self, namespace: str) -> Sequence[AgentConfig]:
+        return self._snapshot.namespace(namespace)
+
+    async def query(
+            self,
+            namespace: str | None = None,
+            name_prefix: str | None = None,
+            after: str | None = None,
+            limit: int | None = None,
+    ) -> Tuple[List[AgentConfig], str | None]:
+        """按 namespace_name 排序的游标分页查询。
+
+        Returns:
+            (agent_configs, next_after)，next_after 为 None 表示没有下一页
+        """
+        return self._snapshot.query(namespace, name_prefix, after, limit)
 
     @abstractmethod
     async def reload(self) -> None:
         pass
 
-    @abstractmethod
     async def get(self, namespace: str, name: str) -> AgentConfig:
-        pass
+        _name = namespace_name(namespace, name)
+        agent_config = self._snapshot.get(_name)
+        if agent_config is None:
+            raise ValueError(f'No agent config found for agent {_name}')
+        return agent_config
 
     async def sync_agent_config(self, agent_config: AgentConfig) -> None:
         if not agent_config.sync_operation:
@@ -25,10 +77,14 @@ class AgentConfigStore(ABC):
         elif agent_config.sync_operation == SyncOperation.DELETE:
             await self.delete(agent_config)
 
-    @abstractmethod
     async def upsert(self, agent_config: AgentConfig) -> None:
-        pass
+        self._set_snapshot(self._snapshot.with_changes(upserts=[agent_config]))
 
-    @abstractmethod
     async def delete(self, agent_config: AgentConfig) -> None:
-        pass
+        if self._snapshot.get(agent_config.namespace_name) is None:
+            logger.debug(f'agent config {agent_config.namespace_name} not found, skip delete')
+            return
+        self._set_snapshot(self._snapshot.with_changes(deletes=[agent_config.namespace_name]))
+
+    def replace_all(self, agent_configs: Iterable[AgentConfig]) -> None:
+        self._set_snapshot(AgentConfigSnapshot(agent_configs, self._snapshot.version + 1))
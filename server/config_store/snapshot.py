@@ -0,0 +1,86 @@
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Tuple
+
+from server.common.model import AgentConfig, namespace_name
+
+
+class AgentConfigSnapshot:
+    """agent config 的不可变快照。
+
+    按 namespace_name 排序，并维护 namespace 二级索引；读者直接持有快照无需加锁，
+    写者通过 with_changes 生成新快照后整体替换。
+    """
+    __slots__ = ('version', 'configs', '_keys', '_by_name', '_by_namespace')
+
+    def __init__(self, agent_configs: Iterable[AgentConfig] = (), version: int = 0) -> None:
+        by_name = {agent_config.namespace_name: agent_config for agent_config in agent_configs}
+        self._init(by_name, sorted(by_name), version)
+
+    def _init(self, by_name: Dict[str, AgentConfig], keys: List[str], version: int) -> None:
+        self.version = version
+        self._by_name = by_name
+        self._keys = keys
+        self.configs: Tuple[AgentConfig, ...] = tuple(by_name[key] for key in keys)
+        by_namespace: Dict[str, List[AgentConfig]] = {}
+        for agent_config in self.configs:
+            by_namespace.setdefault(agent_config.namespace, []).append(agent_config)
+        self._by_namespace = {namespace: tuple(configs) for namespace, configs in by_namespace.items()}
+
+    def get(self, key: str) -> AgentConfig | None:
+        return self._by_name.get(key)
+
+    def namespace(self, namespace: str) -> Tuple[AgentConfig, ...]:
+        return self._by_namespace.get(namespace, ())
+
+    def with_changes(
+            self,
+            upserts: Iterable[AgentConfig] = (),
+            deletes: Iterable[str] = (),
+    ) -> 'AgentConfigSnapshot':
+        by_name = dict(self._by_name)
+        keys = list(self._keys)
+        for key in deletes:
+            if by_name.pop(key, None) is not None:
+                del keys[bisect_left(keys, key)]
+        for agent_config in upserts:
+            key = agent_config.namespace_name
+            if key not in by_name:
+                keys.insert(bisect_left(keys, key), key)
+            by_name[key] = agent_config
+        snapshot = AgentConfigSnapshot.__new__(AgentConfigSnapshot)
+        snapshot._init(by_name, keys, self.version + 1)
+        return snapshot
+
+    def query(
+            self,
+            namespace: str | None = None,
+            name_prefix: str | None = None,
+            after: str | None = None,
+            limit: int | None = None,
+    ) -> Tuple[List[AgentConfig], str | None]:
+        if namespace is not None:
+            # namespace 内按 name 有序，直接二分定位起点
+            configs = self._by_namespace.get(namespace, ())
+            start = bisect_left(configs, namespace_name(namespace, name_prefix or ''),
+                                key=lambda agent_config: agent_config.namespace_name)
+            if after is not None:
+                start = max(start, bisect_right(configs, after, key=lambda agent_config: agent_config.namespace_name))
+        else:
+            configs = self.configs
+            start = bisect_right(self._keys, after) if after is not None else 0
+
+        result: List[AgentConfig] = []
+        for i in range(start, len(configs)):
+            agent_config = configs[i]
+            if name_prefix is not None and not agent_config.name.startswith(name_prefix):
+                if namespace is not None:
+                    # 同一namespace 内前缀匹配的是连续区间
+                    break
+                continue
+            if limit is not None and len(result) == limit:
+                return result, result[-1].namespace_name
+            result.append(agent_config)
+        return result, None
+
+    def __len__(self) -> int:
+        return len(self.configs)
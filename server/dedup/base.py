@@ -0,0 +1,36 @@
+import uuid
+
+from abc import ABC, abstractmethod
+
+# 执行中的标记，带上唯一后缀以便只释放自己写入的标记
+PENDING_PREFIX = 'pending:'
+
+
+def new_pending() -> str:
+    return f'{PENDING_PREFIX}{uuid.uuid4().hex}'
+
+
+def is_pending(value: str) -> bool:
+    return value.startswith(PENDING_PREFIX)
+
+
+class DedupStore(ABC):
+    """message/send 去重记录，值为执行中的标记或序列化后的结果（Task/Message）。"""
+
+    @abstractmethod
+    async def claim(self, key: str, pending: str, ttl: float) -> str | None:
+        """key 不存在时写入执行中标记 pending 并返回 None，由调用方执行；否则返回已有的值。"""
+        pass
+
+    @abstractmethod
+    async def get(self, key: str) -> str | None:
+        pass
+
+    @abstractmethod
+    async def complete(self, key: str, result: str, ttl: float) -> None:
+        pass
+
+    @abstractmethod
+    async def release(self, key: str, pending: str) -> None:
+        """执行失败时删除自己写入的执行中标记，之后的重试会重新执行。"""
+        pass
@@ -0,0 +1,79 @@
+import asyncio
+import logging
+
+from typing import Awaitable, Callable, Tuple
+
+from a2a.types import Message, Task
+
+from server.common.events import dump_event, parse_event
+from server.dedup.base import DedupStore, is_pending, new_pending
+from server.metrics.runtime import MESSAGE_DEDUP
+from server.utils.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+SendResult = Message | Task
+
+
+class MessageDeduplicator:
+    """message/send 按key（namespace/name + 调用方 + contextId + messageId）去重，客户端超时重试时不再重新执行agent。
+
+    - 本副本上同一key 正在执行时，重试等待同一次执行的结果
+    - 其他副本正在执行时（store 中为执行中标记），轮询直到结果写入或标记过期
+    - ttl 内已完成时直接返回保存的结果；执行失败不保存，重试会重新执行
+    """
+
+    def __init__(
+            self,
+            store: DedupStore,
+            ttl: float = 600,
+            pending_ttl: float = 300,
+            poll_interval: float = 0.2,
+    ) -> None:
+        self.store = store
+        self.ttl = ttl
+        # 执行中标记的有效期，持有者崩溃后重试可以在过期后重新执行
+        self.pending_ttl = pending_ttl
+        self.poll_interval = poll_interval
+        self._flight: SingleFlight[Tuple[SendResult, bool]] = SingleFlight()
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[SendResult]]) -> Tuple[SendResult, bool]:
+        """Returns: (结果, 是否来自之前保存的结果)"""
+        attached = key in self._flight
+        # 首个请求被取消时执行继续进行，直到等待同一key 的请求全部取消
+        result = await self._flight.do(key, lambda: self._run(key, fn))
+        if attached:
+            MESSAGE_DEDUP.inc('attached')
+        return result
+
+    async def _run(self, key: str, fn: Callable[[], Awaitable[SendResult]]) -> Tuple[SendResult, bool]:
+        waited = False
+        while True:
+            pending = new_pending()
+            value = await self.store.claim(key, pending, self.pending_ttl)
+            if value is None:
+                return await self._execute(key, pending, fn), False
+            if not is_pending(value):
+                MESSAGE_DEDUP.inc('waited' if waited else 'replayed')
+                return _parse_result(value), True
+            # 其他副本正在执行
+            waited = True
+            while (value := await self.store.get(key)) is not None and is_pending(value):
+                await asyncio.sleep(self.poll_interval)
+
+    async def _execute(self, key: str, pending: str, fn: Callable[[], Awaitable[SendResult]]) -> SendResult:
+        MESSAGE_DEDUP.inc('executed')
+        try:
+            result = await fn()
+        except BaseException:
+            await asyncio.shield(self.store.release(key, pending))
+            raise
+        await self.store.complete(key, dump_event(result), self.ttl)
+        return result
+
+
+def _parse_result(value: str) -> SendResult:
+    result = parse_event(value)
+    if not isinstance(result, (Message, Task)):
+        raise ValueError(f'Invalid message/send result: {result.kind}')
+    return result
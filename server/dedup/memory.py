@@ -0,0 +1,25 @@
+from server.dedup.base import DedupStore
+from server.utils.ttl_cache import TTLCache
+
+
+class LocalDedupStore(DedupStore):
+    """单节点的LRU 去重记录，超过 maxsize 时淘汰最久未使用的记录。"""
+
+    def __init__(self, maxsize: int = 10000) -> None:
+        self._cache: TTLCache[str, str] = TTLCache(maxsize, 0)
+
+    async def claim(self, key: str, pending: str, ttl: float) -> str | None:
+        value = self._cache.get(key)
+        if value is None:
+            self._cache.set(key, pending, ttl)
+        return value
+
+    async def get(self, key: str) -> str | None:
+        return self._cache.get(key)
+
+    async def complete(self, key: str, result: str, ttl: float) -> None:
+        self._cache.set(key, result, ttl)
+
+    async def release(self, key: str, pending: str) -> None:
+        if self._cache.get(key) == pending:
+            self._cache.pop(key)
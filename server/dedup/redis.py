@@ -0,0 +1,68 @@
+import logging
+
+from redis.asyncio import Redis, RedisCluster
+from redis.exceptions import RedisError
+
+from server.dedup.base import DedupStore
+
+logger = logging.getLogger(__name__)
+
+# 只删除自己写入的执行中标记
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisDedupStore(DedupStore):
+    """多副本共享的去重记录，重试落到其他副本时也能复用结果。
+
+    redis 不可用时不去重，请求照常执行。
+    """
+
+    def __init__(self, client: Redis | RedisCluster, key_prefix: str = 'a2a') -> None:
+        self.client = client
+        self.key_prefix = key_prefix
+        self._release = client.register_script(_RELEASE_SCRIPT)  # type: ignore[misc]
+
+    def _key(self, key: str) -> str:
+        return f'{self.key_prefix}:dedup:{key}'
+
+    async def claim(self, key: str, pending: str, ttl: float) -> str | None:
+        try:
+            while True:
+                if await self.client.set(self._key(key), pending, nx=True, px=int(ttl * 1000)):
+                    return None
+                value = await self.client.get(self._key(key))
+                # 两次调用之间记录恰好过期时重新抢占
+                if value is not None:
+                    return _decode(value)
+        except RedisError as e:
+            logger.warning(f'Failed to claim dedup key {key}, execute without dedup: {str(e)}')
+            return None
+
+    async def get(self, key: str) -> str | None:
+        try:
+            value = await self.client.get(self._key(key))
+        except RedisError as e:
+            logger.warning(f'Failed to get dedup key {key}: {str(e)}')
+            return None
+        return _decode(value) if value is not None else None
+
+    async def complete(self, key: str, result: str, ttl: float) -> None:
+        try:
+            await self.client.set(self._key(key), result, px=int(ttl * 1000))
+        except RedisError as e:
+            logger.warning(f'Failed to save dedup result of {key}: {str(e)}')
+
+    async def release(self, key: str, pending: str) -> None:
+        try:
+            await self._release(keys=[self._key(key)], args=[pending])
+        except RedisError as e:
+            logger.warning(f'Failed to release dedup key {key}: {str(e)}')
+
+
+def _decode(value: bytes | str) -> str:
+    return value.decode() if isinstance(value, bytes) else value
@@ -0,0 +1,44 @@
+# 根据配置返回 SQLAlchemy AsyncEngine（带连接池上限）
+import logging
+
+from typing import Any, Dict
+
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from server.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseConfig(BaseModel):
+    url: str
+    echo: bool = False
+    pool_size: int = 10
+    max_overflow: int = 10
+    pool_timeout: int = 30
+    pool_recycle: int = 3600
+
+    @classmethod
+    def from_settings(cls) -> "DatabaseConfig":
+        return cls(
+            url=settings.SQLALCHEMY_DATABASE_URL,
+            echo=settings.DB_ECHO,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+
+
+def get_async_engine(config: DatabaseConfig) -> AsyncEngine:
+    kwargs: Dict[str, Any] = {'echo': config.echo, 'pool_pre_ping': True}
+    # sqlite（测试用）不走队列连接池参数
+    if not config.url.startswith('sqlite'):
+        kwargs.update(
+            pool_size=config.pool_size,
+            max_overflow=config.max_overflow,
+            pool_timeout=config.pool_timeout,
+            pool_recycle=config.pool_recycle,
+        )
+    return create_async_engine(config.url, **kwargs)
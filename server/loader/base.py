@@ -1,8 +1,11 @@
 from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Iterable
 
 from a2a.server.agent_execution import AgentExecutor
 
 from server.common.model import AgentConfig
+from server.config_store.snapshot import AgentConfigSnapshot
 
 
 class AgentLoader(ABC):
@@ -10,3 +13,18 @@ class AgentLoader(ABC):
     def load_executor(self, agent_config: AgentConfig) -> AgentExecutor:
         pass
 
+    @asynccontextmanager
+    async def use(self, agent_config: AgentConfig) -> AsyncIterator[AgentExecutor]:
+        """在执行期间持有executor，期间不会被回收。"""
+        yield self.load_executor(agent_config)
+
+    def prewarm(self, agent_configs: Iterable[AgentConfig]) -> None:
+        """启动时提前加载指定agent 的executor。"""
+        pass
+
+    def retain(self, snapshot: AgentConfigSnapshot) -> None:
+        """agent config 变更后回调，释放已删除或已变更agent 的executor。"""
+        pass
+
+    async def close(self) -> None:
+        pass
@@ -0,0 +1,148 @@
+import asyncio
+import inspect
+import logging
+import time
+
+from collections import OrderedDict
+from typing import Set
+
+from a2a.server.agent_execution import AgentExecutor
+
+from server.common.model import AgentConfig
+from server.config_store.snapshot import AgentConfigSnapshot
+from server.metrics.runtime import EXECUTOR_CACHE, EXECUTOR_EVICTIONS
+
+logger = logging.getLogger(__name__)
+
+
+def _same_config(a: AgentConfig, b: AgentConfig) -> bool:
+    # 重新加载的snapshot 中未变更的config 是新对象，按值比较
+    return a is b or a == b
+
+
+class CachedExecutor:
+    __slots__ = ('agent_config', 'executor', 'last_used', 'in_use', 'evicted')
+
+    def __init__(self, agent_config: AgentConfig, executor: AgentExecutor) -> None:
+        self.agent_config = agent_config
+        self.executor = executor
+        self.last_used = time.monotonic()
+        self.in_use = 0
+        self.evicted = False
+
+
+class ExecutorCache:
+    """有界的executor 缓存。
+
+    超过 max_size 时淘汰最久未使用的executor，空闲超过 idle_seconds 的executor 在下次访问缓存时淘汰；
+    agent config 被删除或变更后对应的executor 同样失效。被淘汰的executor 如果定义了 close()（同步或异步），
+    会在没有请求使用它之后调用。max_size/idle_seconds 为 0 表示不限制。
+    """
+
+    def __init__(self, max_size: int = 0, idle_seconds: float = 0) -> None:
+        self.max_size = max_size
+        self.idle_seconds = idle_seconds
+        self._entries: OrderedDict[str, CachedExecutor] = OrderedDict()
+        self._closing: Set[asyncio.Task] = set()
+
+    def get(self, agent_config: AgentConfig) -> CachedExecutor | None:
+        self.evict_idle()
+        key = agent_config.namespace_name
+        entry = self._entries.get(key)
+        if entry is None:
+            EXECUTOR_CACHE.inc('miss')
+            return None
+        if not _same_config(entry.agent_config, agent_config):
+            logger.info(f'agent config of {key} changed, evict executor')
+            self.evict(key)
+            EXECUTOR_CACHE.inc('miss')
+            return None
+        EXECUTOR_CACHE.inc('hit')
+        entry.last_used = time.monotonic()
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, agent_config: AgentConfig, executor: AgentExecutor) -> CachedExecutor:
+        key = agent_config.namespace_name
+        self.evict(key)
+        entry = CachedExecutor(agent_config, executor)
+        self._entries[key] = entry
+        while self.max_size and len(self._entries) > self.max_size:
+            oldest = next(iter(self._entries))
+            logger.info(f'executor cache is full, evict executor of {oldest}')
+            self.evict(oldest)
+        return entry
+
+    def release(self, entry: CachedExecutor) -> None:
+        entry.in_use -= 1
+        entry.last_used = time.monotonic()
+        if entry.evicted:
+            if entry.in_use == 0:
+                self._close(entry)
+            return
+        # 保持按最近使用时间有序，evict_idle 依赖该顺序
+        self._entries.move_to_end(entry.agent_config.namespace_name)
+
+    def evict(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        EXECUTOR_EVICTIONS.inc()
+        entry.evicted = True
+        if entry.in_use == 0:
+            self._close(entry)
+
+    def evict_idle(self) -> None:
+        if not self.idle_seconds:
+            return
+        deadline = time.monotonic() - self.idle_seconds
+        for key, entry in list(self._entries.items()):
+            # 按最近使用时间有序
+            if entry.last_used > deadline:
+                break
+            if entry.in_use == 0:
+                logger.info(f'executor of {key} idle for {self.idle_seconds}s, evict')
+                self.evict(key)
+
+    def retain(self, snapshot: AgentConfigSnapshot) -> None:
+        """淘汰已删除或config 已变更的agent 的executor。"""
+        for key, entry in list(self._entries.items()):
+            agent_config = snapshot.get(key)
+            if agent_config is None or not _same_config(entry.agent_config, agent_config):
+                self.evict(key)
+
+    async def close(self) -> None:
+        for key in list(self._entries):
+            self.evict(key)
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _close(self, entry: CachedExecutor) -> None:
+        close = getattr(entry.executor, 'close', None)
+        if close is None:
+            return
+        name = entry.agent_config.namespace_name
+        try:
+            result = close()
+        except Exception as e:
+            logger.error(f'Failed to close executor of {name}: {str(e)}')
+            return
+        if not inspect.isawaitable(result):
+            return
+        try:
+            task = asyncio.ensure_future(result, loop=asyncio.get_running_loop())
+        except RuntimeError:
+            logger.warning(f'No running event loop, skip closing executor of {name}')
+            if inspect.iscoroutine(result):
+                result.close()
+            return
+        self._closing.add(task)
+        task.add_done_callback(self._on_closed)
+
+    def _on_closed(self, task: asyncio.Task) -> None:
+        self._closing.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f'Failed to close executor: {str(task.exception())}')
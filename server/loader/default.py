@@ -1,34 +1,92 @@
-from typing import Dict
+import logging
+import time
+
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Iterable
 
 from a2a.server.agent_execution import AgentExecutor
 
-from agent.helloworld.agent_executor import HelloWorldAgentExecutor
-from agent.travel.travel_executor import TravelExecutor
-from agent.weather.weather_executor import WeatherExecutor
 from server.common.model import AgentConfig
+from server.config_store.snapshot import AgentConfigSnapshot
+from server.loader import registry
 from server.loader.base import AgentLoader
+from server.loader.cache import CachedExecutor, ExecutorCache
+from server.loader.process_pool import ProcessPoolAgentExecutor
+
+logger = logging.getLogger(__name__)
+
+# 内置agent，首次使用时才import
+_BUILTIN_EXECUTORS = {
+    'default/helloworld': 'agent.helloworld.agent_executor:HelloWorldAgentExecutor',
+    'default/weather': 'agent.weather.weather_executor:WeatherExecutor',
+    'default/travel': 'agent.travel.travel_executor:TravelExecutor',
+}
 
 
 class DefaultAgentLoader(AgentLoader):
-    # todo 后续支持扫描目录自动初始化
-    # todo 也可以agent目录实现一个agent后，自动加注解，自动注册
-    def __init__(self, ) -> None:
-        self._agent_cache: Dict[str, AgentExecutor] = {}
+    """按以下顺序解析agent 的executor，均在首次使用时才import：
+
+    1. AgentConfig.executor（module:attr）
+    2. register_executor 装饰器或 a2a_runtime.executors entry_points
+    3. 内置agent
+
+    加载后的executor 放在有界缓存中，见 ExecutorCache；配置了 process_isolation 的agent
+    运行在独立的worker 进程池中，见 ProcessPoolAgentExecutor。
+    """
+
+    def __init__(self, max_size: int = 0, idle_seconds: float = 0) -> None:
+        self._agent_cache = ExecutorCache(max_size, idle_seconds)
+        # namespace_name -> import+实例化耗时（秒）
+        self.load_seconds: Dict[str, float] = {}
 
     def load_executor(self, agent_config: AgentConfig) -> AgentExecutor:
-        if agent_config.namespace_name in self._agent_cache:
-            return self._agent_cache[agent_config.namespace_name]
-        if agent_config.namespace_name == 'default/helloworld':
-            executor = HelloWorldAgentExecutor()
-            self._agent_cache[agent_config.namespace_name] = executor
-            return executor
-        elif agent_config.namespace_name == 'default/weather':
-            executor = WeatherExecutor()
-            self._agent_cache[agent_config.namespace_name] = executor
-            return executor
-        elif agent_config.namespace_name == 'default/travel':
-            executor = TravelExecutor()
-            self._agent_cache[agent_config.namespace_name] = executor
-            return executor
-
-        raise ValueError(f'No agent executor found for agent {agent_config.namespace_name}')
+        return self._load(agent_config).executor
+
+    @asynccontextmanager
+    async def use(self, agent_config: AgentConfig) -> AsyncIterator[AgentExecutor]:
+        entry = self._load(agent_config)
+        entry.in_use += 1
+        try:
+            yield entry.executor
+        finally:
+            self._agent_cache.release(entry)
+
+    def retain(self, snapshot: AgentConfigSnapshot) -> None:
+        self._agent_cache.retain(snapshot)
+
+    async def close(self) -> None:
+        await self._agent_cache.close()
+
+    def _load(self, agent_config: AgentConfig) -> CachedExecutor:
+        entry = self._agent_cache.get(agent_config)
+        if entry is not None:
+            return entry
+        target = agent_config.executor or registry.lookup(agent_config.namespace_name) \
+            or _BUILTIN_EXECUTORS.get(agent_config.namespace_name)
+        if target is None:
+            raise ValueError(f'No agent executor found for agent {agent_config.namespace_name}')
+
+        start = time.perf_counter()
+        executor: AgentExecutor
+        if agent_config.process_isolation is not None:
+            # 父进程不import agent 模块，由worker 进程加载
+            ref = target if isinstance(target, str) else f'{target.__module__}:{target.__qualname__}'
+            executor = ProcessPoolAgentExecutor(ref, agent_config.process_isolation)
+        else:
+            factory = registry.import_ref(target) if isinstance(target, str) else target
+            # 引用可能指向任意对象，实例化前检查，避免调用非executor 的函数
+            if not (isinstance(factory, type) and issubclass(factory, AgentExecutor)):
+                raise ValueError(f'{target} of agent {agent_config.namespace_name} is not an AgentExecutor')
+            executor = factory()
+        elapsed = time.perf_counter() - start
+        self.load_seconds[agent_config.namespace_name] = elapsed
+        logger.info(f'agent executor of {agent_config.namespace_name} loaded in {elapsed * 1000:.1f}ms')
+        return self._agent_cache.put(agent_config, executor)
+
+    def prewarm(self, agent_configs: Iterable[AgentConfig]) -> None:
+        """提前加载指定agent，加载失败只记录日志。"""
+        for agent_config in agent_configs:
+            try:
+                self.load_executor(agent_config)
+            except Exception as e:
+                logger.error(f'Failed to prewarm agent {agent_config.namespace_name}: {str(e)}')
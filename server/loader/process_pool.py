@@ -0,0 +1,324 @@
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import os
+
+from multiprocessing.connection import Connection
+from typing import Any, Dict, Tuple
+
+from a2a.server.agent_execution import AgentExecutor, RequestContext
+from a2a.server.context import ServerCallContext
+from a2a.server.events import Event, EventQueue
+from a2a.types import MessageSendParams, Task
+
+from server.common.events import dump_event, parse_event
+from server.common.model import ProcessIsolation
+
+logger = logging.getLogger(__name__)
+
+# 父进程 -> worker: (op, call_id, payload)，op 为 execute/cancel/exit
+# worker -> 父进程: (op, call_id, payload)，op 为 event/done
+_OP_EXECUTE = 'execute'
+_OP_CANCEL = 'cancel'
+_OP_EXIT = 'exit'
+_OP_EVENT = 'event'
+_OP_DONE = 'done'
+
+# 被中止的worker 退出的等待时间，超时后kill
+_ABORT_GRACE_SECONDS = 1
+
+
+class ProcessPoolAgentExecutor(AgentExecutor):
+    """在独立的worker 进程池中运行agent executor，CPU 密集或不可信的agent 不会阻塞主进程的事件循环。
+
+    RequestContext 序列化后发往worker，worker 中产生的事件经pipe 回传到父进程的 EventQueue；
+    cancel 转发到正在执行该task 的worker；父进程中execute 被取消时worker 中的执行可能仍在进行，
+    该worker 不再放回进程池，而是停止（超过 _ABORT_GRACE_SECONDS 后kill），由后续的 _acquire 补充新的worker。
+    worker 执行 max_tasks_per_worker 个task 后退出重建，并可通过rlimit 限制内存和CPU 时间。
+    """
+
+    def __init__(self, executor_ref: str, isolation: ProcessIsolation) -> None:
+        self.executor_ref = executor_ref
+        self.isolation = isolation
+        self._mp = multiprocessing.get_context('spawn')
+        self._idle: asyncio.Queue[_Worker | None] | None = None
+        self._workers: set[_Worker] = set()
+        # task_id -> 正在执行该task 的worker
+        self._running: Dict[str, _Worker] = {}
+        self._spawn_lock = asyncio.Lock()
+        self._stopping: set[asyncio.Task] = set()
+        self._closed = False
+
+    async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
+        worker = await self._acquire()
+        if context.task_id:
+            self._running[context.task_id] = worker
+        try:
+            await worker.call(_OP_EXECUTE, _dump_context(context), event_queue)
+        except asyncio.CancelledError:
+            worker.aborted = True
+            raise
+        finally:
+            if context.task_id:
+                self._running.pop(context.task_id, None)
+            worker.tasks += 1
+            self._release(worker)
+
+    async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
+        worker = self._running.get(context.task_id) if context.task_id else None
+        if worker is not None and worker.alive:
+            # 与execute 在同一个worker 中执行，agent 可以访问自己的执行状态
+            await worker.call(_OP_CANCEL, _dump_context(context), event_queue)
+            return
+        worker = await self._acquire()
+        try:
+            await worker.call(_OP_CANCEL, _dump_context(context), event_queue)
+        except asyncio.CancelledError:
+            worker.aborted = True
+            raise
+        finally:
+            self._release(worker)
+
+    async def close(self) -> None:
+        self._closed = True
+        await asyncio.gather(*(worker.stop() for worker in list(self._workers)), return_exceptions=True)
+        self._workers.clear()
+        # 等待回收中的worker 退出
+        await asyncio.gather(*self._stopping, return_exceptions=True)
+
+    async def _acquire(self) -> '_Worker':
+        if self._closed:
+            raise RuntimeError(f'process pool of {self.executor_ref} is closed')
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+        while True:
+            if self._idle.empty() and len(self._workers) < self.isolation.workers:
+                async with self._spawn_lock:
+                    if len(self._workers) < self.isolation.workers:
+                        spawned = await asyncio.to_thread(_Worker.spawn, self._mp, self.executor_ref, self.isolation)
+                        self._workers.add(spawned)
+                        return spawned
+            worker = await self._idle.get()
+            if worker is None:
+                continue
+            if worker.alive:
+                return worker
+            self._workers.discard(worker)
+
+    def _release(self, worker: '_Worker') -> None:
+        # worker 都由 _acquire 取得，此时 _idle 已创建
+        assert self._idle is not None
+        max_tasks = self.isolation.max_tasks_per_worker
+        if worker.aborted or not worker.alive or self._closed or (max_tasks and worker.tasks >= max_tasks):
+            self._workers.discard(worker)
+            task = asyncio.create_task(worker.stop(_ABORT_GRACE_SECONDS if worker.aborted else 5))
+            self._stopping.add(task)
+            task.add_done_callback(self._stopping.discard)
+            # 唤醒一个等待者，由其补充新的worker
+            self._idle.put_nowait(None)
+            return
+        self._idle.put_nowait(worker)
+
+
+class _Worker:
+    """父进程中对一个worker 进程的封装，负责分发worker 回传的消息。"""
+
+    def __init__(self, process: multiprocessing.process.BaseProcess, conn: Connection) -> None:
+        self.process = process
+        self.conn = conn
+        self.tasks = 0
+        # 调用被取消，worker 中可能仍有未结束的执行
+        self.aborted = False
+        self._ids = itertools.count()
+        # call_id -> (event_queue, 完成信号)
+        self._calls: Dict[int, Tuple[EventQueue, asyncio.Future]] = {}
+        # spawn 在线程中执行，reader 在首次调用时于事件循环中创建
+        self._reader: asyncio.Task | None = None
+        # Connection 不是线程安全的，线程中的发送逐个进行
+        self._send_lock = asyncio.Lock()
+
+    @classmethod
+    def spawn(cls, mp: Any, executor_ref: str, isolation: ProcessIsolation) -> '_Worker':
+        parent_conn, child_conn = mp.Pipe()
+        process = mp.Process(
+            target=_worker_main,
+            args=(executor_ref, child_conn, isolation.memory_limit_mb, isolation.cpu_time_limit_seconds),
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        logger.info(f'process worker {process.pid} of {executor_ref} started')
+        return cls(process, parent_conn)
+
+    @property
+    def alive(self) -> bool:
+        return self.process.is_alive() and not self.conn.closed
+
+    async def call(self, op: str, payload: Dict[str, Any], event_queue: EventQueue) -> None:
+        if self._reader is None:
+            self._reader = asyncio.create_task(self._read())
+        call_id = next(self._ids)
+        done = asyncio.get_running_loop().create_future()
+        self._calls[call_id] = (event_queue, done)
+        try:
+            await self._send((op, call_id, payload))
+            await asyncio.shield(done)
+        finally:
+            self._calls.pop(call_id, None)
+
+    async def _send(self, message: Tuple[str, int | None, Any]) -> None:
+        # payload 较大时写满pipe 缓冲区会阻塞，在线程中发送
+        await self._send_lock.acquire()
+        sending = asyncio.get_running_loop().run_in_executor(None, self.conn.send, message)
+        # 调用方被取消时线程中的发送仍在进行，发送结束后才释放锁
+        sending.add_done_callback(self._sent)
+        await asyncio.shield(sending)
+
+    def _sent(self, sending: asyncio.Future) -> None:
+        self._send_lock.release()
+        if not sending.cancelled():
+            # 调用方已取消时由这里取出异常
+            sending.exception()
+
+    async def _read(self) -> None:
+        try:
+            while True:
+                op, call_id, payload = await _recv(self.conn)
+                call = self._calls.get(call_id)
+                if call is None:
+                    continue
+                event_queue, done = call
+                if op == _OP_EVENT:
+                    await event_queue.enqueue_event(parse_event(payload))
+                elif op == _OP_DONE and not done.done():
+                    if payload is None:
+                        done.set_result(None)
+                    else:
+                        done.set_exception(RuntimeError(payload))
+        except (EOFError, OSError):
+            pass
+        except Exception as e:
+            logger.error(f'Failed to read from process worker {self.process.pid}: {str(e)}')
+        for _, done in self._calls.values():
+            if not done.done():
+                done.set_exception(RuntimeError(f'process worker {self.process.pid} exited unexpectedly'))
+
+    async def stop(self, timeout: float = 5) -> None:
+        try:
+            await asyncio.wait_for(self._send((_OP_EXIT, None, None)), timeout)
+        except (asyncio.TimeoutError, OSError, ValueError):
+            pass
+        await asyncio.to_thread(self.process.join, timeout)
+        if self.process.is_alive():
+            logger.warning(f'process worker {self.process.pid} did not exit in {timeout}s, kill it')
+            self.process.kill()
+            await asyncio.to_thread(self.process.join, 1)
+        if self._reader is not None:
+            self._reader.cancel()
+        self.conn.close()
+        logger.info(f'process worker {self.process.pid} stopped after {self.tasks} tasks')
+
+
+class _PipeEventQueue(EventQueue):
+    """worker 进程中使用的队列，事件直接经pipe 回传父进程。"""
+
+    def __init__(self, conn: Connection, call_id: int) -> None:
+        super().__init__()
+        self.conn = conn
+        self.call_id = call_id
+
+    async def enqueue_event(self, event: Event) -> None:
+        self.conn.send((_OP_EVENT, self.call_id, dump_event(event)))
+
+
+def _dump_context(context: RequestContext) -> Dict[str, Any]:
+    state = context.call_context.state if context.call_context else {}
+    return {
+        'request': context._params.model_dump(mode='json', exclude_none=True) if context._params else None,
+        'task_id': context.task_id,
+        'context_id': context.context_id,
+        'task': context.current_task.model_dump(mode='json', exclude_none=True) if context.current_task else None,
+        # 只传递可序列化的部分
+        'headers': dict(state.get('headers', {})),
+        'method': state.get('method'),
+    }
+
+
+def _load_context(payload: Dict[str, Any]) -> RequestContext:
+    return RequestContext(
+        request=MessageSendParams.model_validate(payload['request']) if payload['request'] else None,
+        task_id=payload['task_id'],
+        context_id=payload['context_id'],
+        task=Task.model_validate(payload['task']) if payload['task'] else None,
+        call_context=ServerCallContext(state={'headers': payload['headers'], 'method': payload['method']}),
+    )
+
+
+async def _recv(conn: Connection) -> Any:
+    loop = asyncio.get_running_loop()
+    while not conn.poll():
+        readable: asyncio.Future[None] = loop.create_future()
+
+        def on_readable() -> None:
+            if not readable.done():
+                readable.set_result(None)
+
+        loop.add_reader(conn.fileno(), on_readable)
+        try:
+            await readable
+        finally:
+            loop.remove_reader(conn.fileno())
+    return conn.recv()
+
+
+def _worker_main(executor_ref: str, conn: Connection, memory_limit_mb: int, cpu_time_limit_seconds: int) -> None:
+    import resource
+
+    if memory_limit_mb:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if cpu_time_limit_seconds:
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_time_limit_seconds, cpu_time_limit_seconds))
+
+    from server.loader.registry import import_ref
+
+    factory = import_ref(executor_ref)
+    if not (isinstance(factory, type) and issubclass(factory, AgentExecutor)):
+        raise ValueError(f'{executor_ref} is not an AgentExecutor')
+    asyncio.run(_serve(factory(), conn))
+
+
+async def _serve(executor: AgentExecutor, conn: Connection) -> None:
+    calls: Dict[int, asyncio.Task] = {}
+
+    async def run(op: str, call_id: int, payload: Dict[str, Any]) -> None:
+        error = None
+        try:
+            context = _load_context(payload)
+            event_queue = _PipeEventQueue(conn, call_id)
+            if op == _OP_EXECUTE:
+                await executor.execute(context, event_queue)
+            else:
+                await executor.cancel(context, event_queue)
+        except asyncio.CancelledError:
+            error = 'execution aborted'
+        except Exception as e:
+            logger.exception(f'process worker {os.getpid()} failed to {op}')
+            error = f'{type(e).__name__}: {e}'
+        finally:
+            calls.pop(call_id, None)
+        conn.send((_OP_DONE, call_id, error))
+
+    while True:
+        try:
+            op, call_id, payload = await _recv(conn)
+        except EOFError:
+            break
+        if op == _OP_EXIT:
+            break
+        calls[call_id] = asyncio.create_task(run(op, call_id, payload))
+    for task in list(calls.values()):
+        task.cancel()
+    if calls:
+        await asyncio.gather(*calls.values(), return_exceptions=True)
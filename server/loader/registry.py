@@ -0,0 +1,61 @@
+import importlib
+import logging
+
+from importlib.metadata import entry_points
+from typing import Callable, Dict, Type, TypeVar
+
+from a2a.server.agent_execution import AgentExecutor
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = 'a2a_runtime.executors'
+
+E = TypeVar('E', bound=Type[AgentExecutor])
+
+# namespace_name -> executor 类或 'module:attr' 引用
+_registry: Dict[str, Type[AgentExecutor] | str] = {}
+_entry_points_loaded = False
+
+
+def register_executor(namespace_name: str) -> Callable[[E], E]:
+    """将executor 类注册到指定的 namespace/name 下。
+
+        @register_executor('default/helloworld')
+        class HelloWorldAgentExecutor(AgentExecutor): ...
+    """
+
+    def decorator(cls: E) -> E:
+        _registry[namespace_name] = cls
+        return cls
+
+    return decorator
+
+
+def register_executor_ref(namespace_name: str, ref: str) -> None:
+    """以 'module:attr' 的形式注册，首次使用时才import。"""
+    _registry[namespace_name] = ref
+
+
+def lookup(namespace_name: str) -> Type[AgentExecutor] | str | None:
+    _load_entry_points()
+    return _registry.get(namespace_name)
+
+
+def _load_entry_points() -> None:
+    # 只读取元数据不import，entry point 的 name 为 namespace/name，value 为 module:attr
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        _registry.setdefault(entry_point.name, entry_point.value)
+
+
+def import_ref(ref: str) -> object:
+    module_name, _, attr = ref.partition(':')
+    if not module_name or not attr:
+        raise ValueError(f'Invalid executor reference {ref}, expected module:attr')
+    target = importlib.import_module(module_name)
+    for part in attr.split('.'):
+        target = getattr(target, part)
+    return target
@@ -0,0 +1,14 @@
+from abc import ABC, abstractmethod
+from typing import List
+
+
+class ResultCache(ABC):
+    """agent 执行结果的缓存，值为按顺序序列化的事件。"""
+
+    @abstractmethod
+    async def get(self, agent: str, key: str) -> List[str] | None:
+        pass
+
+    @abstractmethod
+    async def set(self, agent: str, key: str, events: List[str], ttl: float, max_entries: int) -> None:
+        pass
@@ -0,0 +1,184 @@
+import hashlib
+import json
+import unicodedata
+import uuid
+
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List
+
+from a2a.server.agent_execution import RequestContext
+from a2a.server.events import Event, EventQueue
+from a2a.types import Message, Part, Task, TaskState, TaskStatus, TaskStatusUpdateEvent
+
+from server.common.events import dump_event, parse_event
+from server.common.model import AgentConfig, Memoization
+from server.memoize.base import ResultCache
+from server.memoize.memory import LocalResultCache
+from server.metrics.runtime import MEMO_HIT_RATIO, MEMO_REQUESTS
+
+
+class Memoizer:
+    """开启了 AgentConfig.memoization 的agent，相同输入直接重放缓存的事件序列，不经过loader 及executor。
+
+    缓存key 由归一化后的 message.parts 及 Memoization.metadata_keys 选中的metadata 计算；
+    属于已有task 的后续消息（结果依赖上下文）不缓存，只有以 completed 或 Message 结束的执行会被缓存。
+    本地为每个agent 独立的LRU，shared 的agent 同时读写 redis 层。
+    """
+
+    def __init__(self, local: LocalResultCache | None = None, shared: ResultCache | None = None) -> None:
+        self.local = local or LocalResultCache()
+        self.shared = shared
+        # agent -> [hits, misses]
+        self._stats: Dict[str, List[int]] = {}
+        MEMO_HIT_RATIO.set_callback(lambda: [
+            ((agent, ), hits / (hits + misses)) for agent, (hits, misses) in self._stats.items() if hits + misses
+        ])
+
+    async def execute(
+            self,
+            agent_config: AgentConfig,
+            memoization: Memoization,
+            context: RequestContext,
+            event_queue: EventQueue,
+            execute: Callable[[EventQueue], Awaitable[None]],
+    ) -> None:
+        """memoization 为 agent_config.memoization。"""
+        key = memo_key(agent_config, memoization, context)
+        if key is None:
+            await execute(event_queue)
+            return
+        agent = agent_config.namespace_name
+        events = await self._get(agent, memoization, key)
+        self._record(agent, events is not None)
+        if events is not None:
+            for data in events:
+                await event_queue.enqueue_event(_rebase(parse_event(data), context))
+            return
+        recorder = _RecordingEventQueue(event_queue)
+        await execute(recorder)
+        if recorder.events and _completed(parse_event(recorder.events[-1])):
+            await self._set(agent, memoization, key, recorder.events)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {
+            agent: {'hits': hits, 'misses': misses, 'hit_ratio': hits / (hits + misses) if hits + misses else 0.0}
+            for agent, (hits, misses) in self._stats.items()
+        }
+
+    async def _get(self, agent: str, memoization: Memoization, key: str) -> List[str] | None:
+        events = await self.local.get(agent, key)
+        if events is not None or self.shared is None or not memoization.shared:
+            return events
+        events = await self.shared.get(agent, key)
+        if events is not None:
+            await self.local.set(agent, key, events, memoization.ttl_seconds, memoization.max_entries)
+        return events
+
+    async def _set(self, agent: str, memoization: Memoization, key: str, events: List[str]) -> None:
+        await self.local.set(agent, key, events, memoization.ttl_seconds, memoization.max_entries)
+        if self.shared is not None and memoization.shared:
+            await self.shared.set(agent, key, events, memoization.ttl_seconds, memoization.max_entries)
+
+    def _record(self, agent: str, hit: bool) -> None:
+        MEMO_REQUESTS.inc(agent, 'hit' if hit else 'miss')
+        stats = self._stats.setdefault(agent, [0, 0])
+        stats[0 if hit else 1] += 1
+
+
+def memo_key(agent_config: AgentConfig, memoization: Memoization, context: RequestContext) -> str | None:
+    """不可缓存时返回 None。"""
+    message = context.message
+    if message is None or context.current_task is not None or message.reference_task_ids:
+        return None
+    metadata = message.metadata or {}
+    payload = {
+        'agent': agent_config.namespace_name,
+        # executor 或card 版本变更后不再命中旧结果
+        'executor': agent_config.executor,
+        'version': agent_config.card.get('version'),
+        'parts': [_normalize_part(part) for part in message.parts],
+        'metadata': {key: metadata[key] for key in memoization.metadata_keys if key in metadata},
+    }
+    data = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def _normalize_part(part: Part) -> Dict[str, Any]:
+    data = part.root.model_dump(mode='json', exclude_none=True)
+    data.pop('metadata', None)
+    if 'text' in data:
+        data['text'] = unicodedata.normalize('NFC', data['text']).strip()
+    return data
+
+
+def _completed(event: Event) -> bool:
+    if isinstance(event, Message):
+        return True
+    if isinstance(event, (Task, TaskStatusUpdateEvent)):
+        return event.status.state == TaskState.completed
+    return False
+
+
+def _rebase(event: Event, context: RequestContext) -> Event:
+    """缓存的事件属于首次执行的task，重放前替换为当前请求的 task_id/context_id。"""
+    ids = {'task_id': context.task_id, 'context_id': context.context_id}
+    if isinstance(event, Message):
+        return _rebase_message(event, ids)
+    if isinstance(event, Task):
+        return event.model_copy(update={
+            'id': context.task_id,
+            'context_id': context.context_id,
+            'status': _rebase_status(event.status, ids),
+            'history': [context.message] if context.message else None,
+        })
+    update: Dict[str, Any] = dict(ids)
+    if isinstance(event, TaskStatusUpdateEvent):
+        update['status'] = _rebase_status(event.status, ids)
+    return event.model_copy(update=update)
+
+
+def _rebase_message(message: Message, ids: Dict[str, str | None]) -> Message:
+    # 原消息未关联task 时保持不关联
+    update = {key: value for key, value in ids.items() if getattr(message, key) is not None}
+    return message.model_copy(update={**update, 'message_id': str(uuid.uuid4())})
+
+
+def _rebase_status(status: TaskStatus, ids: Dict[str, str | None]) -> TaskStatus:
+    return status.model_copy(update={
+        'message': _rebase_message(status.message, ids) if status.message else None,
+        'timestamp': datetime.now(timezone.utc).isoformat() if status.timestamp else None,
+    })
+
+
+class _RecordingEventQueue(EventQueue):
+    """转发到实际的 EventQueue，同时按顺序记录序列化后的事件。"""
+
+    def __init__(self, target: EventQueue) -> None:
+        # 不调用 EventQueue.__init__，自身不持有队列，所有操作转发到 target
+        self._target = target
+        self.events: List[str] = []
+
+    async def enqueue_event(self, event: Event) -> None:
+        self.events.append(dump_event(event))
+        await self._target.enqueue_event(event)
+
+    async def dequeue_event(self, no_wait: bool = False) -> Event:
+        return await self._target.dequeue_event(no_wait)
+
+    def task_done(self) -> None:
+        self._target.task_done()
+
+    def tap(self) -> EventQueue:
+        return self._target.tap()
+
+    async def close(self, immediate: bool = False) -> None:
+        await self._target.close(immediate)
+
+    def is_closed(self) -> bool:
+        return self._target.is_closed()
+
+    async def clear_events(self, clear_child_queues: bool = True) -> None:
+        await self._target.clear_events(clear_child_queues)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._target, name)
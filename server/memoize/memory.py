@@ -0,0 +1,26 @@
+from typing import Dict, List
+
+from server.memoize.base import ResultCache
+from server.utils.ttl_cache import TTLCache
+
+
+class LocalResultCache(ResultCache):
+    """进程内缓存，每个agent 一个独立的LRU，大小由 Memoization.max_entries 决定。"""
+
+    def __init__(self) -> None:
+        self._caches: Dict[str, TTLCache[str, List[str]]] = {}
+
+    async def get(self, agent: str, key: str) -> List[str] | None:
+        cache = self._caches.get(agent)
+        return cache.get(key) if cache is not None else None
+
+    async def set(self, agent: str, key: str, events: List[str], ttl: float, max_entries: int) -> None:
+        cache = self._caches.get(agent)
+        if cache is None:
+            cache = self._caches[agent] = TTLCache(max_entries, ttl)
+        # 配置变更后按新的上限淘汰
+        cache.maxsize = max_entries
+        cache.set(key, events, ttl)
+
+    def __len__(self) -> int:
+        return sum(len(cache) for cache in self._caches.values())
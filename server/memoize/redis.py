@@ -0,0 +1,36 @@
+import json
+import logging
+
+from typing import List
+
+from redis.asyncio import Redis, RedisCluster
+from redis.exceptions import RedisError
+
+from server.memoize.base import ResultCache
+
+logger = logging.getLogger(__name__)
+
+
+class RedisResultCache(ResultCache):
+    """所有副本共享的缓存，条目只受ttl 约束（max_entries 只作用于本地层），redis 不可用时视为未命中。"""
+
+    def __init__(self, client: Redis | RedisCluster, key_prefix: str = 'a2a') -> None:
+        self.client = client
+        self.key_prefix = key_prefix
+
+    def _key(self, agent: str, key: str) -> str:
+        return f'{self.key_prefix}:memo:{agent}:{key}'
+
+    async def get(self, agent: str, key: str) -> List[str] | None:
+        try:
+            value = await self.client.get(self._key(agent, key))
+        except RedisError as e:
+            logger.warning(f'Failed to get memoized result of {agent}: {str(e)}')
+            return None
+        return json.loads(value) if value is not None else None
+
+    async def set(self, agent: str, key: str, events: List[str], ttl: float, max_entries: int) -> None:
+        try:
+            await self.client.set(self._key(agent, key), json.dumps(events), px=int(ttl * 1000))
+        except RedisError as e:
+            logger.warning(f'Failed to save memoized result of {agent}: {str(e)}')
@@ -0,0 +1,135 @@
+import time
+
+from contextvars import ContextVar
+
+from server.metrics.registry import REGISTRY, CallbackMetric, Counter, Histogram
+
+REQUESTS = REGISTRY.register(Counter(
+    'a2a_requests', 'JSON-RPC requests by agent, method and error class', ('agent', 'method', 'error'),
+))
+REQUEST_DURATION = REGISTRY.register(Histogram(
+    'a2a_request_duration_seconds', 'JSON-RPC request latency, until the last event for streams', ('agent', 'method'),
+))
+FIRST_EVENT_DURATION = REGISTRY.register(Histogram(
+    'a2a_time_to_first_event_seconds', 'Latency until the first streamed event', ('agent', 'method'),
+))
+ACTIVE_PRODUCERS = REGISTRY.register(CallbackMetric(
+    'a2a_active_producers', 'Running agent producer tasks in the request handler',
+))
+EVENT_QUEUES = REGISTRY.register(CallbackMetric(
+    'a2a_event_queues', 'Event queues held by the queue manager',
+))
+EVENT_QUEUE_DEPTH = REGISTRY.register(CallbackMetric(
+    'a2a_event_queue_depth', 'Events waiting in all event queues',
+))
+AGENT_CONFIGS = REGISTRY.register(CallbackMetric(
+    'a2a_agent_configs', 'Agent configs in the current snapshot',
+))
+CONFIG_RELOAD_DURATION = REGISTRY.register(Histogram(
+    'a2a_config_reload_duration_seconds', 'Agent config store reload duration',
+))
+NOTIFIER_LAG = REGISTRY.register(CallbackMetric(
+    'a2a_notifier_lag_seconds', 'Delay between publishing and applying the last config change',
+))
+EXECUTOR_CACHE = REGISTRY.register(Counter(
+    'a2a_executor_cache_requests', 'Executor cache lookups by result (hit/miss)', ('result',),
+))
+EXECUTOR_EVICTIONS = REGISTRY.register(Counter(
+    'a2a_executor_cache_evictions', 'Executors evicted from the cache',
+))
+ADMISSION_ACTIVE = REGISTRY.register(CallbackMetric(
+    'a2a_admission_active', 'Executions holding an admission slot', ('scope', 'key'),
+))
+ADMISSION_WAITING = REGISTRY.register(CallbackMetric(
+    'a2a_admission_waiting', 'Executions waiting for an admission slot', ('scope', 'key'),
+))
+ADMISSION_REJECTED = REGISTRY.register(CallbackMetric(
+    'a2a_admission_rejected', 'Executions rejected by admission control', ('scope', 'key'), type='counter',
+))
+SYNC_EXECUTOR_CALLS = REGISTRY.register(CallbackMetric(
+    'a2a_sync_executor_calls', 'SyncAgentExecutor thread pool calls by executor and state (active/queued)',
+    ('executor', 'state'),
+))
+LOOP_BLOCKS = REGISTRY.register(Counter(
+    'a2a_event_loop_blocks', 'Event loop blockages over the threshold by owning agent', ('agent',),
+))
+LOOP_BLOCK_DURATION = REGISTRY.register(Histogram(
+    'a2a_event_loop_block_seconds', 'Duration of event loop blockages over the threshold',
+))
+MESSAGE_DEDUP = REGISTRY.register(Counter(
+    'a2a_message_dedup', 'message/send calls by dedup outcome (executed/attached/replayed/waited)', ('outcome',),
+))
+MEMO_REQUESTS = REGISTRY.register(Counter(
+    'a2a_memo_requests', 'Memoized agent executions by result (hit/miss)', ('agent', 'result'),
+))
+MEMO_HIT_RATIO = REGISTRY.register(CallbackMetric(
+    'a2a_memo_hit_ratio', 'Memoization hit ratio per agent since start', ('agent',),
+))
+TASK_STORE_TASKS = REGISTRY.register(CallbackMetric(
+    'a2a_task_store_tasks', 'Tasks held by the in-memory task store',
+))
+TASK_STORE_BYTES = REGISTRY.register(CallbackMetric(
+    'a2a_task_store_bytes', 'Serialized size of the tasks held by the in-memory task store',
+))
+TASK_STORE_EVICTIONS = REGISTRY.register(Counter(
+    'a2a_task_store_evictions', 'Tasks removed from the in-memory task store by reason (expired/lru)', ('reason',),
+))
+PUSH_NOTIFICATIONS = REGISTRY.register(Counter(
+    'a2a_push_notifications',
+    'Push notifications by outcome (delivered/coalesced/retried/stale/failed/dropped)',
+    ('outcome',),
+))
+PUSH_DELIVERY_LAG = REGISTRY.register(Histogram(
+    'a2a_push_delivery_lag_seconds', 'Delay between enqueueing a push notification and delivering it, retries included',
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900),
+))
+PUSH_PENDING = REGISTRY.register(CallbackMetric(
+    'a2a_push_pending', 'Tasks with a push notification waiting for delivery',
+))
+PUSH_RETRY_QUEUE = REGISTRY.register(CallbackMetric(
+    'a2a_push_retry_queue', 'Push deliveries waiting for retry in the local retry queue',
+))
+BACKGROUND_JOBS = REGISTRY.register(CallbackMetric(
+    'a2a_background_jobs', 'Non-blocking message/send jobs by namespace and state (queued/running)',
+    ('namespace', 'state'),
+))
+BACKGROUND_WAIT = REGISTRY.register(Histogram(
+    'a2a_background_wait_seconds', 'Delay between submitting a background job and starting it', ('namespace',),
+))
+BACKGROUND_RECOVERED = REGISTRY.register(Counter(
+    'a2a_background_recovered', 'Unfinished background jobs found on start by outcome (requeued/abandoned)',
+    ('outcome',),
+))
+DRAINING = REGISTRY.register(CallbackMetric(
+    'a2a_draining', '1 while the server is draining before shutdown',
+))
+INFLIGHT_REQUESTS = REGISTRY.register(CallbackMetric(
+    'a2a_inflight_requests', 'HTTP requests in flight, open streams included',
+))
+
+# 当前请求的 RequestTimer，_create_response 等在同一个task 中记录错误类型
+CURRENT_REQUEST: ContextVar['RequestTimer | None'] = ContextVar('a2a_current_request', default=None)
+
+
+class RequestTimer:
+    __slots__ = ('agent', 'method', 'error', 'start', '_first_event', '_finished')
+
+    def __init__(self, agent: str, method: str) -> None:
+        self.agent = agent
+        self.method = method
+        self.error = ''
+        self.start = time.perf_counter()
+        self._first_event = False
+        self._finished = False
+
+    def first_event(self) -> None:
+        if not self._first_event:
+            self._first_event = True
+            FIRST_EVENT_DURATION.observe(time.perf_counter() - self.start, self.agent, self.method)
+
+    def finish(self) -> None:
+        if self._finished:
+            return
+        self._finished = True
+        REQUESTS.inc(self.agent, self.method, self.error)
+        REQUEST_DURATION.observe(time.perf_counter() - self.start, self.agent, self.method)
@@ -1,11 +1,27 @@
 from abc import ABC, abstractmethod
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Awaitable, Callable
 
 from server.common.model import AgentConfig
 
 
+class NotifierResyncRequired(Exception):
+    """通知存在缺口（比如stream 已被裁剪），需要全量reload 才能收敛。"""
+
+
 class Notifier(ABC):
+    # 重连后能否重放断开期间的变更，不能时需要全量reload 才能收敛
+    replayable: bool = False
+    # 最近一次变更从发布到被消费的延迟（秒），无法得知时为 None
+    lag_seconds: float | None = None
+
     @abstractmethod
-    async def watch(self) -> AsyncGenerator[AgentConfig, None]:
-        pass
+    async def watch(
+            self,
+            on_subscribed: Callable[[], Awaitable[None]] | None = None,
+    ) -> AsyncGenerator[AgentConfig, None]:
+        """监听配置变更。
 
+        on_subscribed 在开始接收变更（订阅成功）后、产出第一条变更前调用，调用方在其中全量reload，
+        reload 期间发布的变更在订阅中排队，不会丢失。
+        """
+        pass
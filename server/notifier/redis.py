@@ -1,7 +1,7 @@
 import json
 import logging
 
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Awaitable, Callable
 
 from redis.asyncio import RedisCluster
 
@@ -17,11 +17,16 @@ class RedisNotifier(Notifier):
         self.channel = channel
         self.client = get_redis_client(config)
 
-    async def watch(self) -> AsyncGenerator[AgentConfig, None]:
+    async def watch(
+            self,
+            on_subscribed: Callable[[], Awaitable[None]] | None = None,
+    ) -> AsyncGenerator[AgentConfig, None]:
         if isinstance(self.client, RedisCluster):
-            raise ValueError('Redis cluster mode is not supported for Pub/Sub.')
+            raise ValueError('Redis cluster mode is not supported for Pub/Sub, use RedisStreamNotifier instead.')
         async with self.client.pubsub() as pubsub:
             await pubsub.subscribe(self.channel)
+            if on_subscribed is not None:
+                await on_subscribed()
             async for message in pubsub.listen():
                 if message['type'] == 'message':
                     try:
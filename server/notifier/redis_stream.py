@@ -0,0 +1,121 @@
+import json
+import logging
+import socket
+import time
+
+from typing import AsyncGenerator, Awaitable, Callable, Tuple
+
+from server.common.model import AgentConfig
+from server.libs.redis.client import RedisConfig, get_redis_client
+from server.notifier.base import Notifier, NotifierResyncRequired
+
+logger = logging.getLogger(__name__)
+
+_FIELD_DATA = 'data'
+
+
+class RedisStreamNotifier(Notifier):
+    """基于redis stream 的配置变更通知，单机/哨兵/集群模式均可用。
+
+    每处理完一批消息即持久化 last-seen offset，断线重连或重启后从该位置继续读取，
+    不会丢失期间发布的变更；offset 早于stream 中最早的消息（已被裁剪）时抛出 NotifierResyncRequired。
+
+    offset 按 consumer_name 保存，重启后接续需要重启前后不变的名称（如 StatefulSet 的pod 名称）；
+    默认的hostname 每次部署都会变化，旧的offset 在 offset_ttl 秒后过期，不会无限累积。
+    """
+    replayable = True
+
+    def __init__(
+            self,
+            config: RedisConfig,
+            stream: str = 'agent_config_updates',
+            consumer_name: str | None = None,
+            maxlen: int = 10000,
+            block_ms: int = 1000,
+            offset_ttl: float = 7 * 24 * 60 * 60,
+    ):
+        self.stream = stream
+        self.consumer_name = consumer_name or socket.gethostname()
+        self.maxlen = maxlen
+        self.block_ms = block_ms
+        self.offset_ttl = offset_ttl
+        self.client = get_redis_client(config)
+        self.last_id: str | None = None
+        self._offset_saved_at = 0.0
+
+    @property
+    def offset_key(self) -> str:
+        return f'{self.stream}:offset:{self.consumer_name}'
+
+    async def publish(self, agent_config: AgentConfig) -> str:
+        entry_id = await self.client.xadd(
+            self.stream,
+            {_FIELD_DATA: agent_config.model_dump_json(exclude_none=True)},
+            maxlen=self.maxlen,
+            approximate=True,
+        )
+        return _decode(entry_id)
+
+    async def watch(
+            self,
+            on_subscribed: Callable[[], Awaitable[None]] | None = None,
+    ) -> AsyncGenerator[AgentConfig, None]:
+        last_id = await self._resume_offset()
+        if on_subscribed is not None:
+            await on_subscribed()
+        while True:
+            response = await self.client.xread({self.stream: last_id}, block=self.block_ms, count=100)
+            if not response:
+                if time.monotonic() - self._offset_saved_at > self.offset_ttl / 2:
+                    # 长时间没有变更时续期，避免使用中的offset 过期
+                    await self._save_offset(last_id)
+                continue
+            for _, entries in response:
+                for entry_id, fields in entries:
+                    last_id = _decode(entry_id)
+                    # entry id 的前半部分为 redis 写入时的毫秒时间戳
+                    self.lag_seconds = max(0.0, time.time() - _parse_id(last_id)[0] / 1000)
+                    data = {_decode(k): _decode(v) for k, v in fields.items()}.get(_FIELD_DATA)
+                    try:
+                        yield AgentConfig(**json.loads(data))
+                    except json.JSONDecodeError:
+                        logger.error(f'Invalid JSON format in message: {data}')
+                    except Exception as e:
+                        logger.error(f'Failed to parse AgentConfig: {str(e)}')
+                    self.last_id = last_id
+            await self._save_offset(last_id)
+
+    async def _save_offset(self, last_id: str) -> None:
+        await self.client.set(self.offset_key, last_id, ex=int(self.offset_ttl))
+        self._offset_saved_at = time.monotonic()
+
+    async def _resume_offset(self) -> str:
+        if self.last_id is None:
+            persisted = await self.client.get(self.offset_key)
+            self.last_id = _decode(persisted) if persisted else None
+        latest = await self.client.xrevrange(self.stream, count=1)
+        latest_id = _decode(latest[0][0]) if latest else '0-0'
+        if self.last_id is None:
+            # 首次启动，配置已全量加载，只关注之后的变更
+            self.last_id = latest_id
+            await self._save_offset(latest_id)
+            return latest_id
+
+        # offset 早于最早消息说明中间可能有消息被裁剪；误判只会多一次全量reload
+        earliest = await self.client.xrange(self.stream, count=1)
+        if earliest and _parse_id(self.last_id) < _parse_id(_decode(earliest[0][0])) and \
+                _parse_id(self.last_id) != (0, 0):
+            logger.warning(f'offset {self.last_id} of {self.consumer_name} has been trimmed from {self.stream}')
+            self.last_id = latest_id
+            await self._save_offset(latest_id)
+            raise NotifierResyncRequired(f'stream {self.stream} trimmed past offset')
+        return self.last_id
+
+
+def _decode(value: bytes | str) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _parse_id(entry_id: str) -> Tuple[int, int]:
+    ms, _, seq = entry_id.partition('-')
+    return int(ms), int(seq or 0)
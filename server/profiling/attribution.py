@@ -0,0 +1,27 @@
+import asyncio
+import weakref
+
+# task -> 所属agent（namespace/name），供采样线程和阻塞检测归因
+_TASK_AGENTS: 'weakref.WeakKeyDictionary[asyncio.Task, str]' = weakref.WeakKeyDictionary()
+
+
+def bind_agent(agent: str) -> None:
+    """标记当前task 正在为该agent 工作，task 结束后自动移除。"""
+    task = asyncio.current_task()
+    if task is not None:
+        _TASK_AGENTS[task] = agent
+
+
+def task_agent(task: asyncio.Task | None) -> str | None:
+    if task is None:
+        return None
+    try:
+        return _TASK_AGENTS.get(task)
+    except RuntimeError:
+        # 其他线程读取时字典恰好在变化
+        return None
+
+
+def loop_agent(loop: asyncio.AbstractEventLoop) -> str | None:
+    """事件循环当前正在执行的task 所属的agent，可在其他线程中调用。"""
+    return task_agent(asyncio.current_task(loop))
@@ -0,0 +1,79 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from server.metrics.runtime import LOOP_BLOCK_DURATION, LOOP_BLOCKS
+from server.profiling.attribution import loop_agent
+
+logger = logging.getLogger(__name__)
+
+_STACK_LIMIT = 30
+
+
+class LoopMonitor:
+    """检测事件循环被同步代码阻塞超过 threshold 秒的情况。
+
+    事件循环中的心跳协程定期更新时间戳，独立的watch 线程发现心跳超时后记录事件循环线程当时的调用栈
+    及正在执行的task 所属的agent；与 asyncio debug 模式的 slow_callback_duration 不同，不需要开启debug 模式，
+    阻塞尚未结束时即可定位到阻塞点。
+    """
+
+    def __init__(self, threshold: float) -> None:
+        self.threshold = threshold
+        self.interval = threshold / 2
+        self._thread_id = 0
+        self._beat = 0.0
+        # watch 线程已报告的阻塞（对应的心跳时间戳, agent）
+        self._reported: tuple[float, str | None] | None = None
+        self._stopped = threading.Event()
+        self._heartbeat: asyncio.Task | None = None
+        self._watcher: threading.Thread | None = None
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._heartbeat = asyncio.create_task(self._run_heartbeat())
+        self._watcher = threading.Thread(target=self._watch, args=(loop,), name='loop-monitor', daemon=True)
+        self._watcher.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            await asyncio.gather(self._heartbeat, return_exceptions=True)
+        if self._watcher is not None:
+            await asyncio.to_thread(self._watcher.join)
+
+    async def _run_heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            blocked = now - self._beat - self.interval
+            if blocked >= self.threshold:
+                reported = self._reported
+                agent = reported[1] if reported is not None and reported[0] == self._beat else None
+                LOOP_BLOCKS.inc(agent or 'unknown')
+                LOOP_BLOCK_DURATION.observe(blocked)
+                logger.warning(f'event loop was blocked for {blocked:.3f}s, agent: {agent or "unknown"}')
+            self._beat = now
+
+    def _watch(self, loop: asyncio.AbstractEventLoop) -> None:
+        while not self._stopped.wait(self.interval):
+            beat = self._beat
+            blocked = time.monotonic() - beat - self.interval
+            if blocked < self.threshold or (self._reported is not None and self._reported[0] == beat):
+                continue
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                return
+            agent = loop_agent(loop)
+            self._reported = (beat, agent)
+            stack = ''.join(traceback.format_stack(frame, limit=_STACK_LIMIT))
+            del frame
+            logger.warning(
+                f'event loop blocked for more than {blocked:.3f}s, agent: {agent or "unknown"}, stack:\n{stack}'
+            )
@@ -0,0 +1,47 @@
+import asyncio
+import tracemalloc
+
+from typing import List
+
+from server.profiling.sampler import EVENTS_FILE, short_path
+
+_FILTERS = (
+    # 排除快照本身产生的分配
+    tracemalloc.Filter(False, tracemalloc.__file__, all_frames=True),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+)
+
+
+async def tracemalloc_diff(seconds: float, frames: int = 25, limit: int = 200) -> str:
+    """对比间隔 seconds 的两次 tracemalloc 快照，返回按新增字节数加权的折叠栈。
+
+    未开启 tracemalloc 时临时开启，结束后关闭；开启期间内存分配会明显变慢。
+    """
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start(frames)
+    try:
+        before = await asyncio.to_thread(_snapshot)
+        await asyncio.sleep(seconds)
+        after = await asyncio.to_thread(_snapshot)
+    finally:
+        if started:
+            tracemalloc.stop()
+    stats = await asyncio.to_thread(after.compare_to, before, 'traceback')
+    lines: List[str] = []
+    for stat in stats:
+        if stat.size_diff <= 0:
+            continue
+        # traceback 按调用顺序排列，最近的调用在最后；与CPU profile 一样省略事件循环调度本身的栈帧
+        stack = list(stat.traceback)
+        start = max((i + 1 for i, frame in enumerate(stack) if frame.filename.endswith(EVENTS_FILE)), default=0)
+        stack = stack[start:] or stack[-1:]
+        names = [f'{short_path(frame.filename)}:{frame.lineno}'.replace(';', ':') for frame in stack]
+        lines.append(f'{";".join(names)} {stat.size_diff}\n')
+        if len(lines) >= limit:
+            break
+    return ''.join(lines)
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces(_FILTERS)
@@ -0,0 +1,94 @@
+import asyncio
+import functools
+import os
+import sys
+import threading
+
+from collections import Counter
+from types import FrameType
+from typing import List
+
+from server.profiling.attribution import loop_agent
+
+IDLE = '(idle)'
+_STDLIB = os.path.dirname(os.__file__) + os.sep
+EVENTS_FILE = os.path.join('asyncio', 'events.py')
+
+
+class StackSampler:
+    """在独立线程中按固定间隔采样事件循环线程的调用栈，按折叠栈（collapsed stacks）计数。
+
+    每个样本以当前task 所属的agent 作为根节点，事件循环调度本身的栈帧被省略，
+    循环空闲（阻塞在selector 上）的样本记为 (idle)。结果可直接用于 flamegraph.pl / speedscope。
+    必须在事件循环线程中创建。
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, interval: float = 0.005) -> None:
+        self.loop = loop
+        self.interval = interval
+        self.thread_id = threading.get_ident()
+        self.samples = 0
+        self.counts: Counter[str] = Counter()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def collapsed(self) -> str:
+        return ''.join(f'{stack} {count}\n' for stack, count in self.counts.most_common())
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return
+            agent = loop_agent(self.loop)
+            self.counts[collapse(frame, agent)] += 1
+            self.samples += 1
+            del frame
+
+
+def collapse(frame: FrameType, agent: str | None = None) -> str:
+    stack: List[FrameType] = []
+    current: FrameType | None = frame
+    while current is not None:
+        stack.append(current)
+        current = current.f_back
+    stack.reverse()
+    # 只保留当前回调（Handle._run）之内的栈帧
+    start = 0
+    for i, f in enumerate(stack):
+        if f.f_code.co_name == '_run' and f.f_code.co_filename.endswith(EVENTS_FILE):
+            start = i + 1
+    if start == 0 and stack[-1].f_code.co_filename.endswith('selectors.py'):
+        return IDLE
+    names = [agent or '(runtime)']
+    names.extend(_frame_name(f) for f in stack[start:])
+    return ';'.join(names)
+
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    return f'{code.co_qualname} ({short_path(code.co_filename)})'.replace(';', ':')
+
+
+@functools.lru_cache(maxsize=4096)
+def short_path(filename: str) -> str:
+    # 第三方库及标准库只保留包内路径
+    for marker in ('site-packages' + os.sep, 'dist-packages' + os.sep):
+        index = filename.rfind(marker)
+        if index >= 0:
+            return filename[index + len(marker):]
+    if filename.startswith(_STDLIB):
+        return filename[len(_STDLIB):]
+    try:
+        return os.path.relpath(filename)
+    except ValueError:
+        return filename
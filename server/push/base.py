@@ -0,0 +1,50 @@
+import uuid
+
+from abc import ABC, abstractmethod
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class PushDelivery(BaseModel):
+    """一次待投递的推送，包含投递所需的全部信息，重启或由其他副本取出后可直接投递。"""
+    id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    task_id: str
+    url: str
+    token: str | None = None
+    # 序列化后的task
+    payload: str
+    # 已失败的次数
+    attempt: int = 0
+    # 首次入队的时间（time.time()），用于统计投递延迟，也用于判断同一task 的推送的先后
+    created_at: float
+
+    @property
+    def key(self) -> str:
+        return f'{self.task_id} {self.url}'
+
+
+class PushRetryQueue(ABC):
+    """投递失败的推送，按下次重试时间排序。
+
+    同一task 的同一地址（PushDelivery.key）只保留 created_at 最大的推送，重试不会覆盖更新的状态。
+    """
+
+    @abstractmethod
+    async def push(self, delivery: PushDelivery, due: float) -> None:
+        """due 为下次重试的时间（time.time()）；队列中已有更新的推送时忽略。"""
+        pass
+
+    @abstractmethod
+    async def discard(self, delivery: PushDelivery) -> None:
+        """delivery 投递成功后调用，删除同一key 下不比它新的推送。"""
+        pass
+
+    @abstractmethod
+    async def pop_due(self, now: float, limit: int) -> List[PushDelivery]:
+        """取出最多 limit 个已到重试时间的推送。"""
+        pass
+
+    @abstractmethod
+    async def size(self) -> int:
+        pass
@@ -0,0 +1,270 @@
+import asyncio
+import logging
+import random
+import time
+
+from collections import OrderedDict
+from typing import Collection, Dict, List, Set, Tuple
+
+import httpx
+
+from a2a.server.tasks import PushNotificationConfigStore, PushNotificationSender
+from a2a.types import Task
+
+from server.metrics.runtime import PUSH_DELIVERY_LAG, PUSH_NOTIFICATIONS, PUSH_PENDING, PUSH_RETRY_QUEUE
+from server.push.base import PushDelivery, PushRetryQueue
+from server.push.memory import LocalRetryQueue
+
+logger = logging.getLogger(__name__)
+
+# 这些状态码视为暂时失败，其余4xx 不重试
+_RETRYABLE_STATUS = frozenset({408, 425, 429})
+
+
+class PushDispatcher(PushNotificationSender):
+    """不阻塞事件生产的推送。
+
+    send_notification 只记录task 的最新状态，由 workers 个后台协程投递：
+    - 同一task 在 coalesce_window 内或等待投递期间的多次更新合并为最后一次，同一task 同时只有一个投递在进行，保证顺序
+    - 每个目标地址（scheme://host:port）使用独立的keep-alive 连接池，慢的webhook 不占用其他地址的连接；
+      超过 max_hosts 时淘汰最久未使用的连接池，其上的请求完成后才关闭
+    - 失败的推送写入 retry_queue（本地文件或redis），按指数退避重试，超过 max_attempts 后放弃；
+      同一task 的同一地址已开始投递更新的状态时，旧的重试直接丢弃
+    - 配置 allowed_hosts 时只推送到这些主机，"." 开头的项匹配该域名及其子域名
+    """
+
+    def __init__(
+            self,
+            config_store: PushNotificationConfigStore,
+            retry_queue: PushRetryQueue | None = None,
+            workers: int = 8,
+            max_pending: int = 10000,
+            coalesce_window: float = 0.1,
+            timeout: float = 10,
+            max_connections_per_host: int = 10,
+            max_hosts: int = 256,
+            max_attempts: int = 8,
+            retry_base: float = 1,
+            retry_cap: float = 5 * 60,
+            retry_interval: float = 1,
+            allowed_hosts: Collection[str] = (),
+    ) -> None:
+        self.config_store = config_store
+        self.retry_queue = retry_queue or LocalRetryQueue()
+        self.workers = workers
+        self.max_pending = max_pending
+        self.coalesce_window = coalesce_window
+        self.timeout = timeout
+        self.max_connections_per_host = max_connections_per_host
+        self.max_hosts = max_hosts
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_cap = retry_cap
+        self.retry_interval = retry_interval
+        self.allowed_hosts = frozenset(host.lower() for host in allowed_hosts)
+        # task_id -> (最新的task, 首次入队时间)
+        self._pending: Dict[str, Tuple[Task, float]] = {}
+        self._inflight: Set[str] = set()
+        # PushDelivery.key -> 最近开始投递的推送的 created_at，最多保留 max_pending 个
+        self._latest: OrderedDict[str, float] = OrderedDict()
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._clients: OrderedDict[str, httpx.AsyncClient] = OrderedDict()
+        # 连接池 -> 进行中的请求数
+        self._requests: Dict[httpx.AsyncClient, int] = {}
+        # 已淘汰但仍有请求进行中的连接池
+        self._retired: Set[httpx.AsyncClient] = set()
+        self._background: Set[asyncio.Task] = set()
+        self._tasks: List[asyncio.Task] = []
+        self._closed = False
+        PUSH_PENDING.set_callback(lambda: [((), len(self._pending))])
+        local_queue = self.retry_queue
+        if isinstance(local_queue, LocalRetryQueue):
+            PUSH_RETRY_QUEUE.set_callback(lambda: [((), len(local_queue))])
+
+    async def send_notification(self, task: Task) -> None:
+        if self._closed:
+            PUSH_NOTIFICATIONS.inc('dropped')
+            logger.warning(f'push dispatcher is closed, drop notification of task {task.id}')
+            return
+        entry = self._pending.get(task.id)
+        if entry is not None:
+            self._pending[task.id] = (task, entry[1])
+            PUSH_NOTIFICATIONS.inc('coalesced')
+            return
+        if len(self._pending) >= self.max_pending:
+            PUSH_NOTIFICATIONS.inc('dropped')
+            logger.warning(f'too many pending push notifications, drop notification of task {task.id}')
+            return
+        self.start()
+        self._pending[task.id] = (task, time.time())
+        if task.id in self._inflight:
+            # 当前投递完成后再入队
+            return
+        if self.coalesce_window > 0:
+            asyncio.get_running_loop().call_later(self.coalesce_window, self._queue.put_nowait, task.id)
+        else:
+            self._queue.put_nowait(task.id)
+
+    def start(self) -> None:
+        """启动投递及重试协程，首次 send_notification 时自动调用；启动时调用以继续重试上次未完成的推送。"""
+        if self._tasks or self._closed:
+            return
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._retry_loop()))
+
+    async def close(self, timeout: float = 5) -> None:
+        """等待已记录的推送投递完成（最多 timeout 秒），未完成的失败推送保留在 retry_queue 中。"""
+        self._closed = True
+        if self._tasks:
+            try:
+                await asyncio.wait_for(self._drain(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f'{len(self._pending)} push notifications are not delivered before close')
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks = []
+        for client in (*self._clients.values(), *self._retired):
+            await client.aclose()
+        self._clients.clear()
+        self._retired.clear()
+        self._requests.clear()
+
+    async def _drain(self) -> None:
+        # 合并窗口内的task 尚未入队
+        while self._pending or self._inflight:
+            await asyncio.sleep(min(self.coalesce_window, 0.05) or 0.01)
+        await self._queue.join()
+
+    async def _worker(self) -> None:
+        while True:
+            task_id = await self._queue.get()
+            try:
+                entry = self._pending.pop(task_id, None)
+                if entry is None:
+                    continue
+                self._inflight.add(task_id)
+                try:
+                    await self._send(*entry)
+                finally:
+                    self._inflight.discard(task_id)
+                    if task_id in self._pending:
+                        self._queue.put_nowait(task_id)
+            except Exception:
+                logger.exception(f'Failed to send push notification of task {task_id}')
+            finally:
+                self._queue.task_done()
+
+    async def _send(self, task: Task, created_at: float) -> None:
+        configs = await self.config_store.get_info(task.id)
+        if not configs:
+            return
+        payload = task.model_dump_json(exclude_none=True)
+        await asyncio.gather(*(
+            self._deliver(PushDelivery(
+                task_id=task.id, url=config.url, token=config.token, payload=payload, created_at=created_at,
+            ))
+            for config in configs
+        ))
+
+    async def _deliver(self, delivery: PushDelivery) -> None:
+        latest = self._latest.get(delivery.key)
+        if latest is not None and latest > delivery.created_at:
+            # 更新的状态已经投递过或正在投递
+            PUSH_NOTIFICATIONS.inc('stale')
+            return
+        self._latest[delivery.key] = delivery.created_at
+        self._latest.move_to_end(delivery.key)
+        if len(self._latest) > self.max_pending:
+            self._latest.popitem(last=False)
+        headers = {'Content-Type': 'application/json'}
+        if delivery.token:
+            headers['X-A2A-Notification-Token'] = delivery.token
+        try:
+            if not self._allowed(delivery.url):
+                raise httpx.InvalidURL(f'host of {delivery.url} is not allowed')
+            client = self._client(delivery.url)
+            self._requests[client] = self._requests.get(client, 0) + 1
+            try:
+                response = await client.post(delivery.url, content=delivery.payload, headers=headers)
+            finally:
+                self._release_client(client)
+            if response.is_success:
+                PUSH_NOTIFICATIONS.inc('delivered')
+                PUSH_DELIVERY_LAG.observe(time.time() - delivery.created_at)
+                if delivery.attempt == 0:
+                    # 重启前或其他副本留下的旧状态不再重试
+                    await self.retry_queue.discard(delivery)
+                return
+            retryable = response.status_code >= 500 or response.status_code in _RETRYABLE_STATUS
+            error = f'status {response.status_code}'
+        except httpx.InvalidURL as e:
+            retryable, error = False, str(e)
+        except httpx.HTTPError as e:
+            retryable, error = True, str(e) or type(e).__name__
+        delivery.attempt += 1
+        if not retryable or delivery.attempt >= self.max_attempts:
+            PUSH_NOTIFICATIONS.inc('failed')
+            logger.warning(
+                f'Failed to push task {delivery.task_id} to {delivery.url} after {delivery.attempt} attempts: {error}'
+            )
+            return
+        PUSH_NOTIFICATIONS.inc('retried')
+        delay = random.uniform(0, min(self.retry_cap, self.retry_base * 2 ** delivery.attempt))
+        await self.retry_queue.push(delivery, time.time() + delay)
+
+    async def _retry_loop(self) -> None:
+        while True:
+            try:
+                deliveries = await self.retry_queue.pop_due(time.time(), self.workers)
+                if deliveries:
+                    await asyncio.gather(*(self._deliver(delivery) for delivery in deliveries))
+                    # 仍有到期的推送时不等待
+                    continue
+            except Exception:
+                logger.exception('Failed to retry push notifications')
+            await asyncio.sleep(self.retry_interval)
+
+    def _allowed(self, url: str) -> bool:
+        if not self.allowed_hosts:
+            return True
+        host = httpx.URL(url).host.lower()
+        return host in self.allowed_hosts or any(
+            allowed.startswith('.') and (host.endswith(allowed) or host == allowed[1:])
+            for allowed in self.allowed_hosts
+        )
+
+    def _client(self, url: str) -> httpx.AsyncClient:
+        origin = str(httpx.URL(url).copy_with(path='/', query=None, fragment=None))
+        client = self._clients.get(origin)
+        if client is not None:
+            self._clients.move_to_end(origin)
+            return client
+        client = self._clients[origin] = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self.max_connections_per_host,
+                max_keepalive_connections=self.max_connections_per_host,
+            ),
+        )
+        if len(self._clients) > self.max_hosts:
+            _, evicted = self._clients.popitem(last=False)
+            if evicted in self._requests:
+                # 仍有请求进行中，最后一个请求完成后关闭
+                self._retired.add(evicted)
+            else:
+                self._aclose(evicted)
+        return client
+
+    def _release_client(self, client: httpx.AsyncClient) -> None:
+        count = self._requests.pop(client, 1) - 1
+        if count > 0:
+            self._requests[client] = count
+        elif client in self._retired:
+            self._retired.discard(client)
+            self._aclose(client)
+
+    def _aclose(self, client: httpx.AsyncClient) -> None:
+        task = asyncio.create_task(client.aclose())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
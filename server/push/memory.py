@@ -0,0 +1,91 @@
+import asyncio
+import heapq
+import json
+import logging
+import os
+
+from typing import Dict, List, Tuple
+
+from server.push.base import PushDelivery, PushRetryQueue
+
+logger = logging.getLogger(__name__)
+
+
+class LocalRetryQueue(PushRetryQueue):
+    """单节点的重试队列。
+
+    配置 path 时每次变更后将整个队列写入该文件（先写临时文件再替换），重启后继续重试；
+    重试队列只保存失败的推送，通常很小。文件中包含推送的token，只有当前用户可读写。
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path
+        # key -> (due, delivery)
+        self._items: Dict[str, Tuple[float, PushDelivery]] = {}
+        # (due, id, key)，被替换的推送在弹出时按 id 识别并跳过
+        self._heap: List[Tuple[float, str, str]] = []
+        self._write_lock = asyncio.Lock()
+        if path:
+            self._load(path)
+
+    async def push(self, delivery: PushDelivery, due: float) -> None:
+        current = self._items.get(delivery.key)
+        if current is not None and current[1].created_at > delivery.created_at:
+            return
+        self._items[delivery.key] = (due, delivery)
+        heapq.heappush(self._heap, (due, delivery.id, delivery.key))
+        await self._persist()
+
+    async def discard(self, delivery: PushDelivery) -> None:
+        current = self._items.get(delivery.key)
+        if current is not None and current[1].created_at <= delivery.created_at:
+            del self._items[delivery.key]
+            await self._persist()
+
+    async def pop_due(self, now: float, limit: int) -> List[PushDelivery]:
+        deliveries: List[PushDelivery] = []
+        while self._heap and self._heap[0][0] <= now and len(deliveries) < limit:
+            _, delivery_id, key = heapq.heappop(self._heap)
+            current = self._items.get(key)
+            if current is not None and current[1].id == delivery_id:
+                del self._items[key]
+                deliveries.append(current[1])
+        if deliveries:
+            await self._persist()
+        return deliveries
+
+    async def size(self) -> int:
+        return len(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _load(self, path: str) -> None:
+        try:
+            with open(path, encoding='utf-8') as f:
+                items = [(due, PushDelivery.model_validate(delivery)) for due, delivery in json.load(f)]
+        except FileNotFoundError:
+            return
+        except ValueError as e:
+            logger.error(f'Failed to load push retry queue from {path}: {str(e)}')
+            return
+        for due, delivery in items:
+            self._items[delivery.key] = (due, delivery)
+            self._heap.append((due, delivery.id, delivery.key))
+        heapq.heapify(self._heap)
+        logger.info(f'loaded {len(self._items)} push deliveries from {path}')
+
+    async def _persist(self) -> None:
+        path = self.path
+        if not path:
+            return
+        # 写入期间队列可能继续变化，写入的是加锁后的最新快照
+        async with self._write_lock:
+            data = json.dumps([[due, delivery.model_dump(mode='json')] for due, delivery in self._items.values()])
+            await asyncio.to_thread(self._write, path, data)
+
+    def _write(self, path: str, data: str) -> None:
+        tmp = f'{path}.tmp'
+        with open(os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp, path)
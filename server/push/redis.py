@@ -0,0 +1,89 @@
+import logging
+
+from typing import List
+
+from redis.asyncio import Redis, RedisCluster
+from redis.exceptions import RedisError
+
+from server.push.base import PushDelivery, PushRetryQueue
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1] 为 zset（key -> 下次重试时间），KEYS[2] 为 hash（key -> 推送）
+
+# 已有更新的推送时忽略
+_PUSH_SCRIPT = """
+local current = redis.call('HGET', KEYS[2], ARGV[1])
+if current and cjson.decode(current).created_at > tonumber(ARGV[3]) then
+    return 0
+end
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[4])
+redis.call('ZADD', KEYS[1], ARGV[2], ARGV[1])
+return 1
+"""
+
+_DISCARD_SCRIPT = """
+local current = redis.call('HGET', KEYS[2], ARGV[1])
+if current and cjson.decode(current).created_at <= tonumber(ARGV[2]) then
+    redis.call('HDEL', KEYS[2], ARGV[1])
+    redis.call('ZREM', KEYS[1], ARGV[1])
+end
+return 0
+"""
+
+# 原子地取出并删除已到期的推送，多个副本同时轮询时每个推送只会被一个副本取出
+_POP_DUE_SCRIPT = """
+local keys = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+if #keys == 0 then
+    return {}
+end
+local items = redis.call('HMGET', KEYS[2], unpack(keys))
+redis.call('ZREM', KEYS[1], unpack(keys))
+redis.call('HDEL', KEYS[2], unpack(keys))
+return items
+"""
+
+
+class RedisRetryQueue(PushRetryQueue):
+    """所有副本共享的重试队列（zset，score 为下次重试时间），副本重启后由其他副本继续重试。
+
+    redis 不可用时丢弃失败的推送。推送的token 随推送保存在redis 中，需限制redis 的访问。
+    """
+
+    def __init__(self, client: Redis | RedisCluster, key_prefix: str = 'a2a') -> None:
+        self.client = client
+        # hash tag 保证两个key 在redis cluster 的同一个slot
+        self.key = f'{{{key_prefix}:push}}:retry'
+        self.deliveries_key = f'{{{key_prefix}:push}}:deliveries'
+        self._push = client.register_script(_PUSH_SCRIPT)  # type: ignore[misc]
+        self._discard = client.register_script(_DISCARD_SCRIPT)  # type: ignore[misc]
+        self._pop_due = client.register_script(_POP_DUE_SCRIPT)  # type: ignore[misc]
+
+    async def push(self, delivery: PushDelivery, due: float) -> None:
+        try:
+            await self._push(
+                keys=[self.key, self.deliveries_key],
+                args=[delivery.key, due, delivery.created_at, delivery.model_dump_json()],
+            )
+        except RedisError as e:
+            logger.warning(f'Failed to save push delivery of task {delivery.task_id} to {delivery.url}: {str(e)}')
+
+    async def discard(self, delivery: PushDelivery) -> None:
+        try:
+            await self._discard(keys=[self.key, self.deliveries_key], args=[delivery.key, delivery.created_at])
+        except RedisError as e:
+            logger.warning(f'Failed to discard push delivery of task {delivery.task_id} to {delivery.url}: {str(e)}')
+
+    async def pop_due(self, now: float, limit: int) -> List[PushDelivery]:
+        try:
+            items = await self._pop_due(keys=[self.key, self.deliveries_key], args=[now, limit])
+        except RedisError as e:
+            logger.warning(f'Failed to pop push deliveries: {str(e)}')
+            return []
+        return [PushDelivery.model_validate_json(item) for item in items if item]
+
+    async def size(self) -> int:
+        try:
+            return await self.client.zcard(self.key)
+        except RedisError:
+            return 0
@@ -0,0 +1,188 @@
+import asyncio
+import contextlib
+import logging
+
+from typing import Dict, Set
+
+from a2a.server.events import Event, EventQueue, QueueManager
+from a2a.server.events.queue_manager import NoTaskQueue, TaskQueueExists
+from redis.asyncio import Redis, RedisCluster
+
+from server.common.events import dump_event, parse_event
+
+logger = logging.getLogger(__name__)
+
+_FIELD_EVENT = 'event'
+_FIELD_CLOSE = 'close'
+
+
+def _decode(value: bytes | str) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class RedisStreamEventQueue(EventQueue):
+    """本地生产者使用的队列，入队事件同时写入redis stream，供其他节点 tap。"""
+
+    def __init__(self, manager: 'RedisStreamQueueManager', task_id: str) -> None:
+        super().__init__()
+        self.manager = manager
+        self.task_id = task_id
+        self._close_published = False
+
+    async def enqueue_event(self, event: Event) -> None:
+        if self.is_closed():
+            logger.warning('Queue is closed. Event will not be enqueued.')
+            return
+        await super().enqueue_event(event)
+        await self.manager.publish(self.task_id, {_FIELD_EVENT: dump_event(event)})
+
+    async def close(self, immediate: bool = False) -> None:
+        if not self._close_published:
+            self._close_published = True
+            await self.manager.publish(self.task_id, {_FIELD_CLOSE: '1'}, closing=True)
+        await super().close(immediate)
+
+
+class RedisStreamQueueManager(QueueManager):
+    """基于redis stream 的 QueueManager。
+
+    生产者所在节点的行为与 InMemoryQueueManager 一致；其他节点 tap 时从stream 读取后续事件，
+    使 tasks/resubscribe 等请求可以落在任意副本上。
+    """
+
+    def __init__(
+            self,
+            client: Redis | RedisCluster,
+            key_prefix: str = 'a2a',
+            stream_maxlen: int = 1000,
+            stream_ttl: int = 60 * 60,
+            heartbeat_interval: int = 10,
+            block_ms: int = 1000,
+    ) -> None:
+        self.client = client
+        self.key_prefix = key_prefix
+        self.stream_maxlen = stream_maxlen
+        self.stream_ttl = stream_ttl
+        self.heartbeat_interval = heartbeat_interval
+        self.block_ms = block_ms
+        self._task_queue: Dict[str, EventQueue] = {}
+        self._readers: Set[asyncio.Task] = set()
+        self._heartbeat_task: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+
+    def _stream_key(self, task_id: str) -> str:
+        return f'{self.key_prefix}:events:{task_id}'
+
+    def _active_key(self, task_id: str) -> str:
+        # 生产者存活标记，由心跳续期，生产者异常退出后过期
+        return f'{self.key_prefix}:producer:{task_id}'
+
+    async def publish(self, task_id: str, fields: Dict[str, str], closing: bool = False) -> None:
+        stream_key = self._stream_key(task_id)
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.xadd(stream_key, fields, maxlen=self.stream_maxlen, approximate=True)  # type: ignore[arg-type]
+                pipe.expire(stream_key, self.stream_ttl)
+                if closing:
+                    pipe.delete(self._active_key(task_id))
+                await pipe.execute()
+        except Exception as e:
+            # redis 不可用时不影响本节点的消费者
+            logger.error(f'Failed to publish event of task {task_id} to redis: {str(e)}')
+
+    async def add(self, task_id: str, queue: EventQueue) -> None:
+        if not isinstance(queue, RedisStreamEventQueue) or queue.manager is not self:
+            # 其他队列的事件不会写入stream，其他节点无法 tap
+            raise TypeError(f'queue of task {task_id} must be created by create_or_tap')
+        async with self._lock:
+            if task_id in self._task_queue:
+                raise TaskQueueExists
+            self._task_queue[task_id] = queue
+        await self._mark_active(task_id)
+
+    async def get(self, task_id: str) -> EventQueue | None:
+        async with self._lock:
+            return self._task_queue.get(task_id)
+
+    async def tap(self, task_id: str) -> EventQueue | None:
+        async with self._lock:
+            if task_id in self._task_queue:
+                return self._task_queue[task_id].tap()
+        return await self._tap_remote(task_id)
+
+    async def close(self, task_id: str) -> None:
+        async with self._lock:
+            if task_id not in self._task_queue:
+                raise NoTaskQueue
+            queue = self._task_queue.pop(task_id)
+        await queue.close()
+
+    async def shutdown(self) -> None:
+        """停止心跳及读取其他节点事件的协程，服务退出时调用。"""
+        tasks = list(self._readers)
+        if self._heartbeat_task is not None:
+            tasks.append(self._heartbeat_task)
+            self._heartbeat_task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def create_or_tap(self, task_id: str) -> EventQueue:
+        async with self._lock:
+            if task_id in self._task_queue:
+                return self._task_queue[task_id].tap()
+            queue = RedisStreamEventQueue(self, task_id)
+            self._task_queue[task_id] = queue
+        await self._mark_active(task_id)
+        return queue
+
+    async def _mark_active(self, task_id: str) -> None:
+        try:
+            await self.client.set(self._active_key(task_id), '1', ex=self.heartbeat_interval * 3)
+        except Exception as e:
+            logger.error(f'Failed to mark producer of task {task_id} active: {str(e)}')
+        if self._heartbeat_task is None:
+            self._heartbeat_task = asyncio.create_task(self._heartbeat())
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            for task_id in list(self._task_queue):
+                with contextlib.suppress(Exception):
+                    await self.client.expire(self._active_key(task_id), self.heartbeat_interval * 3)
+
+    async def _tap_remote(self, task_id: str) -> EventQueue | None:
+        if not await self.client.exists(self._active_key(task_id)):
+            return None
+        # 记录tap 时刻stream 的最新位置，只转发之后的事件，与本地tap 语义一致
+        latest = await self.client.xrevrange(self._stream_key(task_id), count=1)
+        last_id = _decode(latest[0][0]) if latest else '0-0'
+        queue = EventQueue()
+        reader = asyncio.create_task(self._read_stream(task_id, last_id, queue))
+        self._readers.add(reader)
+        reader.add_done_callback(self._readers.discard)
+        return queue
+
+    async def _read_stream(self, task_id: str, last_id: str, queue: EventQueue) -> None:
+        stream_key = self._stream_key(task_id)
+        try:
+            while not queue.is_closed():
+                response = await self.client.xread({stream_key: last_id}, block=self.block_ms, count=100)
+                if not response:
+                    # 生产者已退出且没有新事件
+                    if not await self.client.exists(self._active_key(task_id)):
+                        break
+                    continue
+                for _, entries in response:
+                    for entry_id, fields in entries:
+                        last_id = _decode(entry_id)
+                        fields = {_decode(k): _decode(v) for k, v in fields.items()}
+                        if _FIELD_CLOSE in fields:
+                            return
+                        await queue.enqueue_event(parse_event(fields[_FIELD_EVENT]))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f'Failed to read events of task {task_id} from redis: {str(e)}')
+        finally:
+            await queue.close()
@@ -0,0 +1,19 @@
+from abc import ABC, abstractmethod
+
+from server.common.model import RateLimit
+
+# JSON-RPC 服务端自定义错误码，对应 HTTP 429
+RATE_LIMITED_ERROR_CODE = -32030
+
+
+class RateLimiter(ABC):
+    """令牌桶限流。"""
+
+    @abstractmethod
+    async def acquire(self, key: str, limit: RateLimit) -> float:
+        """获取一个令牌。
+
+        Returns:
+            0 表示放行，否则为建议的重试等待时间（秒）
+        """
+        pass
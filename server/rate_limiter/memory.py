@@ -0,0 +1,31 @@
+import time
+
+from server.common.model import RateLimit
+from server.rate_limiter.base import RateLimiter
+from server.utils.ttl_cache import TTLCache
+
+
+class LocalRateLimiter(RateLimiter):
+    """进程内令牌桶，适用于单节点。
+
+    桶在补满所需时间后过期（过期与补满等价），并按LRU 限制key 的数量。
+    """
+
+    def __init__(self, max_keys: int = 100000) -> None:
+        # key -> [tokens, updated_at]
+        self._buckets: TTLCache[str, list] = TTLCache(max_keys, 0)
+
+    async def acquire(self, key: str, limit: RateLimit) -> float:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = limit.capacity
+        else:
+            tokens = min(limit.capacity, bucket[0] + (now - bucket[1]) * limit.rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / limit.rate
+        self._buckets.set(key, [tokens, now], ttl=(limit.capacity - tokens) / limit.rate)
+        return wait
@@ -0,0 +1,78 @@
+import logging
+
+from redis.asyncio import Redis, RedisCluster
+
+from server.common.model import RateLimit
+from server.rate_limiter.base import RateLimiter
+from server.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1]: 桶，ARGV: rate, capacity, requested
+# 使用redis 的时钟，避免各节点时钟偏差；返回 {获得的令牌数, 等待时间}
+_TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local granted = math.min(requested, math.floor(tokens))
+tokens = tokens - granted
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+local wait = 0
+if granted == 0 then
+    wait = (1 - tokens) / rate
+end
+return {granted, tostring(wait)}
+"""
+
+
+class RedisRateLimiter(RateLimiter):
+    """基于redis lua 脚本的分布式令牌桶，所有副本共享同一个桶。
+
+    每次从redis 预取 prefetch 个令牌在本地消费，不必每个请求都访问redis。预取的令牌已从共享桶扣除，不会超发，
+    代价是令牌在副本间分配不均，本地令牌在 prefetch_ttl 后作废。redis 不可用时放行。
+    """
+
+    def __init__(
+            self,
+            client: Redis | RedisCluster,
+            key_prefix: str = 'a2a',
+            prefetch: int = 1,
+            prefetch_ttl: float = 1.0,
+            max_keys: int = 100000,
+    ) -> None:
+        self.client = client
+        self.key_prefix = key_prefix
+        self.prefetch = max(1, prefetch)
+        self.prefetch_ttl = prefetch_ttl
+        self._script = client.register_script(_TOKEN_BUCKET_SCRIPT)
+        # key -> [本地剩余令牌]，过期后作废
+        self._local: TTLCache[str, list] = TTLCache(max_keys, prefetch_ttl)
+
+    async def acquire(self, key: str, limit: RateLimit) -> float:
+        local = self._local.get(key)
+        if local is not None and local[0] > 0:
+            local[0] -= 1
+            return 0
+        # 预取数不超过桶容量，小配额的agent 不至于被单个节点取空
+        requested = min(self.prefetch, max(1, int(limit.capacity)))
+        try:
+            granted, wait = await self._script(
+                keys=[f'{self.key_prefix}:ratelimit:{key}'],
+                args=[limit.rate, limit.capacity, requested],
+            )
+        except Exception as e:
+            logger.error(f'Failed to acquire rate limit token of {key} from redis: {str(e)}')
+            return 0
+        granted = int(granted)
+        if granted == 0:
+            return float(wait)
+        if granted > 1:
+            self._local.set(key, [granted - 1])
+        return 0
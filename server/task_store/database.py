@@ -0,0 +1,141 @@
+import asyncio
+import logging
+
+from typing import Any, Dict, List
+
+from a2a.server.context import ServerCallContext
+from a2a.server.tasks import DatabaseTaskStore
+from a2a.types import Task
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindDatabaseTaskStore(DatabaseTaskStore):
+    """带写缓冲的 DatabaseTaskStore。
+
+    save 只写入内存缓冲，同一task 的多次状态更新会合并为最后一次，由后台协程按
+    flush_interval 或缓冲达到 flush_batch_size 时批量upsert。get 优先读缓冲，保证读己之写。
+    """
+
+    def __init__(
+            self,
+            engine: AsyncEngine,
+            create_table: bool = True,
+            table_name: str = 'tasks',
+            flush_interval: float = 0.2,
+            flush_batch_size: int = 200,
+    ) -> None:
+        super().__init__(engine, create_table, table_name)
+        self.flush_interval = flush_interval
+        self.flush_batch_size = flush_batch_size
+        self._pending: Dict[str, Task] = {}
+        # 正在落库的批次，落库完成前 get 仍需可见
+        self._flushing: Dict[str, Task] = {}
+        self._flush_lock = asyncio.Lock()
+        self._init_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._flush_task: asyncio.Task | None = None
+        self._closed = False
+
+    async def save(self, task: Task, context: ServerCallContext | None = None) -> None:
+        self._pending[task.id] = task
+        if self._flush_task is None and not self._closed:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+        if len(self._pending) >= self.flush_batch_size or self._closed:
+            self._wakeup.set()
+
+    async def get(self, task_id: str, context: ServerCallContext | None = None) -> Task | None:
+        task = self._pending.get(task_id) or self._flushing.get(task_id)
+        if task:
+            return task
+        return await super().get(task_id, context)
+
+    async def delete(self, task_id: str, context: ServerCallContext | None = None) -> None:
+        self._pending.pop(task_id, None)
+        # 等待在途批次完成，避免删除后被旧数据覆盖
+        async with self._flush_lock:
+            await super().delete(task_id, context)
+
+    async def initialize(self) -> None:
+        # 并发的首次get 会重复建表，加锁保证只初始化一次
+        async with self._init_lock:
+            await super().initialize()
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            self._flushing = batch
+            try:
+                await self._upsert([self._to_row(task) for task in batch.values()])
+                logger.debug(f'flushed {len(batch)} tasks')
+            except Exception:
+                # 失败的批次放回缓冲等待重试，但不覆盖其间产生的更新
+                for task_id, task in batch.items():
+                    self._pending.setdefault(task_id, task)
+                raise
+            finally:
+                self._flushing = {}
+
+    async def close(self) -> None:
+        self._closed = True
+        self._wakeup.set()
+        if self._flush_task:
+            await self._flush_task
+            self._flush_task = None
+        await self.flush()
+
+    async def _flush_loop(self) -> None:
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f'Failed to flush tasks, {len(self._pending)} pending: {str(e)}')
+
+    def _to_row(self, task: Task) -> Dict[str, Any]:
+        # 落库前同步完成序列化，避免落库期间task 被修改
+        return {
+            'id': task.id,
+            'context_id': task.context_id,
+            'kind': task.kind,
+            'status': task.status.model_dump(mode='json'),
+            'artifacts': [artifact.model_dump(mode='json') for artifact in task.artifacts]
+            if task.artifacts is not None else None,
+            'history': [message.model_dump(mode='json') for message in task.history]
+            if task.history is not None else None,
+            'metadata': task.metadata,
+        }
+
+    async def _upsert(self, rows: List[Dict[str, Any]]) -> None:
+        await self._ensure_initialized()
+        table = self.task_model.__table__
+        dialect = self.engine.dialect.name
+        async with self.async_session_maker.begin() as session:
+            if dialect in ('sqlite', 'postgresql'):
+                if dialect == 'sqlite':
+                    from sqlalchemy.dialects.sqlite import insert
+                else:
+                    from sqlalchemy.dialects.postgresql import insert
+                stmt = insert(table)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[table.c.id],
+                    set_={column.name: stmt.excluded[column.name] for column in table.c if column.name != 'id'},
+                )
+                await session.execute(stmt, rows)
+            elif dialect == 'mysql':
+                from sqlalchemy.dialects.mysql import insert
+                stmt = insert(table)
+                stmt = stmt.on_duplicate_key_update(
+                    {column.name: stmt.inserted[column.name] for column in table.c if column.name != 'id'}
+                )
+                await session.execute(stmt, rows)
+            else:
+                for row in rows:
+                    await session.merge(self._to_orm(Task.model_validate(row)))
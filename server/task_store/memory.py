@@ -0,0 +1,186 @@
+import asyncio
+import heapq
+import logging
+import os
+import time
+
+from collections import OrderedDict
+from typing import List, NamedTuple, Tuple
+
+from a2a.server.context import ServerCallContext
+from a2a.server.tasks import TaskStore
+from a2a.types import Message, Task
+
+from server.common.events import TERMINAL_TASK_STATES
+from server.metrics.runtime import TASK_STORE_BYTES, TASK_STORE_EVICTIONS, TASK_STORE_TASKS
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry(NamedTuple):
+    data: bytes
+    # 过期的单调时钟时间，0 表示不过期
+    expire_at: float
+    # 最后一条已转存的history 消息
+    spilled_id: str | None = None
+
+
+class BoundedInMemoryTaskStore(TaskStore):
+    """内存占用有上限的 TaskStore。
+
+    - task 序列化后保存，按实际字节数统计内存，超过 max_tasks 或 max_bytes 时淘汰最久未访问的task，
+      优先淘汰终态task，执行中的task 只在没有终态task 可淘汰时才被淘汰
+    - 终态task（TERMINAL_TASK_STATES）在 terminal_ttl 后过期，非终态task 的过期时间为 ttl（0 表示不过期）
+    - history 只保留最近 max_history 条，配置 spill_dir 时更早的消息追加到 {spill_dir}/{task_id}.jsonl
+    """
+
+    def __init__(
+            self,
+            max_tasks: int = 100000,
+            max_bytes: int = 512 * 1024 * 1024,
+            terminal_ttl: float = 60 * 60,
+            ttl: float = 0,
+            max_history: int = 100,
+            spill_dir: str | None = None,
+    ) -> None:
+        self.max_tasks = max_tasks
+        self.max_bytes = max_bytes
+        self.terminal_ttl = terminal_ttl
+        self.ttl = ttl
+        self.max_history = max_history
+        self.spill_dir = spill_dir
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+        self._tasks: OrderedDict[str, _Entry] = OrderedDict()
+        # 终态task 的访问顺序，淘汰时优先选择
+        self._terminal: OrderedDict[str, None] = OrderedDict()
+        self._bytes = 0
+        # (expire_at, task_id)，task 更新后旧的过期时间作废，弹出时与当前值比较
+        self._expiry: List[Tuple[float, str]] = []
+        self._spill_lock = asyncio.Lock()
+        TASK_STORE_TASKS.set_callback(lambda: [((), len(self._tasks))])
+        TASK_STORE_BYTES.set_callback(lambda: [((), self._bytes)])
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    async def save(self, task: Task, context: ServerCallContext | None = None) -> None:
+        old = self._tasks.get(task.id)
+        spilled_id = old.spilled_id if old is not None else None
+        spilled: List[Message] = []
+        if self.max_history and task.history and len(task.history) > self.max_history:
+            cut = len(task.history) - self.max_history
+            # TaskManager 保留未截断的task，再次保存时跳过已转存的部分
+            start = 0
+            for i in range(cut - 1, -1, -1):
+                if task.history[i].message_id == spilled_id:
+                    start = i + 1
+                    break
+            spilled = task.history[start:cut]
+            if spilled:
+                spilled_id = spilled[-1].message_id
+            task = task.model_copy(update={'history': task.history[cut:]})
+        ttl = self.terminal_ttl if task.status.state in TERMINAL_TASK_STATES else self.ttl
+        now = time.monotonic()
+        entry = _Entry(task.model_dump_json(exclude_none=True).encode(), now + ttl if ttl else 0, spilled_id)
+        self._put(task.id, entry, task.status.state in TERMINAL_TASK_STATES)
+        if entry.expire_at and (old is None or old.expire_at != entry.expire_at):
+            heapq.heappush(self._expiry, (entry.expire_at, task.id))
+        self._expire(now)
+        if len(self._expiry) > 2 * len(self._tasks) + 64:
+            self._compact_expiry()
+        self._evict()
+        if spilled and self.spill_dir:
+            async with self._spill_lock:
+                await asyncio.to_thread(self._spill, task.id, spilled)
+
+    async def get(self, task_id: str, context: ServerCallContext | None = None) -> Task | None:
+        entry = self._tasks.get(task_id)
+        if entry is None:
+            return None
+        if entry.expire_at and entry.expire_at <= time.monotonic():
+            self._remove(task_id, 'expired')
+            return None
+        self._tasks.move_to_end(task_id)
+        if task_id in self._terminal:
+            self._terminal.move_to_end(task_id)
+        return Task.model_validate_json(entry.data)
+
+    async def delete(self, task_id: str, context: ServerCallContext | None = None) -> None:
+        if task_id in self._tasks:
+            self._remove(task_id, None)
+        if self.spill_dir:
+            await asyncio.to_thread(self._remove_spill, task_id)
+
+    def load_spilled_history(self, task_id: str) -> List[Message]:
+        """读取已转存到文件的history，按时间顺序，不包含仍保存在task 中的部分。"""
+        if not self.spill_dir:
+            return []
+        try:
+            with open(self._spill_path(task_id), encoding='utf-8') as f:
+                return [Message.model_validate_json(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def _put(self, task_id: str, entry: _Entry, terminal: bool) -> None:
+        old = self._tasks.pop(task_id, None)
+        if old is not None:
+            self._bytes -= len(old.data)
+        self._tasks[task_id] = entry
+        self._bytes += len(entry.data)
+        self._terminal.pop(task_id, None)
+        if terminal:
+            self._terminal[task_id] = None
+
+    def _remove(self, task_id: str, reason: str | None) -> None:
+        entry = self._tasks.pop(task_id)
+        self._bytes -= len(entry.data)
+        self._terminal.pop(task_id, None)
+        if reason is not None:
+            TASK_STORE_EVICTIONS.inc(reason)
+            if self.spill_dir:
+                # 转存的history 随task 一起清理，不阻塞事件循环
+                asyncio.get_running_loop().run_in_executor(None, self._remove_spill, task_id)
+
+    def _expire(self, now: float) -> None:
+        while self._expiry and self._expiry[0][0] <= now:
+            expire_at, task_id = heapq.heappop(self._expiry)
+            entry = self._tasks.get(task_id)
+            if entry is not None and entry.expire_at == expire_at:
+                self._remove(task_id, 'expired')
+
+    def _compact_expiry(self) -> None:
+        # 丢弃已作废的过期时间，堆的大小与task 数一致
+        self._expiry = [(entry.expire_at, task_id) for task_id, entry in self._tasks.items() if entry.expire_at]
+        heapq.heapify(self._expiry)
+
+    def _evict(self) -> None:
+        while self._tasks and (len(self._tasks) > self.max_tasks or self._bytes > self.max_bytes):
+            # 先淘汰终态task，执行中的task 被淘汰后 tasks/get 会返回不存在
+            task_id = next(iter(self._terminal)) if self._terminal else next(iter(self._tasks))
+            if len(self._tasks) == 1:
+                # 单个task 超过 max_bytes 时仍然保留
+                break
+            logger.info(f'task store is full ({len(self._tasks)} tasks, {self._bytes} bytes), evict task {task_id}')
+            self._remove(task_id, 'lru')
+
+    def _spill_path(self, task_id: str) -> str:
+        assert self.spill_dir is not None
+        # task_id 来自客户端时可能包含路径分隔符
+        return os.path.join(self.spill_dir, f'{task_id.replace("/", "_").replace(os.sep, "_")}.jsonl')
+
+    def _spill(self, task_id: str, messages: List[Message]) -> None:
+        with open(self._spill_path(task_id), 'a', encoding='utf-8') as f:
+            for message in messages:
+                f.write(message.model_dump_json(exclude_none=True))
+                f.write('\n')
+
+    def _remove_spill(self, task_id: str) -> None:
+        try:
+            os.remove(self._spill_path(task_id))
+        except FileNotFoundError:
+            pass
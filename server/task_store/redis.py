@@ -0,0 +1,69 @@
+import json
+import logging
+
+from typing import Any, Dict
+
+from a2a.server.context import ServerCallContext
+from a2a.server.tasks import TaskStore
+from a2a.types import Task
+from redis.asyncio import Redis, RedisCluster
+
+from server.common.events import TERMINAL_TASK_STATES
+
+logger = logging.getLogger(__name__)
+
+# 以hash 存储task，每个顶层字段一个field，值为json
+_JSON_FIELDS = ('status', 'artifacts', 'history', 'metadata')
+
+
+class RedisTaskStore(TaskStore):
+    """基于redis hash 的 TaskStore，多副本共享task 状态。
+
+    终态task 设置 terminal_ttl 后自动过期，非终态task 的过期时间为 ttl（None 表示不过期）。
+    """
+
+    def __init__(
+            self,
+            client: Redis | RedisCluster,
+            key_prefix: str = 'a2a',
+            terminal_ttl: int | None = 24 * 60 * 60,
+            ttl: int | None = None,
+    ) -> None:
+        self.client = client
+        self.key_prefix = key_prefix
+        self.terminal_ttl = terminal_ttl
+        self.ttl = ttl
+
+    def _key(self, task_id: str) -> str:
+        return f'{self.key_prefix}:task:{task_id}'
+
+    async def save(self, task: Task, context: ServerCallContext | None = None) -> None:
+        key = self._key(task.id)
+        mapping: Dict[str, Any] = {'id': task.id, 'context_id': task.context_id, 'kind': task.kind}
+        data = task.model_dump(mode='json', include=set(_JSON_FIELDS))
+        mapping.update({field: json.dumps(data.get(field)) for field in _JSON_FIELDS})
+        ttl = self.terminal_ttl if task.status.state in TERMINAL_TASK_STATES else self.ttl
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.hset(key, mapping=mapping)
+            if ttl:
+                pipe.expire(key, ttl)
+            else:
+                pipe.persist(key)
+            await pipe.execute()
+        logger.debug(f'Task {task.id} saved to redis.')
+
+    async def get(self, task_id: str, context: ServerCallContext | None = None) -> Task | None:
+        raw = await self.client.hgetall(self._key(task_id))
+        if not raw:
+            return None
+        data = {_decode(k): _decode(v) for k, v in raw.items()}
+        for field in _JSON_FIELDS:
+            data[field] = json.loads(data[field]) if data.get(field) else None
+        return Task.model_validate(data)
+
+    async def delete(self, task_id: str, context: ServerCallContext | None = None) -> None:
+        await self.client.delete(self._key(task_id))
+
+
+def _decode(value: bytes | str) -> str:
+    return value.decode() if isinstance(value, bytes) else value
@@ -0,0 +1,19 @@
+import random
+
+
+class Backoff:
+    """指数退避（full jitter），用于重连/重试。"""
+
+    def __init__(self, base: float = 0.5, cap: float = 30.0, factor: float = 2.0) -> None:
+        self.base = base
+        self.cap = cap
+        self.factor = factor
+        self.attempts = 0
+
+    def next(self) -> float:
+        delay = min(self.cap, self.base * self.factor ** self.attempts)
+        self.attempts += 1
+        return random.uniform(0, delay)
+
+    def reset(self) -> None:
+        self.attempts = 0
@@ -0,0 +1,47 @@
+import asyncio
+
+from typing import Awaitable, Callable, Dict, Generic, TypeVar
+
+T = TypeVar('T')
+
+
+class _Flight(Generic[T]):
+    def __init__(self, task: asyncio.Future[T]) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight(Generic[T]):
+    """同一key 的并发调用合并为一次，其余调用方等待同一结果。
+
+    fn 在独立的协程中执行，任一调用方被取消不影响其他调用方；所有调用方都取消后才取消 fn。
+    """
+
+    def __init__(self) -> None:
+        self._inflight: Dict[str, _Flight[T]] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        flight = self._inflight.get(key)
+        if flight is None:
+            flight = self._inflight[key] = _Flight(asyncio.ensure_future(fn()))
+            flight.task.add_done_callback(lambda task: self._done(key, flight))
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if not flight.waiters and not flight.task.done():
+                flight.task.cancel()
+
+    def _done(self, key: str, flight: _Flight[T]) -> None:
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+        if not flight.task.cancelled():
+            # 没有其他等待者时避免 "exception was never retrieved"
+            flight.task.exception()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._inflight
+
+    def __len__(self) -> int:
+        return len(self._inflight)
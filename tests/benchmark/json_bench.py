@@ -0,0 +1,112 @@
+"""JSON-RPC 响应/SSE 事件序列化对比：默认路径 vs fast_json。
+
+    python -m tests.benchmark.json_bench --events 20000 --requests 500
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import InMemoryTaskStore
+from a2a.types import (
+    AgentCapabilities,
+    SendStreamingMessageResponse,
+    SendStreamingMessageSuccessResponse,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+)
+from a2a.utils import new_agent_text_message
+from sse_starlette.sse import ServerSentEvent
+from starlette.responses import JSONResponse
+
+from main import init_agent_config_store, init_agent_loader
+from server.a2a2.agent_execution.runtime_agent_executor import RuntimeAgentExecutor
+from server.a2a2.apps.jsonrpc import fast_json
+from server.a2a2.apps.jsonrpc.runtime_fastapi_app import RuntimeA2AFastAPIApplication
+
+
+def _event(i: int) -> SendStreamingMessageResponse:
+    return SendStreamingMessageResponse(root=SendStreamingMessageSuccessResponse(
+        id=str(i),
+        result=TaskStatusUpdateEvent(
+            task_id=f'task-{i}',
+            context_id=f'ctx-{i}',
+            final=False,
+            status=TaskStatus(state=TaskState.working, message=new_agent_text_message('先去故宫')),
+        ),
+    ))
+
+
+def bench_events(events: int) -> None:
+    items = [_event(i) for i in range(events)]
+
+    def default(item: SendStreamingMessageResponse) -> bytes:
+        return ServerSentEvent(data=item.root.model_dump_json(exclude_none=True)).encode()
+
+    def fast(item: SendStreamingMessageResponse) -> bytes:
+        return fast_json.sse_event(fast_json.model_bytes(item.root))
+
+    def default_response(item: SendStreamingMessageResponse) -> bytes:
+        return JSONResponse(item.root.model_dump(mode='json', exclude_none=True)).body
+
+    def fast_response(item: SendStreamingMessageResponse) -> bytes:
+        return fast_json.FastJSONResponse(fast_json.model_bytes(item.root)).body
+
+    for name, fn in (('sse default', default), ('sse fast_json', fast),
+                     ('response default', default_response), ('response fast_json', fast_response)):
+        start = time.process_time()
+        for item in items:
+            fn(item)
+        cpu = time.process_time() - start
+        print(f'{name:<24} {events} events, {cpu / events * 1e6:.2f}us cpu/event')
+
+
+async def bench_requests(requests: int, fast: bool) -> None:
+    agent_config_store = init_agent_config_store()
+    server = RuntimeA2AFastAPIApplication(
+        agent_config_store=agent_config_store,
+        notifier=None,
+        agent_card=agent_config_store.snapshot.configs[0].get_card().model_copy(
+            update={'capabilities': AgentCapabilities(streaming=True)}
+        ),
+        http_handler=DefaultRequestHandler(
+            agent_executor=RuntimeAgentExecutor(init_agent_loader()),
+            task_store=InMemoryTaskStore(),
+        ),
+        fast_json=fast,
+    )
+    transport = httpx.ASGITransport(app=server.build())
+    async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+        for method in ('message/send', 'message/stream'):
+            start, cpu = time.perf_counter(), time.process_time()
+            for i in range(requests):
+                request = {
+                    'jsonrpc': '2.0',
+                    'id': str(i),
+                    'method': method,
+                    'params': {'message': {'role': 'user', 'parts': [{'kind': 'text', 'text': 'hi'}],
+                                           'messageId': f'm{i}'}},
+                }
+                response = await client.post('/default/travel/', json=request)
+                response.raise_for_status()
+            elapsed, cpu = time.perf_counter() - start, time.process_time() - cpu
+            name = f'{method} {"fast_json" if fast else "default"}'
+            print(f'{name:<24} {requests / elapsed:,.0f} req/s, {cpu / requests * 1e3:.2f}ms cpu/req')
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--events', type=int, default=20000)
+    parser.add_argument('--requests', type=int, default=500)
+    args = parser.parse_args()
+
+    bench_events(args.events)
+    for fast in (False, True):
+        await bench_requests(args.requests, fast)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,350 @@
+"""进程内启动 runtime 的压测：按权重混合 agent card GET、message/send、message/stream、tasks/get，
+输出各操作的吞吐及 p50/p95/p99 延迟，并与保存的基线对比，存在退化时以非0 退出。
+
+    python -m tests.benchmark.runtime_bench --transport asgi --duration 10 --concurrency 20
+    python -m tests.benchmark.runtime_bench --transport uvicorn --mix card=1,send=4,stream=2,get=2 --latency 0.01
+    python -m tests.benchmark.runtime_bench --scenario asgi --save-baseline
+    python -m tests.benchmark.runtime_bench --scenario asgi --check --tolerance 0.3
+
+asgi 模式经 httpx.ASGITransport 直接调用应用，只衡量runtime 本身；uvicorn 模式在本进程的事件循环中
+启动真实的uvicorn 服务并经socket 访问，包含HTTP 解析及网络栈的开销。
+基线保存在 baseline.json 中（包括场景参数），与机器相关，更换CI 机器后需要重新生成。
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import AsyncIterator, Dict, List
+
+import httpx
+import uvicorn
+
+from a2a.server.agent_execution import AgentExecutor, RequestContext
+from a2a.server.events import EventQueue
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import InMemoryTaskStore, TaskUpdater
+from a2a.types import AgentCapabilities, AgentCard, TaskState
+from a2a.utils import new_agent_text_message
+from fastapi import FastAPI
+from sse_starlette.sse import AppStatus
+
+from server.a2a2.agent_execution.runtime_agent_executor import RuntimeAgentExecutor
+from server.a2a2.apps.jsonrpc.runtime_fastapi_app import RuntimeA2AFastAPIApplication
+from server.common.model import AgentConfig
+from server.config_store.default import DefaultAgentConfigStore
+from server.loader.default import DefaultAgentLoader
+from server.loader.registry import register_executor
+
+BASELINE_PATH = Path(__file__).with_name('baseline.json')
+OPERATIONS = ('card', 'send', 'stream', 'get')
+NAMESPACE = 'bench'
+
+
+class StubAgentExecutor(AgentExecutor):
+    """每次执行等待 latency 秒，共产生 events 个状态更新（最后一个为 completed）。"""
+    latency: float = 0
+    events: int = 3
+
+    async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
+        updater = TaskUpdater(event_queue, context.task_id, context.context_id)
+        interval = self.latency / self.events
+        for i in range(self.events - 1):
+            if interval:
+                await asyncio.sleep(interval)
+            await updater.update_status(TaskState.working, message=new_agent_text_message(f'step {i}'))
+        if interval:
+            await asyncio.sleep(interval)
+        await updater.update_status(TaskState.completed, message=new_agent_text_message('done'))
+
+    async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
+        pass
+
+
+@dataclass
+class Scenario:
+    transport: str = 'asgi'
+    mix: Dict[str, float] = field(default_factory=lambda: {'card': 1, 'send': 4, 'stream': 2, 'get': 2})
+    concurrency: int = 20
+    duration: float = 10
+    agents: int = 10
+    latency: float = 0
+    events: int = 3
+    seed: int = 0
+
+
+@dataclass
+class OperationStats:
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+
+    def summary(self, elapsed: float) -> Dict[str, float]:
+        latencies = sorted(self.latencies)
+        return {
+            'requests': len(latencies),
+            'errors': self.errors,
+            'rps': round(len(latencies) / elapsed, 1),
+            'p50_ms': round(_percentile(latencies, 50) * 1e3, 3),
+            'p95_ms': round(_percentile(latencies, 95) * 1e3, 3),
+            'p99_ms': round(_percentile(latencies, 99) * 1e3, 3),
+        }
+
+
+def _percentile(values: List[float], q: float) -> float:
+    # nearest-rank
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, round(q / 100 * len(values) + 0.5) - 1))]
+
+
+def build_app(scenario: Scenario) -> FastAPI:
+    StubAgentExecutor.latency = scenario.latency
+    StubAgentExecutor.events = max(1, scenario.events)
+    agent_configs = []
+    for i in range(scenario.agents):
+        name = f'stub-{i}'
+        register_executor(f'{NAMESPACE}/{name}')(StubAgentExecutor)
+        card = _card(name)
+        agent_configs.append(AgentConfig(
+            namespace=NAMESPACE, name=name, card=card.model_dump(), extended_card=card.model_dump(),
+        ))
+    server = RuntimeA2AFastAPIApplication(
+        agent_config_store=DefaultAgentConfigStore(agent_configs=agent_configs),
+        notifier=None,
+        agent_card=_card('runtime'),
+        http_handler=DefaultRequestHandler(
+            agent_executor=RuntimeAgentExecutor(DefaultAgentLoader()),
+            task_store=InMemoryTaskStore(),
+        ),
+    )
+    return server.build()
+
+
+def _card(name: str) -> AgentCard:
+    return AgentCard(
+        name=name,
+        description='benchmark stub agent',
+        url=f'http://localhost/{NAMESPACE}/{name}',
+        version='1.0.0',
+        default_input_modes=['text'],
+        default_output_modes=['text'],
+        capabilities=AgentCapabilities(streaming=True),
+        skills=[],
+        supports_authenticated_extended_card=True,
+    )
+
+
+@asynccontextmanager
+async def serve(app: FastAPI, transport: str) -> AsyncIterator[httpx.AsyncClient]:
+    # sse-starlette 的退出事件绑定在首次使用它的事件循环上
+    AppStatus.should_exit_event = None
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    if transport == 'asgi':
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://bench',
+                                     limits=limits, timeout=60) as client:
+            yield client
+        return
+    if transport != 'uvicorn':
+        raise ValueError(f'Unknown transport {transport}')
+    server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=0, log_level='warning'))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        async with httpx.AsyncClient(base_url=f'http://127.0.0.1:{port}', limits=limits, timeout=60) as client:
+            yield client
+    finally:
+        server.should_exit = True
+        await task
+
+
+def _message_request(method: str) -> Dict:
+    return {
+        'jsonrpc': '2.0',
+        'id': uuid.uuid4().hex,
+        'method': method,
+        'params': {'message': {'role': 'user', 'parts': [{'kind': 'text', 'text': 'hi'}],
+                               'messageId': uuid.uuid4().hex}},
+    }
+
+
+async def _call(client: httpx.AsyncClient, operation: str, agent: str, task_ids: List[str]) -> None:
+    if operation == 'card':
+        response = await client.get(f'/{NAMESPACE}/{agent}/.well-known/agent-card.json')
+        response.raise_for_status()
+        return
+    if operation == 'send':
+        response = await client.post(f'/{NAMESPACE}/{agent}/', json=_message_request('message/send'))
+        response.raise_for_status()
+        result = response.json()['result']
+        task_ids.append(result['id'])
+        if len(task_ids) > 1000:
+            del task_ids[:500]
+        return
+    if operation == 'stream':
+        request = _message_request('message/stream')
+        async with client.stream('POST', f'/{NAMESPACE}/{agent}/', json=request) as response:
+            response.raise_for_status()
+            final = False
+            async for line in response.aiter_lines():
+                if line.startswith('data: '):
+                    data = json.loads(line[len('data: '):])
+                    if 'error' in data:
+                        raise RuntimeError(data['error'])
+                    final = final or data['result'].get('final', False)
+            if not final:
+                raise RuntimeError('stream ended without a final event')
+        return
+    if operation == 'get':
+        if not task_ids:
+            # 还没有可查询的task，先创建一个
+            await _call(client, 'send', agent, task_ids)
+        request = {'jsonrpc': '2.0', 'id': uuid.uuid4().hex, 'method': 'tasks/get',
+                   'params': {'id': random.choice(task_ids)}}
+        response = await client.post(f'/{NAMESPACE}/{agent}/', json=request)
+        response.raise_for_status()
+        if 'error' in response.json():
+            raise RuntimeError(response.json()['error'])
+        return
+    raise ValueError(f'Unknown operation {operation}')
+
+
+async def run(scenario: Scenario) -> Dict:
+    random.seed(scenario.seed)
+    operations = [op for op in OPERATIONS if scenario.mix.get(op)]
+    weights = [scenario.mix[op] for op in operations]
+    agents = [f'stub-{i}' for i in range(scenario.agents)]
+    stats = {op: OperationStats() for op in operations}
+    task_ids: Dict[str, List[str]] = {agent: [] for agent in agents}
+    app = build_app(scenario)
+
+    async with serve(app, scenario.transport) as client:
+        # 预热：加载executor 并创建可查询的task
+        for agent in agents:
+            await _call(client, 'send', agent, task_ids[agent])
+
+        deadline = time.perf_counter() + scenario.duration
+
+        async def worker() -> None:
+            while time.perf_counter() < deadline:
+                operation = random.choices(operations, weights)[0]
+                agent = random.choice(agents)
+                start = time.perf_counter()
+                try:
+                    await _call(client, operation, agent, task_ids[agent])
+                except Exception:
+                    stats[operation].errors += 1
+                    continue
+                stats[operation].latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(scenario.concurrency)))
+        elapsed = time.perf_counter() - start
+
+    total = sum(len(s.latencies) for s in stats.values())
+    return {
+        'scenario': asdict(scenario),
+        'elapsed': round(elapsed, 3),
+        'rps': round(total / elapsed, 1),
+        'errors': sum(s.errors for s in stats.values()),
+        'operations': {op: s.summary(elapsed) for op, s in stats.items()},
+    }
+
+
+def compare(result: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """返回退化项：p95 延迟高于基线 (1 + tolerance) 倍，或吞吐低于基线的 1 / (1 + tolerance)。"""
+    regressions = []
+    if result['errors']:
+        regressions.append(f'{result["errors"]} requests failed')
+    if result['rps'] * (1 + tolerance) < baseline['rps']:
+        regressions.append(f'throughput {result["rps"]} req/s < baseline {baseline["rps"]} req/s')
+    for op, base in baseline['operations'].items():
+        current = result['operations'].get(op)
+        if current is None:
+            continue
+        if current['p95_ms'] > base['p95_ms'] * (1 + tolerance):
+            regressions.append(f'{op} p95 {current["p95_ms"]}ms > baseline {base["p95_ms"]}ms')
+        if current['rps'] * (1 + tolerance) < base['rps']:
+            regressions.append(f'{op} throughput {current["rps"]} req/s < baseline {base["rps"]} req/s')
+    return regressions
+
+
+def load_baseline(scenario_name: str, path: Path = BASELINE_PATH) -> Dict | None:
+    if not path.exists():
+        return None
+    return json.loads(path.read_text()).get(scenario_name)
+
+
+def save_baseline(scenario_name: str, result: Dict, path: Path = BASELINE_PATH) -> None:
+    baselines = json.loads(path.read_text()) if path.exists() else {}
+    baselines[scenario_name] = result
+    path.write_text(json.dumps(baselines, indent=2, sort_keys=True) + '\n')
+
+
+def print_result(name: str, result: Dict) -> None:
+    print(f'{name}: {result["rps"]:,.1f} req/s, {result["errors"]} errors in {result["elapsed"]}s')
+    print(f'{"operation":<10} {"requests":>9} {"errors":>7} {"req/s":>9} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9}')
+    for op, s in result['operations'].items():
+        print(f'{op:<10} {s["requests"]:>9} {s["errors"]:>7} {s["rps"]:>9.1f} '
+              f'{s["p50_ms"]:>9.2f} {s["p95_ms"]:>9.2f} {s["p99_ms"]:>9.2f}')
+
+
+def _parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for item in value.split(','):
+        op, _, weight = item.partition('=')
+        if op not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f'unknown operation {op}, expected one of {OPERATIONS}')
+        mix[op] = float(weight or 1)
+    return mix
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scenario', help='基线中的场景名，默认与 transport 相同')
+    parser.add_argument('--transport', choices=('asgi', 'uvicorn'), default='asgi')
+    parser.add_argument('--mix', type=_parse_mix, default='card=1,send=4,stream=2,get=2')
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--agents', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0, help='stub agent 每次执行的耗时（秒）')
+    parser.add_argument('--events', type=int, default=3, help='stub agent 每次执行产生的事件数')
+    parser.add_argument('--check', action='store_true', help='与基线对比，存在退化时退出码为1')
+    parser.add_argument('--tolerance', type=float, default=0.3)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH)
+    args = parser.parse_args()
+
+    scenario = Scenario(
+        transport=args.transport, mix=args.mix, concurrency=args.concurrency, duration=args.duration,
+        agents=args.agents, latency=args.latency, events=args.events,
+    )
+    name = args.scenario or args.transport
+    result = await run(scenario)
+    print_result(name, result)
+    if args.save_baseline:
+        save_baseline(name, result, args.baseline)
+        print(f'baseline {name} saved to {args.baseline}')
+    if args.check:
+        baseline = load_baseline(name, args.baseline)
+        if baseline is None:
+            print(f'no baseline for {name} in {args.baseline}')
+            return 1
+        regressions = compare(result, baseline, args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,62 @@
+"""TaskStore 吞吐对比：模拟 TravelExecutor 每个task 连续多次状态更新。
+
+    python -m tests.benchmark.task_store_bench --tasks 2000 --updates 4
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+
+from a2a.server.tasks import DatabaseTaskStore, InMemoryTaskStore, TaskStore
+from a2a.types import Task, TaskState, TaskStatus
+
+from server.libs.database.engine import DatabaseConfig, get_async_engine
+from server.task_store.database import WriteBehindDatabaseTaskStore
+
+STATES = [TaskState.submitted, TaskState.working, TaskState.working, TaskState.completed]
+
+
+async def run(store: TaskStore, tasks: int, updates: int, concurrency: int) -> float:
+    if isinstance(store, DatabaseTaskStore):
+        await store.initialize()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            for u in range(updates):
+                state = STATES[min(u, len(STATES) - 1)]
+                await store.save(Task(id=f'task-{i}', context_id=f'ctx-{i}', status=TaskStatus(state=state)))
+                await store.get(f'task-{i}')
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(tasks)))
+    if isinstance(store, WriteBehindDatabaseTaskStore):
+        await store.close()
+    return time.perf_counter() - start
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tasks', type=int, default=2000)
+    parser.add_argument('--updates', type=int, default=4)
+    parser.add_argument('--concurrency', type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        stores = {
+            'memory': lambda: InMemoryTaskStore(),
+            'database': lambda: DatabaseTaskStore(
+                get_async_engine(DatabaseConfig(url=f'sqlite+aiosqlite:///{tmp}/plain.db'))
+            ),
+            'database-write-behind': lambda: WriteBehindDatabaseTaskStore(
+                get_async_engine(DatabaseConfig(url=f'sqlite+aiosqlite:///{tmp}/write_behind.db'))
+            ),
+        }
+        saves = args.tasks * args.updates
+        for name, factory in stores.items():
+            elapsed = await run(factory(), args.tasks, args.updates, args.concurrency)
+            print(f'{name:<24} {saves} saves in {elapsed:.3f}s, {saves / elapsed:,.0f} saves/s')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+import asyncio
+
+import httpx
+import pytest
+
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import InMemoryTaskStore
+
+from main import init_agent_config_store, init_agent_loader
+from server.a2a2.agent_execution.admission import AdmissionController, AdmissionRejected
+from server.a2a2.agent_execution.runtime_agent_executor import RuntimeAgentExecutor
+from server.a2a2.apps.jsonrpc.runtime_fastapi_app import RuntimeA2AFastAPIApplication
+from server.common.model import AgentConfig
+
+
+@pytest.mark.asyncio
+async def test_admission_queue_and_deadline():
+    admission = AdmissionController()
+    agent_config = AgentConfig(namespace='default', name='slow', card={},
+                               max_concurrency=1, max_queue=1, max_wait_seconds=0.05)
+    async with admission.admit(agent_config):
+        waiter = asyncio.create_task(admission.admit(agent_config).__aenter__())
+        await asyncio.sleep(0)
+        # 队列已满，直接拒绝
+        with pytest.raises(AdmissionRejected):
+            async with admission.admit(agent_config):
+                pass
+        # 等待超时
+        with pytest.raises(AdmissionRejected):
+            await waiter
+    stats = admission.stats()['agents']['default/slow']
+    assert stats == {'limit': 1, 'active': 0, 'waiting': 0, 'rejected': 2, 'timeouts': 1}
+
+
+@pytest.mark.asyncio
+async def test_admission_agent_queue_does_not_hold_namespace():
+    admission = AdmissionController(namespace_limits={'default': 2})
+    slow = AgentConfig(namespace='default', name='slow', card={},
+                       max_concurrency=1, max_queue=1, max_wait_seconds=1)
+    other = AgentConfig(namespace='default', name='other', card={}, max_wait_seconds=0.05)
+    async with admission.admit(slow):
+        waiter = asyncio.create_task(admission.admit(slow).__aenter__())
+        await asyncio.sleep(0)
+        # 排队中的 slow 请求不占用namespace 的名额，other 可以立即执行
+        async with admission.admit(other):
+            assert admission.stats()['namespaces']['default']['active'] == 2
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+    assert admission.stats()['namespaces']['default']['active'] == 0
+
+
+@pytest.mark.asyncio
+async def test_admission_http_429():
+    agent_config_store = init_agent_config_store()
+    agent_config = agent_config_store.snapshot.configs[0].model_copy(update={'max_concurrency': 1, 'max_queue': 0})
+    await agent_config_store.upsert(agent_config)
+    admission = AdmissionController()
+    server = RuntimeA2AFastAPIApplication(
+        agent_config_store=agent_config_store,
+        notifier=None,
+        agent_card=agent_config.get_card(),
+        http_handler=DefaultRequestHandler(
+            agent_executor=RuntimeAgentExecutor(init_agent_loader(), admission),
+            task_store=InMemoryTaskStore(),
+        ),
+        admission=admission,
+    )
+    request = {
+        'jsonrpc': '2.0',
+        'id': '1',
+        'method': 'message/send',
+        'params': {'message': {'role': 'user', 'parts': [{'kind': 'text', 'text': 'hi'}], 'messageId': 'm1'}},
+    }
+    transport = httpx.ASGITransport(app=server.build())
+    async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+        async with admission.admit(agent_config):
+            response = await client.post('/default/helloworld/', json=request)
+            assert response.status_code == 429
+            assert int(response.headers['retry-after']) >= 1
+            assert response.json()['error']['code'] == -32029
+
+        response = await client.post('/default/helloworld/', json=request)
+        assert response.status_code == 200
+        assert 'result' in response.json()
@@ -0,0 +1,156 @@
+import asyncio
+
+import pytest
+
+from a2a.server.agent_execution import AgentExecutor
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import InMemoryTaskStore
+
+from agent.helloworld.agent_executor import HelloWorldAgentExecutor
+from main import init_agent_config_store
+from server.a2a2.agent_execution.runtime_agent_executor import RuntimeAgentExecutor
+from server.a2a2.apps.jsonrpc.runtime_fastapi_app import RuntimeA2AFastAPIApplication
+from server.common.model import AgentConfig
+from server.conf import settings
+from server.config_store.default import DefaultAgentConfigStore
+from server.config_store.snapshot import AgentConfigSnapshot
+from server.loader.cache import ExecutorCache
+from server.loader.default import DefaultAgentLoader
+from server.loader.registry import register_executor
+
+CALLED = []
+
+
+def not_an_executor():
+    CALLED.append(1)
+
+
+def _config(name: str, executor: str | None = None) -> AgentConfig:
+    return AgentConfig(namespace='test', name=name, card={}, executor=executor)
+
+
+def test_load_executor_from_config_ref():
+    loader = DefaultAgentLoader()
+    agent_config = _config('hello', 'agent.helloworld.agent_executor:HelloWorldAgentExecutor')
+    executor = loader.load_executor(agent_config)
+    assert isinstance(executor, HelloWorldAgentExecutor)
+    assert loader.load_executor(agent_config) is executor
+    assert 'test/hello' in loader.load_seconds
+
+
+def test_load_executor_from_registry():
+    @register_executor('test/registered')
+    class RegisteredExecutor(AgentExecutor):
+        async def execute(self, context, event_queue):
+            pass
+
+        async def cancel(self, context, event_queue):
+            pass
+
+    assert isinstance(DefaultAgentLoader().load_executor(_config('registered')), RegisteredExecutor)
+
+
+def test_load_executor_not_found():
+    loader = DefaultAgentLoader()
+    with pytest.raises(ValueError):
+        loader.load_executor(_config('unknown'))
+    with pytest.raises(ValueError):
+        loader.load_executor(_config('bad', 'agent.helloworld.agent_executor:HelloWorldAgent'))
+    # 不是executor 类的引用不会被调用
+    with pytest.raises(ValueError):
+        loader.load_executor(_config('func', 'test_agent_loader:not_an_executor'))
+    assert not CALLED
+    loader.prewarm([_config('unknown')])
+
+
+@pytest.mark.asyncio
+async def test_prewarm_on_startup(monkeypatch):
+    hello = init_agent_config_store().snapshot.configs[0]
+
+    class LazyStore(DefaultAgentConfigStore):
+        """与 APIAgentConfigStore 相同，首次 list 时才加载agent config。"""
+
+        async def list(self):
+            if not self.snapshot.configs:
+                await self.upsert(hello)
+            return await super().list()
+
+    monkeypatch.setattr(settings, 'AGENT_PREWARM', [hello.namespace_name])
+    store = LazyStore(agent_configs=[])
+    loader = DefaultAgentLoader()
+    server = RuntimeA2AFastAPIApplication(
+        agent_config_store=store,
+        notifier=None,
+        agent_card=hello.get_card(),
+        http_handler=DefaultRequestHandler(
+            agent_executor=RuntimeAgentExecutor(loader),
+            task_store=InMemoryTaskStore(),
+        ),
+    )
+    app = server.build()
+    async with app.router.lifespan_context(app):
+        assert hello.namespace_name in loader.load_seconds
+
+
+class ClosableExecutor(AgentExecutor):
+    closed = []
+
+    async def execute(self, context, event_queue):
+        pass
+
+    async def cancel(self, context, event_queue):
+        pass
+
+    async def close(self):
+        ClosableExecutor.closed.append(self)
+
+
+@pytest.mark.asyncio
+async def test_executor_cache_eviction():
+    configs = [_config(name) for name in ('a', 'b', 'c')]
+    for agent_config in configs:
+        register_executor(agent_config.namespace_name)(ClosableExecutor)
+    store = DefaultAgentConfigStore(agent_configs=configs)
+    loader = DefaultAgentLoader(max_size=2)
+    store.add_listener(loader.retain)
+
+    a = loader.load_executor(configs[0])
+    loader.load_executor(configs[1])
+    loader.load_executor(configs[2])
+    await asyncio.sleep(0)
+    # 超过上限淘汰最久未使用的
+    assert ClosableExecutor.closed == [a]
+
+    # 删除/变更后失效，使用中的executor 在释放后才关闭
+    async with loader.use(configs[1]) as b:
+        await store.delete(configs[1])
+        await asyncio.sleep(0)
+        assert b not in ClosableExecutor.closed
+    await asyncio.sleep(0)
+    assert b in ClosableExecutor.closed
+
+    c = loader.load_executor(configs[2])
+    await store.upsert(configs[2].model_copy(update={'card': {'version': '2'}}))
+    await loader.close()
+    assert c in ClosableExecutor.closed
+
+
+@pytest.mark.asyncio
+async def test_executor_cache_idle_eviction():
+    cache = ExecutorCache(idle_seconds=0.05)
+    configs = [_config(name) for name in ('long', 'idle')]
+    long = cache.put(configs[0], ClosableExecutor())
+    long.in_use += 1
+    idle = cache.put(configs[1], ClosableExecutor())
+    await asyncio.sleep(0.03)
+    # 先开始、后结束的执行不阻挡其后空闲的executor 被淘汰
+    cache.release(long)
+    await asyncio.sleep(0.03)
+    cache.evict_idle()
+    await asyncio.sleep(0)
+    assert idle.executor in ClosableExecutor.closed
+    assert long.executor not in ClosableExecutor.closed
+
+    # 重新加载的snapshot 中未变更的config 不会使executor 失效
+    cache.retain(AgentConfigSnapshot([configs[0].model_copy()]))
+    assert cache.get(configs[0]) is long
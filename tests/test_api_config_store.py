@@ -0,0 +1,125 @@
+import asyncio
+
+import httpx
+import pytest
+
+from server.config_store.api import APIAgentConfigStore
+
+
+def _config(name: str, version: str = '1.0.0') -> dict:
+    return {'namespace': 'default', 'name': name, 'card': {'version': version}}
+
+
+@pytest.mark.asyncio
+async def test_conditional_and_incremental_reload():
+    requests = []
+    responses = [
+        httpx.Response(200, json={'data': [_config('a'), _config('b')], 'version': 1}, headers={'ETag': '"v1"'}),
+        httpx.Response(304),
+        httpx.Response(200, json={'data': [
+            _config('a', '2.0.0'), {**_config('b'), 'sync_operation': 'delete'},
+        ], 'version': 2}, headers={'ETag': '"v2"'}),
+    ]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return responses[len(requests) - 1]
+
+    store = APIAgentConfigStore('http://config/agents', incremental=True)
+    store._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    assert [agent_config.name for agent_config in await store.list()] == ['a', 'b']
+    version = store.version
+    a = await store.get('default', 'a')
+
+    await store.reload()
+    assert requests[1].headers['if-none-match'] == '"v1"'
+    assert requests[1].url.params['since'] == '1'
+    assert store.version == version
+    assert await store.get('default', 'a') is a
+
+    await store.reload()
+    assert [agent_config.card['version'] for agent_config in await store.list()] == ['2.0.0']
+    assert store.version == version + 1
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_full_reload_reuses_unchanged_configs():
+    payloads = [[_config('a'), _config('b')], [_config('a'), _config('b', '2.0.0')]]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={'data': payloads.pop(0)})
+
+    store = APIAgentConfigStore('http://config/agents')
+    store._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    await store.reload()
+    a, b = await store.get('default', 'a'), await store.get('default', 'b')
+
+    await store.reload()
+    assert await store.get('default', 'a') is a
+    assert (await store.get('default', 'b')).card['version'] == '2.0.0'
+    assert await store.get('default', 'b') is not b
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_read_through_single_flight_and_negative_cache():
+    requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.path)
+        await asyncio.sleep(0.01)
+        if request.url.path == '/agents':
+            return httpx.Response(200, json={'data': []})
+        if request.url.path == '/agents/default/a':
+            return httpx.Response(200, json={'data': _config('a')})
+        return httpx.Response(404)
+
+    store = APIAgentConfigStore('http://config/agents', item_url='http://config/agents/{namespace}/{name}')
+    store._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    await store.reload()
+
+    results = await asyncio.gather(*(store.get('default', 'a') for _ in range(10)))
+    assert {agent_config.name for agent_config in results} == {'a'}
+    assert requests.count('/agents/default/a') == 1
+    assert [agent_config.name for agent_config in await store.list()] == ['a']
+
+    for _ in range(2):
+        results = await asyncio.gather(*(store.get('default', 'bogus') for _ in range(10)), return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+    assert requests.count('/agents/default/bogus') == 1
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_keep_last_good_configs():
+    requests = []
+    responses = [
+        httpx.Response(503),
+        httpx.Response(200, json={'data': [_config('a'), _config('b')]}),
+        httpx.Response(200, json={'data': []}),
+        httpx.Response(200, json={'data': [{**_config('a'), 'card': 'invalid'}, _config('b', '2.0.0')]}),
+    ]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return responses[len(requests) - 1]
+
+    store = APIAgentConfigStore('http://config/agents', retry_interval=60)
+    store._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    # 上游故障时 list 不会每次都重试
+    assert not await store.list()
+    assert not await store.list()
+    assert len(requests) == 1
+
+    await store.reload()
+    a = await store.get('default', 'a')
+    # 全量结果为空时保留原有的config
+    await store.reload()
+    assert [agent_config.name for agent_config in await store.list()] == ['a', 'b']
+    # 变更后无效的config 保留原有的版本
+    await store.reload()
+    assert await store.get('default', 'a') is a
+    assert (await store.get('default', 'b')).card['version'] == '2.0.0'
+    await store.close()
@@ -0,0 +1,213 @@
+import asyncio
+import time
+
+import fakeredis
+import httpx
+import pytest
+
+from a2a.server.agent_execution import AgentExecutor, RequestContext
+from a2a.server.context import ServerCallContext
+from a2a.server.events import EventQueue
+from a2a.server.tasks import TaskUpdater
+from a2a.types import Message, MessageSendConfiguration, MessageSendParams, Part, Role, TaskState, TextPart
+from a2a.utils import new_agent_text_message, new_task
+
+from main import init_agent_config_store, init_agent_loader
+from server.a2a2.agent_execution.binding import AGENT_BINDING, AgentBinding, get_binding
+from server.a2a2.agent_execution.runtime_agent_executor import RuntimeAgentExecutor
+from server.a2a2.apps.jsonrpc.runtime_fastapi_app import RuntimeA2AFastAPIApplication
+from server.a2a2.request_handlers.runtime_request_handler import RuntimeRequestHandler
+from server.background.base import BackgroundJob, JobUser
+from server.background.memory import LocalJobStore
+from server.background.redis import RedisJobStore
+from server.background.scheduler import BackgroundScheduler
+from server.common.model import AgentConfig
+from server.loader.registry import register_executor
+from server.task_store.memory import BoundedInMemoryTaskStore
+
+
+@register_executor('default/background')
+class BackgroundExecutor(AgentExecutor):
+
+    async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
+        task = context.current_task
+        if not task:
+            task = new_task(context.message)
+            await event_queue.enqueue_event(task)
+        updater = TaskUpdater(event_queue, task.id, task.context_id)
+        await asyncio.sleep(0.1)
+        await updater.update_status(TaskState.completed, message=new_agent_text_message('done'))
+
+    async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
+        pass
+
+
+@register_executor('default/whoami')
+class WhoAmIExecutor(BackgroundExecutor):
+    """记录执行时的调用上下文。"""
+    contexts = []
+
+    async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
+        type(self).contexts.append(context.call_context)
+        await super().execute(context, event_queue)
+
+
+def _rpc(method: str, params: dict) -> dict:
+    return {'jsonrpc': '2.0', 'id': '1', 'method': method, 'params': params}
+
+
+@pytest.mark.asyncio
+async def test_non_blocking_send():
+    agent_config_store = init_agent_config_store()
+    await agent_config_store.upsert(AgentConfig(
+        namespace='default', name='background', card=agent_config_store.snapshot.configs[0].card,
+    ))
+    scheduler = BackgroundScheduler(workers=1)
+    server = RuntimeA2AFastAPIApplication(
+        agent_config_store=agent_config_store,
+        notifier=None,
+        agent_card=agent_config_store.snapshot.configs[0].get_card(),
+        http_handler=RuntimeRequestHandler(
+            agent_executor=RuntimeAgentExecutor(init_agent_loader()),
+            task_store=BoundedInMemoryTaskStore(),
+            scheduler=scheduler,
+        ),
+    )
+    message = {'role': 'user', 'parts': [{'kind': 'text', 'text': 'hi'}], 'messageId': 'm1'}
+    transport = httpx.ASGITransport(app=server.build())
+    async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+        start = time.monotonic()
+        first, second = [
+            (await client.post('/default/background/', json=_rpc('message/send', {
+                'message': {**message, 'messageId': message_id}, 'configuration': {'blocking': False},
+            }))).json()['result']
+            for message_id in ('m1', 'm2')
+        ]
+        assert time.monotonic() - start < 0.1
+        assert first['status']['state'] == second['status']['state'] == 'submitted'
+
+        # 只有一个worker，第二个任务排队时可以直接取消
+        canceled = (await client.post('/default/background/', json=_rpc('tasks/cancel', {'id': second['id']}))).json()
+        assert canceled['result']['status']['state'] == 'canceled'
+
+        await asyncio.sleep(0.3)
+        task = (await client.post('/default/background/', json=_rpc('tasks/get', {'id': first['id']}))).json()
+        assert task['result']['status']['state'] == 'completed'
+        assert [m['messageId'] for m in task['result']['history']] == ['m1']
+    assert len(scheduler.store) == 0
+    await scheduler.close()
+
+
+def _job(task_id: str, namespace: str, attempts: int = 0) -> BackgroundJob:
+    message = Message(role=Role.user, message_id=task_id, parts=[Part(root=TextPart(text='hi'))])
+    return BackgroundJob(
+        task_id=task_id,
+        agent_config=AgentConfig(namespace=namespace, name='agent', card={}),
+        params=MessageSendParams(message=message),
+        new_task=True,
+        attempts=attempts,
+        created_at=time.time(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_fair_scheduling_and_recovery(tmp_path):
+    path = str(tmp_path / 'jobs.log')
+    store = LocalJobStore(path)
+    await store.save(_job('interrupted', 'a', attempts=1))
+    for task_id in ('a1', 'a2', 'a3'):
+        await store.save(_job(task_id, 'a'))
+    await store.save(_job('b1', 'b'))
+
+    # 重启后从日志恢复
+    scheduler = BackgroundScheduler(LocalJobStore(path), workers=1)
+    executed, abandoned = [], []
+
+    async def runner(job: BackgroundJob) -> None:
+        executed.append(job.task_id)
+
+    async def on_abandon(job: BackgroundJob, reason: str) -> None:
+        abandoned.append(job.task_id)
+
+    scheduler.bind(runner, on_abandon)
+    await scheduler.start()
+    await asyncio.sleep(0.05)
+    assert abandoned == ['interrupted']
+    # namespace 之间轮流执行
+    assert executed == ['a1', 'b1', 'a2', 'a3']
+    assert await LocalJobStore(path).list() == []
+    await scheduler.close()
+
+
+@pytest.mark.asyncio
+async def test_redis_job_store():
+    server = fakeredis.FakeServer()
+    with pytest.raises(ValueError):
+        RedisJobStore(fakeredis.FakeAsyncRedis(server=server), owner='')
+    store = RedisJobStore(fakeredis.FakeAsyncRedis(server=server), owner='runtime-0')
+    await store.save(_job('t1', 'a'))
+    # 同名副本重启后接管
+    restarted = RedisJobStore(fakeredis.FakeAsyncRedis(server=server), owner='runtime-0')
+    assert [job.task_id for job in await restarted.list()] == ['t1']
+
+    # redis 不可用时启动不失败
+    server.connected = False
+    scheduler = BackgroundScheduler(store, workers=1)
+
+    async def noop(*args) -> None:
+        pass
+
+    scheduler.bind(noop, noop)
+    await scheduler.start()
+    assert await store.list() == []
+    await scheduler.close()
+
+
+@pytest.mark.asyncio
+async def test_background_job_keeps_caller_and_latest_config():
+    agent_config_store = init_agent_config_store()
+    agent_config = AgentConfig(namespace='default', name='whoami', card=agent_config_store.snapshot.configs[0].card)
+    await agent_config_store.upsert(agent_config)
+    scheduler = BackgroundScheduler(workers=1)
+    handler = RuntimeRequestHandler(
+        agent_executor=RuntimeAgentExecutor(init_agent_loader()),
+        task_store=BoundedInMemoryTaskStore(),
+        scheduler=scheduler,
+        agent_config_store=agent_config_store,
+    )
+    context = ServerCallContext(
+        state={
+            'headers': {'x-trace-id': 't1', 'authorization': 'Bearer secret'},
+            AGENT_BINDING: AgentBinding(agent_config),
+        },
+        user=JobUser('alice'),
+        requested_extensions={'urn:ext'},
+    )
+    message = Message(role=Role.user, message_id='m1', parts=[Part(root=TextPart(text='hi'))])
+    task = await handler.on_message_send(
+        MessageSendParams(message=message, configuration=MessageSendConfiguration(blocking=False)), context,
+    )
+    # 执行前更新agent config，执行时使用最新的配置
+    await agent_config_store.upsert(agent_config.model_copy(update={'max_queue': 7}))
+    await asyncio.sleep(0.3)
+    assert (await handler.task_store.get(task.id)).status.state == TaskState.completed
+    call_context = WhoAmIExecutor.contexts[-1]
+    assert call_context.user.is_authenticated
+    assert call_context.user.user_name == 'alice'
+    # 凭证不写入任务记录
+    assert call_context.state['headers'] == {'x-trace-id': 't1'}
+    assert call_context.requested_extensions == {'urn:ext'}
+    assert get_binding(call_context).agent_config.max_queue == 7
+
+    # agent 在执行前被删除时任务失败
+    await agent_config_store.delete(agent_config)
+    task = await handler.on_message_send(
+        MessageSendParams(message=message.model_copy(update={'message_id': 'm2'}),
+                          configuration=MessageSendConfiguration(blocking=False)),
+        context,
+    )
+    await asyncio.sleep(0.1)
+    task = await handler.task_store.get(task.id)
+    assert task.status.state == TaskState.failed
+    assert 'no longer exists' in task.status.message.parts[0].root.text
+    await scheduler.close()
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from a2a.server.tasks import TaskManager
+from a2a.types import Message, Part, Role, Task, TaskState, TaskStatus, TaskStatusUpdateEvent, TextPart
+
+from server.metrics.runtime import TASK_STORE_EVICTIONS
+from server.task_store.memory import BoundedInMemoryTaskStore
+
+
+def _task(task_id: str, state: TaskState = TaskState.working, history: int = 0, text: str = '') -> Task:
+    return Task(
+        id=task_id,
+        context_id='ctx',
+        status=TaskStatus(state=state),
+        history=[
+            Message(role=Role.user, message_id=f'{task_id}-{i}', parts=[Part(root=TextPart(text=f'{text}{i}'))])
+            for i in range(history)
+        ],
+    )
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction():
+    store = BoundedInMemoryTaskStore(max_tasks=2)
+    lru = TASK_STORE_EVICTIONS.get('lru')
+    for task_id in ('a', 'b'):
+        await store.save(_task(task_id))
+    # 访问 a 后 b 成为最久未访问的task
+    assert await store.get('a') is not None
+    await store.save(_task('c'))
+    assert await store.get('b') is None
+    assert len(store) == 2
+    assert TASK_STORE_EVICTIONS.get('lru') == lru + 1
+
+    # 优先淘汰终态task，即使执行中的task 更久未访问
+    store = BoundedInMemoryTaskStore(max_tasks=2)
+    await store.save(_task('working'))
+    await store.save(_task('done', TaskState.completed))
+    await store.save(_task('new'))
+    assert await store.get('done') is None
+    assert await store.get('working') is not None
+
+    # 按字节数淘汰，总字节数随更新及删除准确变化
+    store = BoundedInMemoryTaskStore(max_bytes=2048)
+    await store.save(_task('a', text='x' * 1000, history=1))
+    await store.save(_task('b', text='x' * 1000, history=1))
+    assert await store.get('a') is None
+    await store.save(_task('b'))
+    assert store.size_bytes == len(_task('b').model_dump_json(exclude_none=True))
+    await store.delete('b')
+    assert store.size_bytes == 0
+
+
+@pytest.mark.asyncio
+async def test_terminal_ttl():
+    store = BoundedInMemoryTaskStore(terminal_ttl=0.05)
+    await store.save(_task('a', TaskState.completed))
+    await store.save(_task('b', TaskState.working))
+    await asyncio.sleep(0.1)
+    assert await store.get('a') is None
+    assert (await store.get('b')).status.state == TaskState.working
+    # 非终态task 重新保存为终态后开始计时
+    await store.save(_task('b', TaskState.failed))
+    await asyncio.sleep(0.1)
+    await store.save(_task('c'))
+    assert len(store) == 1
+
+    # 反复保存同一task 时过期堆不随保存次数增长
+    store = BoundedInMemoryTaskStore(ttl=60)
+    for _ in range(1000):
+        await store.save(_task('a'))
+        await store.save(_task('b', TaskState.completed))
+    assert len(store._expiry) <= 2 * len(store) + 64
+
+
+@pytest.mark.asyncio
+async def test_history_truncation(tmp_path):
+    store = BoundedInMemoryTaskStore(max_history=3, spill_dir=str(tmp_path))
+    await store.save(_task('a/b', history=5))
+    task = await store.get('a/b')
+    assert [m.message_id for m in task.history] == ['a/b-2', 'a/b-3', 'a/b-4']
+    assert [m.message_id for m in store.load_spilled_history('a/b')] == ['a/b-0', 'a/b-1']
+    await store.delete('a/b')
+    assert store.load_spilled_history('a/b') == []
+
+
+@pytest.mark.asyncio
+async def test_history_spilled_once_through_task_manager(tmp_path):
+    store = BoundedInMemoryTaskStore(max_history=2, spill_dir=str(tmp_path))
+    manager = TaskManager(task_id='t', context_id='ctx', task_store=store, initial_message=None)
+    task = _task('t', history=5)
+    task.status.message = Message(role=Role.agent, message_id='s0', parts=[Part(root=TextPart(text='s0'))])
+    await manager.save_task_event(task)
+    for i in range(1, 4):
+        # TaskManager 缓存未截断的task，每次更新都把完整history 交给 store
+        await manager.save_task_event(TaskStatusUpdateEvent(
+            task_id='t', context_id='ctx', final=False,
+            status=TaskStatus(
+                state=TaskState.working,
+                message=Message(role=Role.agent, message_id=f's{i}', parts=[Part(root=TextPart(text=f's{i}'))]),
+            ),
+        ))
+    assert [m.message_id for m in (await store.get('t')).history] == ['s1', 's2']
+    assert [m.message_id for m in store.load_spilled_history('t')] == ['t-0', 't-1', 't-2', 't-3', 't-4', 's0']
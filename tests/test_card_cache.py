@@ -0,0 +1,74 @@
+import httpx
+import pytest
+
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import InMemoryTaskStore
+from a2a.utils.constants import AGENT_CARD_WELL_KNOWN_PATH
+
+from main import init_agent_config_store, init_agent_loader
+from server.a2a2.agent_execution.runtime_agent_executor import RuntimeAgentExecutor
+from server.a2a2.apps.jsonrpc.card_cache import AgentCardCache, etag_matches
+from server.a2a2.apps.jsonrpc.runtime_fastapi_app import RuntimeA2AFastAPIApplication
+from server.common.model import SyncOperation
+
+
+def test_etag_matches():
+    assert etag_matches('"a", "b"', '"b"')
+    assert etag_matches('W/"a"', '"a"')
+    assert etag_matches('*', '"a"')
+    assert not etag_matches(None, '"a"')
+    assert not etag_matches('"b"', '"a"')
+
+
+def test_pure_card_modifier_is_cached():
+    calls = []
+
+    def modifier(card):
+        calls.append(card.name)
+        return card.model_copy(update={'description': 'modified'})
+
+    agent_config = init_agent_config_store().snapshot.configs[0]
+    cache = AgentCardCache(modifier, pure_card_modifier=True)
+    cache.put(agent_config)
+    assert cache.get_modified_card(agent_config).card.description == 'modified'
+    cache.get_modified_card(agent_config)
+    assert len(calls) == 1
+
+    cache = AgentCardCache(modifier)
+    cache.get_modified_card(agent_config)
+    cache.get_modified_card(agent_config)
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_agent_card_etag():
+    agent_config_store = init_agent_config_store()
+    server = RuntimeA2AFastAPIApplication(
+        agent_config_store=agent_config_store,
+        notifier=None,
+        agent_card=agent_config_store.snapshot.configs[0].get_card(),
+        http_handler=DefaultRequestHandler(
+            agent_executor=RuntimeAgentExecutor(init_agent_loader()),
+            task_store=InMemoryTaskStore(),
+        ),
+    )
+    url = f'/default/helloworld{AGENT_CARD_WELL_KNOWN_PATH}'
+    transport = httpx.ASGITransport(app=server.build())
+    async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+        response = await client.get(url)
+        assert response.status_code == 200
+        assert response.json()['name'] == 'Hello World Agent'
+        etag = response.headers['etag']
+
+        response = await client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.headers['etag'] == etag
+
+        agent_config = agent_config_store.snapshot.configs[0].model_copy(
+            update={'card': {**agent_config_store.snapshot.configs[0].card, 'version': '2.0.0'}},
+        )
+        agent_config.sync_operation = SyncOperation.UPSERT
+        await agent_config_store.sync_agent_config(agent_config)
+        response = await client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.json()['version'] == '2.0.0'
@@ -0,0 +1,44 @@
+import pytest
+
+from server.common.model import AgentConfig
+from server.config_store.default import DefaultAgentConfigStore
+
+
+def _config(namespace: str, name: str) -> AgentConfig:
+    return AgentConfig(namespace=namespace, name=name, card={})
+
+
+@pytest.mark.asyncio
+async def test_snapshot_store():
+    store = DefaultAgentConfigStore([_config('b', 'x'), _config('a', 'y'), _config('a', 'x')])
+    snapshot = store.snapshot
+    assert [c.namespace_name for c in await store.list()] == ['a/x', 'a/y', 'b/x']
+
+    await store.upsert(_config('a', 'z'))
+    await store.delete(_config('b', 'x'))
+    # 删除不存在的agent 不报错
+    await store.delete(_config('c', 'x'))
+    assert store.version == snapshot.version + 2
+    # 旧快照不受影响
+    assert [c.namespace_name for c in snapshot.configs] == ['a/x', 'a/y', 'b/x']
+    assert [c.name for c in await store.list_namespace('a')] == ['x', 'y', 'z']
+    assert (await store.get('a', 'z')).name == 'z'
+    with pytest.raises(ValueError):
+        await store.get('b', 'x')
+
+
+@pytest.mark.asyncio
+async def test_snapshot_query():
+    store = DefaultAgentConfigStore([_config('a', f'agent-{i}') for i in range(5)] + [_config('b', 'agent-0')])
+    page, after = await store.query(namespace='a', limit=2)
+    assert [c.name for c in page] == ['agent-0', 'agent-1']
+    page, after = await store.query(namespace='a', after=after, limit=2)
+    assert [c.name for c in page] == ['agent-2', 'agent-3']
+    page, after = await store.query(namespace='a', after=after, limit=2)
+    assert [c.name for c in page] == ['agent-4']
+    assert after is None
+
+    page, _ = await store.query(name_prefix='agent-0')
+    assert [c.namespace_name for c in page] == ['a/agent-0', 'b/agent-0']
+    page, _ = await store.query(namespace='a', name_prefix='agent-3')
+    assert [c.name for c in page] == ['agent-3']
@@ -0,0 +1,36 @@
+import pytest
+
+pytest.importorskip('aiosqlite')
+
+from a2a.types import Task, TaskState, TaskStatus
+
+from server.libs.database.engine import DatabaseConfig, get_async_engine
+from server.task_store.database import WriteBehindDatabaseTaskStore
+
+
+def _task(task_id: str, state: TaskState) -> Task:
+    return Task(id=task_id, context_id='ctx', status=TaskStatus(state=state))
+
+
+@pytest.mark.asyncio
+async def test_write_behind_coalesces_updates(tmp_path):
+    engine = get_async_engine(DatabaseConfig(url=f'sqlite+aiosqlite:///{tmp_path}/tasks.db'))
+    store = WriteBehindDatabaseTaskStore(engine, flush_interval=60)
+
+    await store.save(_task('t1', TaskState.submitted))
+    await store.save(_task('t1', TaskState.working))
+    await store.save(_task('t2', TaskState.working))
+    # 未落库前可以读到缓冲中的最新状态
+    assert (await store.get('t1')).status.state == TaskState.working
+
+    await store.flush()
+    await store.save(_task('t1', TaskState.completed))
+    await store.close()
+
+    reader = WriteBehindDatabaseTaskStore(engine)
+    assert (await reader.get('t1')).status.state == TaskState.completed
+    assert (await reader.get('t2')).status.state == TaskState.working
+
+    await reader.delete('t2')
+    assert await reader.get('t2') is None
+    await engine.dispose()
@@ -0,0 +1,119 @@
+import asyncio
+
+import fakeredis
+import httpx
+import pytest
+
+from a2a.server.agent_execution import AgentExecutor, RequestContext
+from a2a.server.events import EventQueue
+from a2a.server.tasks import InMemoryTaskStore, TaskUpdater
+from a2a.types import Message, Role, TaskState, TextPart
+from a2a.utils import new_agent_text_message
+
+from main import init_agent_config_store, init_agent_loader
+from server.a2a2.agent_execution.runtime_agent_executor import RuntimeAgentExecutor
+from server.a2a2.apps.jsonrpc.runtime_fastapi_app import RuntimeA2AFastAPIApplication
+from server.a2a2.request_handlers.runtime_request_handler import RuntimeRequestHandler
+from server.common.model import AgentConfig
+from server.dedup.deduplicator import MessageDeduplicator
+from server.dedup.memory import LocalDedupStore
+from server.dedup.redis import RedisDedupStore
+from server.loader.registry import register_executor
+
+
+@register_executor('default/slow-counter')
+class SlowCounterExecutor(AgentExecutor):
+    executions = 0
+
+    async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
+        type(self).executions += 1
+        updater = TaskUpdater(event_queue, context.task_id, context.context_id)
+        await asyncio.sleep(0.1)
+        await updater.update_status(TaskState.completed, message=new_agent_text_message('done'))
+
+    async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
+        pass
+
+
+@pytest.mark.asyncio
+async def test_message_send_dedup():
+    agent_config_store = init_agent_config_store()
+    await agent_config_store.upsert(AgentConfig(
+        namespace='default', name='slow-counter', card=agent_config_store.snapshot.configs[0].card,
+    ))
+    server = RuntimeA2AFastAPIApplication(
+        agent_config_store=agent_config_store,
+        notifier=None,
+        agent_card=agent_config_store.snapshot.configs[0].get_card(),
+        http_handler=RuntimeRequestHandler(
+            agent_executor=RuntimeAgentExecutor(init_agent_loader()),
+            task_store=InMemoryTaskStore(),
+            deduplicator=MessageDeduplicator(LocalDedupStore()),
+        ),
+    )
+
+    def request(message_id: str, context_id: str | None = None) -> dict:
+        message = {'role': 'user', 'parts': [{'kind': 'text', 'text': 'hi'}], 'messageId': message_id}
+        if context_id:
+            message['contextId'] = context_id
+        return {'jsonrpc': '2.0', 'id': '1', 'method': 'message/send', 'params': {'message': message}}
+
+    SlowCounterExecutor.executions = 0
+    transport = httpx.ASGITransport(app=server.build())
+    async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+        # 首次请求执行中时的重试等待同一次执行
+        first, retry = await asyncio.gather(
+            client.post('/default/slow-counter/', json=request('m1')),
+            client.post('/default/slow-counter/', json=request('m1')),
+        )
+        assert SlowCounterExecutor.executions == 1
+        task_id = first.json()['result']['id']
+        assert retry.json()['result']['id'] == task_id
+        assert retry.json()['result']['status']['state'] == 'completed'
+
+        # 完成后的重试返回保存的结果
+        response = await client.post('/default/slow-counter/', json=request('m1'))
+        assert response.json()['result']['id'] == task_id
+        assert SlowCounterExecutor.executions == 1
+
+        # 不同agent 或不同 messageId 不去重
+        await client.post('/default/slow-counter/', json=request('m2'))
+        assert SlowCounterExecutor.executions == 2
+        response = await client.post('/default/travel/', json=request('m1'))
+        assert response.json()['result']['id'] != task_id
+        # 不同 contextId 下相同的 messageId 不去重
+        response = await client.post('/default/slow-counter/', json=request('m1', 'other'))
+        assert response.json()['result']['id'] != task_id
+        assert SlowCounterExecutor.executions == 3
+
+
+@pytest.mark.asyncio
+async def test_redis_dedup_across_replicas():
+    client = fakeredis.FakeAsyncRedis()
+    replicas = [MessageDeduplicator(RedisDedupStore(client), poll_interval=0.01) for _ in range(2)]
+    executions = []
+
+    async def execute() -> Message:
+        executions.append(1)
+        await asyncio.sleep(0.1)
+        return Message(role=Role.agent, message_id='reply', parts=[TextPart(text='done')])
+
+    async def fail() -> Message:
+        raise RuntimeError('boom')
+
+    # 另一个副本正在执行时等待其结果
+    (first, replayed_first), (second, replayed_second) = await asyncio.gather(
+        replicas[0].run('default/travel:m1', execute),
+        replicas[1].run('default/travel:m1', execute),
+    )
+    assert len(executions) == 1
+    assert first == second
+    assert (replayed_first, replayed_second) == (False, True)
+
+    # 失败不保存结果，重试会重新执行
+    with pytest.raises(RuntimeError):
+        await replicas[0].run('default/travel:m2', fail)
+    result, replayed = await replicas[1].run('default/travel:m2', execute)
+    assert result == first
+    assert not replayed
+    assert len(executions) == 2
@@ -0,0 +1,132 @@
+import asyncio
+
+import httpx
+import pytest
+
+from a2a.server.agent_execution import AgentExecutor, RequestContext
+from a2a.server.events import EventQueue
+from a2a.server.tasks import TaskUpdater
+from a2a.types import TaskState
+from a2a.utils import new_agent_text_message, new_task
+
+from main import init_agent_config_store, init_agent_loader
+from server.a2a2.agent_execution.runtime_agent_executor import RuntimeAgentExecutor
+from server.a2a2.apps.jsonrpc.drain import DRAINING_ERROR_CODE
+from server.a2a2.apps.jsonrpc.runtime_fastapi_app import RuntimeA2AFastAPIApplication
+from server.a2a2.request_handlers.runtime_request_handler import RuntimeRequestHandler
+from server.common.model import AgentConfig
+from server.loader.registry import register_executor
+from server.task_store.memory import BoundedInMemoryTaskStore
+
+
+@register_executor('default/sleeper')
+class SleeperExecutor(AgentExecutor):
+    """按消息文本休眠若干秒后完成，cancel 时产生 canceled 事件。"""
+
+    async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
+        task = new_task(context.message)
+        await event_queue.enqueue_event(task)
+        await asyncio.sleep(float(context.get_user_input()))
+        await TaskUpdater(event_queue, task.id, task.context_id).update_status(
+            TaskState.completed, message=new_agent_text_message('done'),
+        )
+
+    async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
+        await TaskUpdater(event_queue, context.task_id, context.context_id).update_status(TaskState.canceled)
+
+
+@register_executor('default/stuck')
+class StuckCancelExecutor(SleeperExecutor):
+    """cancel 一直不返回。"""
+
+    async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
+        await asyncio.sleep(60)
+
+
+def _send(seconds: float, blocking: bool = True) -> dict:
+    message = {'role': 'user', 'parts': [{'kind': 'text', 'text': str(seconds)}], 'messageId': str(seconds)}
+    return {
+        'jsonrpc': '2.0', 'id': '1', 'method': 'message/send',
+        'params': {'message': message, 'configuration': {'blocking': blocking}},
+    }
+
+
+async def _server() -> RuntimeA2AFastAPIApplication:
+    agent_config_store = init_agent_config_store()
+    for name in ('sleeper', 'stuck'):
+        await agent_config_store.upsert(AgentConfig(
+            namespace='default', name=name, card=agent_config_store.snapshot.configs[0].card,
+        ))
+    return RuntimeA2AFastAPIApplication(
+        agent_config_store=agent_config_store,
+        notifier=None,
+        agent_card=agent_config_store.snapshot.configs[0].get_card(),
+        http_handler=RuntimeRequestHandler(
+            agent_executor=RuntimeAgentExecutor(init_agent_loader()),
+            task_store=BoundedInMemoryTaskStore(),
+        ),
+    )
+
+
+@pytest.mark.asyncio
+async def test_drain_waits_for_inflight_requests():
+    server = await _server()
+    transport = httpx.ASGITransport(app=server.build())
+    async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+        assert (await client.get('/readyz')).status_code == 200
+        inflight = asyncio.create_task(client.post('/default/sleeper/', json=_send(0.3)))
+        await asyncio.sleep(0.05)
+        drain = asyncio.create_task(server.drain(timeout=5, readiness_delay=0.1))
+        await asyncio.sleep(0.02)
+        # readiness_delay 期间只是摘除流量，仍接受新的执行
+        assert (await client.get('/readyz')).status_code == 503
+        accepted = (await client.post('/default/sleeper/', json=_send(0.01))).json()
+        assert accepted['result']['status']['state'] == 'completed'
+
+        await asyncio.sleep(0.1)
+        rejected = await client.post('/default/sleeper/', json=_send(0.01))
+        assert rejected.status_code == 503
+        assert rejected.headers['Retry-After'] == '1'
+        assert rejected.json()['error']['code'] == DRAINING_ERROR_CODE
+        # 已有task 的查询照常处理
+        get = {'jsonrpc': '2.0', 'id': '2', 'method': 'tasks/get', 'params': {'id': accepted['result']['id']}}
+        assert (await client.post('/default/sleeper/', json=get)).status_code == 200
+
+        await drain
+        assert (await inflight).json()['result']['status']['state'] == 'completed'
+
+
+@pytest.mark.asyncio
+async def test_drain_timeout_cancels_producers():
+    server = await _server()
+    transport = httpx.ASGITransport(app=server.build())
+    async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+        blocking = asyncio.create_task(client.post('/default/sleeper/', json=_send(60)))
+        submitted = (await client.post('/default/sleeper/', json=_send(30, blocking=False))).json()['result']
+        await asyncio.sleep(0.05)
+        await asyncio.wait_for(server.drain(timeout=0.1), 3)
+        # executor 的cancel 产生的 canceled 状态返回给等待中的请求并落库
+        assert (await blocking).json()['result']['status']['state'] == 'canceled'
+        task = await server.handler.request_handler.task_store.get(submitted['id'])
+        assert task.status.state == TaskState.canceled
+        assert not server.handler.request_handler._running_agents
+
+
+@pytest.mark.asyncio
+async def test_cancel_running_shares_one_deadline():
+    server = await _server()
+    handler = server.handler.request_handler
+    transport = httpx.ASGITransport(app=server.build())
+    async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+        requests = [asyncio.create_task(client.post('/default/stuck/', json=_send(60 + i))) for i in range(4)]
+        while len(handler._running_agents) < 4:
+            await asyncio.sleep(0.01)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        # 各producer 同时取消，总耗时不随数量增加
+        assert await handler.cancel_running(timeout=0.2) == 4
+        assert loop.time() - start < 1
+        # 等待中的请求随之结束，task 标记为 failed
+        for response in await asyncio.gather(*requests):
+            task = await handler.task_store.get(response.json()['result']['id'])
+            assert task.status.state == TaskState.failed
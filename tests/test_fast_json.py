@@ -0,0 +1,62 @@
+import json
+
+import httpx
+import pytest
+
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import InMemoryTaskStore
+from a2a.types import AgentCapabilities
+
+from main import init_agent_config_store, init_agent_loader
+from server.a2a2.agent_execution.runtime_agent_executor import RuntimeAgentExecutor
+from server.a2a2.apps.jsonrpc.runtime_fastapi_app import RuntimeA2AFastAPIApplication
+
+
+async def _call(fast: bool, method: str) -> list:
+    agent_config_store = init_agent_config_store()
+    server = RuntimeA2AFastAPIApplication(
+        agent_config_store=agent_config_store,
+        notifier=None,
+        agent_card=agent_config_store.snapshot.configs[0].get_card().model_copy(
+            update={'capabilities': AgentCapabilities(streaming=True)}
+        ),
+        http_handler=DefaultRequestHandler(
+            agent_executor=RuntimeAgentExecutor(init_agent_loader()),
+            task_store=InMemoryTaskStore(),
+        ),
+        fast_json=fast,
+    )
+    request = {
+        'jsonrpc': '2.0',
+        'id': 1,
+        'method': method,
+        'params': {'message': {'role': 'user', 'parts': [{'kind': 'text', 'text': 'hi'}], 'messageId': 'm1'}},
+    }
+    transport = httpx.ASGITransport(app=server.build())
+    async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+        response = await client.post('/default/travel/', json=request)
+    if method == 'message/send':
+        return [response.json()]
+    return [json.loads(line[len('data: '):]) for line in response.text.splitlines() if line.startswith('data: ')]
+
+
+_VOLATILE = {'taskId', 'contextId', 'messageId', 'timestamp'}
+
+
+def _normalize(value):
+    # 去掉每次生成的id 和时间戳
+    if isinstance(value, dict):
+        return {k: k if k in _VOLATILE or (k == 'id' and isinstance(v, str)) else _normalize(v)
+                for k, v in value.items()}
+    if isinstance(value, list):
+        return [_normalize(v) for v in value]
+    return value
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('method', ['message/send', 'message/stream'])
+async def test_fast_json_matches_default(method):
+    default = await _call(False, method)
+    fast = await _call(True, method)
+    assert len(fast) == len(default) >= 1
+    assert _normalize(fast) == _normalize(default)
@@ -0,0 +1,85 @@
+import httpx
+import pytest
+
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import InMemoryTaskStore
+
+from main import init_agent_config_store, init_agent_loader
+from server.a2a2.agent_execution.runtime_agent_executor import RuntimeAgentExecutor
+from server.a2a2.apps.jsonrpc.runtime_fastapi_app import RuntimeA2AFastAPIApplication
+from server.common.model import AgentConfig
+
+
+@pytest.mark.asyncio
+async def test_list_agents():
+    agent_config_store = init_agent_config_store()
+    server = RuntimeA2AFastAPIApplication(
+        agent_config_store=agent_config_store,
+        notifier=None,
+        agent_card=agent_config_store.snapshot.configs[0].get_card(),
+        http_handler=DefaultRequestHandler(
+            agent_executor=RuntimeAgentExecutor(init_agent_loader()),
+            task_store=InMemoryTaskStore(),
+        ),
+    )
+    transport = httpx.ASGITransport(app=server.build())
+    async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+        response = await client.get('/')
+        assert [agent['name'] for agent in response.json()] == ['helloworld', 'travel', 'weather']
+        assert 'card' in response.json()[0]
+
+        response = await client.get('/', params={'view': 'summary', 'limit': 2})
+        page = response.json()
+        assert page['agents'] == [
+            {'namespace': 'default', 'name': 'helloworld'},
+            {'namespace': 'default', 'name': 'travel'},
+        ]
+        response = await client.get('/', params={'view': 'summary', 'limit': 2, 'cursor': page['next_cursor']})
+        assert response.json() == {'agents': [{'namespace': 'default', 'name': 'weather'}], 'next_cursor': None}
+
+        response = await client.get('/', params={'namespace': 'default', 'prefix': 'w', 'view': 'summary'})
+        assert response.json() == [{'namespace': 'default', 'name': 'weather'}]
+
+        etag = response.headers['etag']
+        response = await client.get(
+            '/', params={'namespace': 'default', 'prefix': 'w', 'view': 'summary'}, headers={'If-None-Match': etag}
+        )
+        assert response.status_code == 304
+
+        await agent_config_store.upsert(AgentConfig(namespace='default', name='whatever', card={}))
+        response = await client.get(
+            '/', params={'namespace': 'default', 'prefix': 'w', 'view': 'summary'}, headers={'If-None-Match': etag}
+        )
+        assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_unknown_agent_returns_404():
+    agent_config_store = init_agent_config_store()
+    task_store = InMemoryTaskStore()
+    server = RuntimeA2AFastAPIApplication(
+        agent_config_store=agent_config_store,
+        notifier=None,
+        agent_card=agent_config_store.snapshot.configs[0].get_card(),
+        http_handler=DefaultRequestHandler(
+            agent_executor=RuntimeAgentExecutor(init_agent_loader()),
+            task_store=task_store,
+        ),
+    )
+    request = {
+        'jsonrpc': '2.0',
+        'id': '1',
+        'method': 'message/send',
+        'params': {'message': {'role': 'user', 'parts': [{'kind': 'text', 'text': 'hi'}], 'messageId': 'm1'}},
+    }
+    transport = httpx.ASGITransport(app=server.build())
+    async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+        response = await client.post('/default/bogus/', json=request)
+        assert response.status_code == 404
+        assert not task_store.tasks
+        response = await client.get('/default/bogus/.well-known/agent-card.json')
+        assert response.status_code == 404
+
+        # 同一个请求的 execute 使用路由解析出的config
+        response = await client.post('/default/travel/', json=request)
+        assert response.json()['result']['status']['state'] == 'completed'
@@ -0,0 +1,111 @@
+import fakeredis
+import httpx
+import pytest
+
+from a2a.server.agent_execution import AgentExecutor, RequestContext
+from a2a.server.events import EventQueue
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import InMemoryTaskStore, TaskUpdater
+from a2a.types import TaskState
+from a2a.utils import new_agent_text_message
+
+from main import init_agent_config_store, init_agent_loader
+from server.a2a2.agent_execution.runtime_agent_executor import RuntimeAgentExecutor
+from server.a2a2.apps.jsonrpc.runtime_fastapi_app import RuntimeA2AFastAPIApplication
+from server.common.model import AgentConfig, Memoization
+from server.loader.registry import register_executor
+from server.memoize.memoizer import Memoizer
+from server.memoize.memory import LocalResultCache
+from server.memoize.redis import RedisResultCache
+
+
+@register_executor('default/lookup')
+class LookupExecutor(AgentExecutor):
+    executions = 0
+
+    async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
+        type(self).executions += 1
+        updater = TaskUpdater(event_queue, context.task_id, context.context_id)
+        await updater.update_status(TaskState.working, message=new_agent_text_message('looking up'))
+        await updater.update_status(
+            TaskState.completed, message=new_agent_text_message(f'result of {context.get_user_input()}'),
+        )
+
+    async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
+        pass
+
+
+def _request(text: str, metadata: dict | None = None) -> dict:
+    message = {'role': 'user', 'parts': [{'kind': 'text', 'text': text}], 'messageId': text}
+    if metadata:
+        message['metadata'] = metadata
+    return {'jsonrpc': '2.0', 'id': '1', 'method': 'message/send', 'params': {'message': message}}
+
+
+@pytest.mark.asyncio
+async def test_memoization():
+    agent_config_store = init_agent_config_store()
+    await agent_config_store.upsert(AgentConfig(
+        namespace='default', name='lookup', card=agent_config_store.snapshot.configs[0].card,
+        memoization=Memoization(metadata_keys=['locale']),
+    ))
+    memoizer = Memoizer()
+    server = RuntimeA2AFastAPIApplication(
+        agent_config_store=agent_config_store,
+        notifier=None,
+        agent_card=agent_config_store.snapshot.configs[0].get_card(),
+        http_handler=DefaultRequestHandler(
+            agent_executor=RuntimeAgentExecutor(init_agent_loader(), memoizer=memoizer),
+            task_store=InMemoryTaskStore(),
+        ),
+    )
+    LookupExecutor.executions = 0
+    transport = httpx.ASGITransport(app=server.build())
+    async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+        first = (await client.post('/default/lookup/', json=_request('beijing'))).json()['result']
+        # 首尾空白及未选中的metadata 不影响缓存key
+        second = (await client.post('/default/lookup/', json=_request(' beijing ', {'trace': 'x'}))).json()['result']
+        assert LookupExecutor.executions == 1
+        assert second['id'] != first['id']
+        assert second['status']['state'] == 'completed'
+        assert second['contextId'] != first['contextId']
+        assert second['status']['message']['messageId'] != first['status']['message']['messageId']
+        assert second['status']['message']['parts'] == first['status']['message']['parts']
+        assert second['history'][0]['messageId'] == ' beijing '
+
+        await client.post('/default/lookup/', json=_request('beijing', {'locale': 'en'}))
+        await client.post('/default/lookup/', json=_request('shanghai'))
+        assert LookupExecutor.executions == 3
+
+    assert memoizer.stats()['default/lookup'] == {'hits': 1, 'misses': 3, 'hit_ratio': 0.25}
+
+
+@pytest.mark.asyncio
+async def test_memoization_shared_tier():
+    client = fakeredis.FakeAsyncRedis()
+    shared = RedisResultCache(client)
+    agent_config_store = init_agent_config_store()
+    agent_config = AgentConfig(
+        namespace='default', name='lookup', card=agent_config_store.snapshot.configs[0].card,
+        memoization=Memoization(shared=True, max_entries=1),
+    )
+    await agent_config_store.upsert(agent_config)
+    LookupExecutor.executions = 0
+    # 两个副本各自的本地缓存，共享redis 层
+    for _ in range(2):
+        server = RuntimeA2AFastAPIApplication(
+            agent_config_store=agent_config_store,
+            notifier=None,
+            agent_card=agent_config_store.snapshot.configs[0].get_card(),
+            http_handler=DefaultRequestHandler(
+                agent_executor=RuntimeAgentExecutor(
+                    init_agent_loader(), memoizer=Memoizer(LocalResultCache(), shared),
+                ),
+                task_store=InMemoryTaskStore(),
+            ),
+        )
+        transport = httpx.ASGITransport(app=server.build())
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as http_client:
+            response = await http_client.post('/default/lookup/', json=_request('beijing'))
+            assert response.json()['result']['status']['state'] == 'completed'
+    assert LookupExecutor.executions == 1
@@ -0,0 +1,59 @@
+import httpx
+import pytest
+
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import InMemoryTaskStore
+from a2a.types import AgentCapabilities
+from sse_starlette.sse import AppStatus
+
+from main import init_agent_config_store, init_agent_loader
+from server.a2a2.agent_execution.runtime_agent_executor import RuntimeAgentExecutor
+from server.a2a2.apps.jsonrpc.runtime_fastapi_app import RuntimeA2AFastAPIApplication
+from server.metrics.runtime import FIRST_EVENT_DURATION, REQUEST_DURATION, REQUESTS
+
+
+@pytest.mark.asyncio
+async def test_metrics():
+    # sse-starlette 的退出事件绑定在首次使用它的事件循环上
+    AppStatus.should_exit_event = None
+    agent_config_store = init_agent_config_store()
+    server = RuntimeA2AFastAPIApplication(
+        agent_config_store=agent_config_store,
+        notifier=None,
+        agent_card=agent_config_store.snapshot.configs[0].get_card().model_copy(
+            update={'capabilities': AgentCapabilities(streaming=True)}
+        ),
+        http_handler=DefaultRequestHandler(
+            agent_executor=RuntimeAgentExecutor(init_agent_loader()),
+            task_store=InMemoryTaskStore(),
+        ),
+    )
+    request = {
+        'jsonrpc': '2.0',
+        'id': '1',
+        'method': 'message/send',
+        'params': {'message': {'role': 'user', 'parts': [{'kind': 'text', 'text': 'hi'}], 'messageId': 'm1'}},
+    }
+    sent = REQUESTS.get('default/travel', 'message/send', '')
+    streamed = FIRST_EVENT_DURATION.count('default/travel', 'message/stream')
+    not_found = REQUESTS.get('unknown', 'message/send', 'http_404')
+    transport = httpx.ASGITransport(app=server.build())
+    async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+        await client.post('/default/travel/', json=request)
+        await client.post('/default/travel/', json={**request, 'method': 'message/stream'})
+        await client.post('/default/bogus/', json=request)
+        await client.post('/default/travel/', json={**request, 'method': 'tasks/get', 'params': {'id': 'missing'}})
+
+        response = await client.get('/metrics')
+        assert response.status_code == 200
+        assert response.headers['content-type'].startswith('text/plain')
+        text = response.text
+    assert REQUESTS.get('default/travel', 'message/send', '') == sent + 1
+    assert FIRST_EVENT_DURATION.count('default/travel', 'message/stream') == streamed + 1
+    assert REQUEST_DURATION.count('default/travel', 'message/stream') >= 1
+    assert REQUESTS.get('unknown', 'message/send', 'http_404') == not_found + 1
+    assert REQUESTS.get('default/travel', 'tasks/get', 'TaskNotFoundError') >= 1
+    assert 'a2a_requests_total{agent="default/travel",method="message/send",error=""}' in text
+    assert 'a2a_request_duration_seconds_bucket{agent="default/travel",method="message/send",le="+Inf"}' in text
+    assert 'a2a_agent_configs 3.0' in text
+    assert 'a2a_active_producers' in text
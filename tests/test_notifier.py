@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+
+from server.common.model import AgentConfig, SyncOperation
+from server.config_store.default import DefaultAgentConfigStore
+from server.libs.redis.client import RedisConfig
+from server.notifier.base import Notifier, NotifierResyncRequired
+
+
+class FlakyNotifier(Notifier):
+    def __init__(self):
+        self.calls = 0
+        self.subscribed = False
+
+    async def watch(self, on_subscribed=None):
+        self.calls += 1
+        if self.calls == 1:
+            raise ConnectionError('connection reset')
+        self.subscribed = True
+        if on_subscribed is not None:
+            await on_subscribed()
+        yield AgentConfig(namespace='default', name='new', card={}, sync_operation=SyncOperation.UPSERT)
+        await asyncio.Event().wait()
+
+
+class CountingStore(DefaultAgentConfigStore):
+    reloads = 0
+    notifier: Notifier | None = None
+
+    async def reload(self) -> None:
+        # reload 时已经订阅，期间的变更不会丢失
+        assert self.notifier is None or self.notifier.subscribed
+        self.reloads += 1
+
+
+@pytest.mark.asyncio
+async def test_sync_agent_config_reconnects(monkeypatch):
+    from server.a2a2.apps.jsonrpc import runtime_fastapi_app
+    from server.a2a2.apps.jsonrpc.runtime_fastapi_app import RuntimeA2AFastAPIApplication
+
+    monkeypatch.setattr(runtime_fastapi_app.settings, 'NOTIFIER_RECONNECT_MIN_SECONDS', 0.01)
+    store = CountingStore(agent_configs=[])
+    notifier = FlakyNotifier()
+    store.notifier = notifier
+    server = RuntimeA2AFastAPIApplication.__new__(RuntimeA2AFastAPIApplication)
+    server.agent_config_store = store
+    server.notifier = notifier
+    server.card_cache = runtime_fastapi_app.AgentCardCache()
+
+    task = asyncio.create_task(server.sync_agent_config())
+    for _ in range(100):
+        await asyncio.sleep(0.01)
+        if notifier.calls == 2:
+            break
+    task.cancel()
+    # 非replayable notifier 重连后先全量reload
+    assert store.reloads == 1
+    assert (await store.get('default', 'new')).name == 'new'
+
+
+class ResyncNotifier(Notifier):
+    replayable = True
+
+    def __init__(self):
+        self.calls = 0
+
+    async def watch(self, on_subscribed=None):
+        self.calls += 1
+        if self.calls == 1:
+            raise NotifierResyncRequired('stream trimmed')
+        if on_subscribed is not None:
+            await on_subscribed()
+        # 之后每次连接都立即结束
+        return
+        yield
+
+
+class FailingReloadStore(CountingStore):
+    async def reload(self) -> None:
+        await super().reload()
+        if self.reloads == 1:
+            raise ConnectionError('config api unavailable')
+
+
+@pytest.mark.asyncio
+async def test_sync_agent_config_resync_backoff(monkeypatch):
+    from server.a2a2.apps.jsonrpc import runtime_fastapi_app
+    from server.a2a2.apps.jsonrpc.runtime_fastapi_app import RuntimeA2AFastAPIApplication
+
+    monkeypatch.setattr(runtime_fastapi_app.settings, 'NOTIFIER_RECONNECT_MIN_SECONDS', 0.01)
+    monkeypatch.setattr(runtime_fastapi_app.settings, 'NOTIFIER_RECONNECT_MAX_SECONDS', 0.05)
+    store = FailingReloadStore(agent_configs=[])
+    notifier = ResyncNotifier()
+    server = RuntimeA2AFastAPIApplication.__new__(RuntimeA2AFastAPIApplication)
+    server.agent_config_store = store
+    server.notifier = notifier
+    server.card_cache = runtime_fastapi_app.AgentCardCache()
+
+    task = asyncio.create_task(server.sync_agent_config())
+    await asyncio.sleep(0.3)
+    # reload 失败后退避重试，监听协程不退出
+    assert not task.done()
+    assert store.reloads == 2
+    # watch 正常结束后同样退避重连，而不是空转
+    assert 2 < notifier.calls < 30
+    task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_redis_stream_notifier_replays_missed_changes():
+    fakeredis = pytest.importorskip('fakeredis')
+    from server.notifier.redis_stream import RedisStreamNotifier
+
+    config = RedisConfig(
+        cluster_type='single', address='localhost:6379', db=0, username='', password='', master_name='',
+        timeout=1, use_ssl=False,
+    )
+    notifier = RedisStreamNotifier(config, 'updates', consumer_name='pod-1', block_ms=10)
+    notifier.client = fakeredis.FakeAsyncRedis()
+
+    async def next_config(watch):
+        return await asyncio.wait_for(anext(watch), 1)
+
+    watch = notifier.watch()
+    pending = asyncio.create_task(next_config(watch))
+    await asyncio.sleep(0.05)
+    await notifier.publish(AgentConfig(namespace='default', name='a', card={}, sync_operation=SyncOperation.UPSERT))
+    assert (await pending).name == 'a'
+    await watch.aclose()
+
+    # 断开期间发布的变更在重新watch 时重放；未确认处理完成的 a 会再投递一次（at-least-once）
+    await notifier.publish(AgentConfig(namespace='default', name='b', card={}, sync_operation=SyncOperation.UPSERT))
+    watch = notifier.watch()
+    assert (await next_config(watch)).name == 'a'
+    assert (await next_config(watch)).name == 'b'
+    await watch.aclose()
+    # offset 带有效期，旧副本的offset 不会无限累积
+    assert 0 < await notifier.client.ttl(notifier.offset_key) <= notifier.offset_ttl
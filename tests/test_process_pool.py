@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from a2a.server.agent_execution import AgentExecutor, RequestContext
+from a2a.server.events import EventQueue
+from a2a.server.tasks import TaskUpdater
+from a2a.types import Message, MessageSendParams, Part, Role, TaskState, TextPart
+
+from server.common.model import ProcessIsolation
+from server.loader.process_pool import ProcessPoolAgentExecutor
+
+
+class SleepExecutor(AgentExecutor):
+    """在worker 进程中阻塞执行，父进程取消后只能通过停止worker 中止。"""
+
+    async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
+        import time
+
+        await TaskUpdater(event_queue, context.task_id, context.context_id).update_status(TaskState.working)
+        time.sleep(60)
+
+    async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
+        pass
+
+
+def _context(task_id: str) -> RequestContext:
+    message = Message(role=Role.user, parts=[Part(root=TextPart(text='hi'))], message_id=f'm-{task_id}')
+    return RequestContext(request=MessageSendParams(message=message), task_id=task_id, context_id='c')
+
+
+async def _drain(event_queue: EventQueue) -> list:
+    events = []
+    while not event_queue.queue.empty():
+        events.append(await event_queue.dequeue_event())
+    return events
+
+
+@pytest.mark.asyncio
+async def test_process_pool_executor():
+    executor = ProcessPoolAgentExecutor(
+        'agent.travel.travel_executor:TravelExecutor',
+        ProcessIsolation(workers=2, max_tasks_per_worker=2),
+    )
+    try:
+        queues = [EventQueue() for _ in range(5)]
+        await asyncio.gather(*(executor.execute(_context(f't{i}'), queue) for i, queue in enumerate(queues)))
+        for i, queue in enumerate(queues):
+            events = await _drain(queue)
+            assert [event.status.state for event in events] == [TaskState.working] * 2 + [TaskState.completed]
+            assert events[0].task_id == f't{i}'
+        # 达到 max_tasks_per_worker 的worker 已被回收
+        assert len(executor._workers) <= 2
+
+        await executor.cancel(_context('t0'), EventQueue())
+    finally:
+        await executor.close()
+    assert not executor._workers
+
+
+@pytest.mark.asyncio
+async def test_cancelled_worker_is_replaced():
+    executor = ProcessPoolAgentExecutor('test_process_pool:SleepExecutor', ProcessIsolation(workers=1))
+    try:
+        queue = EventQueue()
+        execution = asyncio.create_task(executor.execute(_context('t1'), queue))
+        await asyncio.wait_for(queue.dequeue_event(), 30)
+        worker = executor._running['t1']
+        execution.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await execution
+        # 仍在执行的worker 不放回进程池，超过等待时间后被kill
+        assert worker not in executor._workers
+        await asyncio.gather(*executor._stopping)
+        assert not worker.process.is_alive()
+
+        # 下一次执行使用新的worker
+        execution = asyncio.create_task(executor.execute(_context('t2'), EventQueue()))
+        await asyncio.sleep(0.1)
+        while 't2' not in executor._running:
+            await asyncio.sleep(0.05)
+        assert executor._running['t2'] is not worker
+        execution.cancel()
+        await asyncio.gather(execution, return_exceptions=True)
+    finally:
+        await executor.close()
@@ -0,0 +1,74 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from fastapi import FastAPI
+
+from server.a2a2.apps.jsonrpc.profiling_admin import ProfilingAdmin
+from server.metrics.runtime import LOOP_BLOCKS
+from server.profiling.attribution import bind_agent
+from server.profiling.loop_monitor import LoopMonitor
+from server.profiling.sampler import IDLE, StackSampler
+
+
+def busy_agent_work(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+async def _blocking_agent(seconds: float) -> None:
+    bind_agent('default/hot')
+    await asyncio.sleep(0)
+    busy_agent_work(seconds)
+
+
+@pytest.mark.asyncio
+async def test_stack_sampler_attributes_agent():
+    sampler = StackSampler(asyncio.get_running_loop(), interval=0.005)
+    sampler.start()
+    await asyncio.sleep(0.05)
+    await asyncio.create_task(_blocking_agent(0.2))
+    await asyncio.to_thread(sampler.stop)
+
+    hot = sum(count for stack, count in sampler.counts.items()
+              if stack.startswith('default/hot;') and 'busy_agent_work' in stack)
+    assert hot >= 10
+    assert sampler.counts[IDLE] > 0
+    assert sum(sampler.counts.values()) == sampler.samples
+
+
+@pytest.mark.asyncio
+async def test_loop_monitor_reports_owning_agent():
+    before = LOOP_BLOCKS.get('default/hot')
+    monitor = LoopMonitor(threshold=0.05)
+    monitor.start()
+    await asyncio.sleep(0.05)
+    await asyncio.create_task(_blocking_agent(0.3))
+    await asyncio.sleep(0.1)
+    await monitor.stop()
+    assert LOOP_BLOCKS.get('default/hot') == before + 1
+
+
+@pytest.mark.asyncio
+async def test_profiling_admin():
+    app = FastAPI()
+    ProfilingAdmin('secret', max_seconds=1).add_routes_to_app(app)
+    headers = {'Authorization': 'Bearer secret'}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+        response = await client.get('/admin/profile/cpu', params={'seconds': 0.05})
+        assert response.status_code == 401
+        response = await client.get('/admin/profile/cpu', params={'seconds': 5}, headers=headers)
+        assert response.status_code == 400
+
+        response = await client.get('/admin/profile/cpu', params={'seconds': 0.1}, headers=headers)
+        assert response.status_code == 200
+        assert int(response.headers['X-Profile-Samples']) > 0
+        for line in response.text.splitlines():
+            stack, _, count = line.rpartition(' ')
+            assert stack
+            assert int(count) > 0
+
+        response = await client.get('/admin/profile/memory', params={'seconds': 0.05}, headers=headers)
+        assert response.status_code == 200
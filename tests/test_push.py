@@ -0,0 +1,133 @@
+import asyncio
+import json
+import os
+import time
+
+import fakeredis
+import httpx
+import pytest
+
+from a2a.server.tasks import InMemoryPushNotificationConfigStore
+from a2a.types import PushNotificationConfig, Task, TaskState, TaskStatus
+
+from server.push.base import PushDelivery
+from server.push.dispatcher import PushDispatcher
+from server.push.memory import LocalRetryQueue
+from server.push.redis import RedisRetryQueue
+
+
+class _MockDispatcher(PushDispatcher):
+    """所有目标地址的请求交给 handler 处理。"""
+
+    def __init__(self, handler, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._clients['mock'] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    def _client(self, url: str) -> httpx.AsyncClient:
+        return self._clients['mock']
+
+
+def _task(state: TaskState) -> Task:
+    return Task(id='t1', context_id='ctx', status=TaskStatus(state=state))
+
+
+@pytest.mark.asyncio
+async def test_push_coalesce_and_retry(tmp_path):
+    config_store = InMemoryPushNotificationConfigStore()
+    await config_store.set_info('t1', PushNotificationConfig(url='http://hook/t1', token='secret'))
+    received = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.05)
+        received.append((request.headers['X-A2A-Notification-Token'], json.loads(request.content)['status']['state']))
+        # 第一次推送失败，之后从重试队列重试
+        return httpx.Response(503 if len(received) == 1 else 200)
+
+    retry_path = str(tmp_path / 'retry.json')
+    dispatcher = _MockDispatcher(
+        handler, config_store=config_store, retry_queue=LocalRetryQueue(retry_path),
+        coalesce_window=0.05, retry_base=0.01, retry_interval=0.01,
+    )
+    start = time.monotonic()
+    for state in (TaskState.submitted, TaskState.working, TaskState.completed):
+        await dispatcher.send_notification(_task(state))
+    # 投递在后台进行，不阻塞调用方
+    assert time.monotonic() - start < 0.05
+    await asyncio.sleep(0.5)
+    assert received == [('secret', 'completed'), ('secret', 'completed')]
+    assert len(dispatcher.retry_queue) == 0
+    await dispatcher.close()
+
+
+@pytest.mark.asyncio
+async def test_retry_queue(tmp_path):
+    now = time.time()
+    due = PushDelivery(task_id='t1', url='http://hook/a', payload='{}', created_at=now)
+    later = PushDelivery(task_id='t1', url='http://hook/b', payload='{}', created_at=now)
+
+    path = str(tmp_path / 'retry.json')
+    for queue in (LocalRetryQueue(path), RedisRetryQueue(fakeredis.FakeAsyncRedis())):
+        await queue.push(later, now + 60)
+        await queue.push(due, now)
+        if isinstance(queue, LocalRetryQueue):
+            # 文件中包含token，只有当前用户可读写
+            assert os.stat(path).st_mode & 0o777 == 0o600
+            # 重启后从文件恢复
+            queue = LocalRetryQueue(path)
+        assert [d.url for d in await queue.pop_due(now, 10)] == ['http://hook/a']
+        assert await queue.pop_due(now, 10) == []
+        assert await queue.size() == 1
+
+        # 同一task 的同一地址只保留最新的推送
+        newer = later.model_copy(update={'id': 'newer', 'payload': '{"newer": true}', 'created_at': now + 1})
+        await queue.push(newer, now)
+        await queue.push(later, now)
+        assert [d.payload for d in await queue.pop_due(now, 10)] == ['{"newer": true}']
+        # 更新的推送投递成功后删除旧的重试
+        await queue.push(later, now)
+        await queue.discard(newer)
+        assert await queue.size() == 0
+
+
+@pytest.mark.asyncio
+async def test_stale_retry_and_allowed_hosts():
+    received = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        received.append((str(request.url), request.content))
+        return httpx.Response(200)
+
+    config_store = InMemoryPushNotificationConfigStore()
+    dispatcher = _MockDispatcher(
+        handler, config_store=config_store, coalesce_window=0, allowed_hosts=['hook', '.example.com'],
+    )
+    now = time.time()
+    old = PushDelivery(task_id='t1', url='http://hook/t1', payload='old', created_at=now)
+    new = PushDelivery(task_id='t1', url='http://hook/t1', payload='new', created_at=now + 1)
+    await dispatcher._deliver(new)
+    # 更新的状态已经投递，旧状态的重试被丢弃
+    await dispatcher._deliver(old)
+    assert received == [('http://hook/t1', b'new')]
+
+    received.clear()
+    for url in ('http://a.example.com/t1', 'http://example.com/t1', 'http://169.254.169.254/t1'):
+        await dispatcher._deliver(PushDelivery(task_id='t1', url=url, payload='{}', created_at=now))
+    assert [url for url, _ in received] == ['http://a.example.com/t1', 'http://example.com/t1']
+    assert await dispatcher.retry_queue.size() == 0
+    await dispatcher.close()
+
+
+@pytest.mark.asyncio
+async def test_evicted_client_closed_after_requests():
+    dispatcher = PushDispatcher(InMemoryPushNotificationConfigStore(), max_hosts=1)
+    first = dispatcher._client('http://a/t1')
+    # 模拟进行中的请求
+    dispatcher._requests[first] = 1
+    dispatcher._client('http://b/t1')
+    await asyncio.sleep(0.01)
+    # 被淘汰的连接池在请求完成前不关闭
+    assert not first.is_closed
+    dispatcher._release_client(first)
+    await asyncio.sleep(0.01)
+    assert first.is_closed
+    await dispatcher.close()
@@ -0,0 +1,72 @@
+import fakeredis
+import httpx
+import pytest
+
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import InMemoryTaskStore
+
+from main import init_agent_config_store, init_agent_loader
+from server.a2a2.agent_execution.runtime_agent_executor import RuntimeAgentExecutor
+from server.a2a2.apps.jsonrpc.runtime_fastapi_app import RuntimeA2AFastAPIApplication
+from server.common.model import RateLimit
+from server.rate_limiter.memory import LocalRateLimiter
+from server.rate_limiter.redis import RedisRateLimiter
+
+
+@pytest.mark.asyncio
+async def test_local_rate_limiter():
+    limiter = LocalRateLimiter()
+    limit = RateLimit(rate=1, burst=2)
+    assert await limiter.acquire('a', limit) == 0
+    assert await limiter.acquire('a', limit) == 0
+    assert 0 < await limiter.acquire('a', limit) <= 1
+    assert await limiter.acquire('b', limit) == 0
+
+
+@pytest.mark.asyncio
+async def test_redis_rate_limiter_shares_bucket():
+    client = fakeredis.FakeAsyncRedis()
+    limit = RateLimit(rate=0.1, burst=4)
+    # 两个副本共享同一个桶，预取的令牌在本地消费
+    replicas = [RedisRateLimiter(client, prefetch=2), RedisRateLimiter(client, prefetch=2)]
+    results = [await limiter.acquire('a', limit) for limiter in replicas for _ in range(2)]
+    assert results == [0, 0, 0, 0]
+    assert await replicas[0].acquire('a', limit) > 0
+    assert await replicas[1].acquire('a', limit) > 0
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_only_new_executions():
+    agent_config_store = init_agent_config_store()
+    agent_config = (await agent_config_store.get('default', 'travel')).model_copy(
+        update={'rate_limit': RateLimit(rate=0.01, burst=1)},
+    )
+    await agent_config_store.upsert(agent_config)
+    server = RuntimeA2AFastAPIApplication(
+        agent_config_store=agent_config_store,
+        notifier=None,
+        agent_card=agent_config.get_card(),
+        http_handler=DefaultRequestHandler(
+            agent_executor=RuntimeAgentExecutor(init_agent_loader()),
+            task_store=InMemoryTaskStore(),
+        ),
+        rate_limiter=LocalRateLimiter(),
+    )
+
+    def request(method: str, params: dict) -> dict:
+        return {'jsonrpc': '2.0', 'id': '1', 'method': method, 'params': params}
+
+    send = request('message/send', {
+        'message': {'role': 'user', 'parts': [{'kind': 'text', 'text': 'hi'}], 'messageId': 'm1'},
+    })
+    transport = httpx.ASGITransport(app=server.build())
+    async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+        response = await client.post('/default/travel/', json=send)
+        task_id = response.json()['result']['id']
+        response = await client.post('/default/travel/', json=send)
+        assert response.status_code == 429
+        # 限流只针对新的执行，查询和取消已有task 不受影响
+        for method in ('tasks/get', 'tasks/cancel'):
+            response = await client.post('/default/travel/', json=request(method, {'id': task_id}))
+            assert response.status_code == 200
+            assert response.json().get('error', {}).get('code') != -32030
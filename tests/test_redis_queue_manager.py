@@ -0,0 +1,63 @@
+import asyncio
+
+import fakeredis
+import pytest
+
+from a2a.server.events import EventQueue
+from a2a.types import TaskState, TaskStatus, TaskStatusUpdateEvent
+
+from server.queue_manager.redis import RedisStreamQueueManager
+
+
+def _event(state: TaskState) -> TaskStatusUpdateEvent:
+    return TaskStatusUpdateEvent(
+        task_id='t1', context_id='ctx', status=TaskStatus(state=state), final=state == TaskState.completed,
+    )
+
+
+@pytest.mark.asyncio
+async def test_tap_across_replicas_and_close():
+    client = fakeredis.FakeAsyncRedis()
+    producer, consumer = (RedisStreamQueueManager(client, key_prefix='test', block_ms=50) for _ in range(2))
+    # 没有生产者的task 无法tap
+    assert await consumer.tap('t1') is None
+
+    queue = await producer.create_or_tap('t1')
+    await queue.enqueue_event(_event(TaskState.submitted))
+    remote = await consumer.tap('t1')
+    assert remote is not None
+    # 只转发tap 之后的事件
+    await queue.enqueue_event(_event(TaskState.working))
+    await queue.enqueue_event(_event(TaskState.completed))
+    # 本地消费者取完事件后生产者才能关闭队列
+    for _ in range(3):
+        await queue.dequeue_event()
+        queue.task_done()
+    await asyncio.wait_for(producer.close('t1'), 1)
+    assert not await client.exists('test:producer:t1')
+
+    events = []
+    for _ in range(2):
+        events.append(await asyncio.wait_for(remote.dequeue_event(), 1))
+        remote.task_done()
+    assert [event.status.state for event in events] == [TaskState.working, TaskState.completed]
+    # 收到生产者的关闭标记后队列随之关闭
+    for _ in range(20):
+        if remote.is_closed():
+            break
+        await asyncio.sleep(0.05)
+    assert remote.is_closed()
+
+    # 关闭manager 时停止心跳及读取协程
+    await producer.create_or_tap('t2')
+    reader = await consumer.tap('t2')
+    heartbeat = producer._heartbeat_task
+    await producer.shutdown()
+    await consumer.shutdown()
+    assert heartbeat.cancelled()
+    assert not consumer._readers
+    assert reader.is_closed()
+
+    # 不是由 create_or_tap 创建的队列不会写入stream，拒绝
+    with pytest.raises(TypeError):
+        await producer.add('t3', EventQueue())
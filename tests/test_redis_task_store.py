@@ -0,0 +1,39 @@
+import fakeredis
+import pytest
+
+from a2a.types import Artifact, Message, Part, Role, Task, TaskState, TaskStatus, TextPart
+
+from server.task_store.redis import RedisTaskStore
+
+
+def _task(state: TaskState) -> Task:
+    return Task(
+        id='t1',
+        context_id='ctx',
+        status=TaskStatus(state=state),
+        history=[Message(role=Role.user, message_id='m1', parts=[Part(root=TextPart(text='hi'))])],
+        artifacts=[Artifact(artifact_id='a1', parts=[Part(root=TextPart(text='result'))])],
+        metadata={'k': 'v'},
+    )
+
+
+@pytest.mark.asyncio
+async def test_save_get_and_ttl():
+    client = fakeredis.FakeAsyncRedis()
+    store = RedisTaskStore(client, key_prefix='test', terminal_ttl=60)
+    assert await store.get('t1') is None
+
+    task = _task(TaskState.working)
+    await store.save(task)
+    assert await store.get('t1') == task
+    # 非终态task 不过期
+    assert await client.ttl('test:task:t1') == -1
+
+    await store.save(_task(TaskState.completed))
+    assert (await store.get('t1')).status.state == TaskState.completed
+    assert 0 < await client.ttl('test:task:t1') <= 60
+
+    # 另一个副本读取到同一task
+    assert (await RedisTaskStore(client, key_prefix='test').get('t1')).status.state == TaskState.completed
+    await store.delete('t1')
+    assert await store.get('t1') is None
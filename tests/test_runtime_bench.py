@@ -0,0 +1,21 @@
+import os
+
+import pytest
+
+from tests.benchmark.runtime_bench import Scenario, compare, load_baseline, run
+
+# 定时任务中运行，更换机器后需要重新生成基线：
+# python -m tests.benchmark.runtime_bench --scenario asgi-smoke --duration 2 --concurrency 10 --agents 3 --save-baseline
+SCENARIO = 'asgi-smoke'
+
+
+@pytest.mark.scheduled
+@pytest.mark.asyncio
+async def test_runtime_benchmark_against_baseline():
+    baseline = load_baseline(SCENARIO)
+    assert baseline is not None, f'no baseline for {SCENARIO}'
+    result = await run(Scenario(**baseline['scenario']))
+    assert result['errors'] == 0
+    assert set(result['operations']) == {'card', 'send', 'stream', 'get'}
+    tolerance = float(os.environ.get('A2A_BENCH_TOLERANCE', '1.0'))
+    assert compare(result, baseline, tolerance) == []
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from server.utils.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_leader_cancel_does_not_cancel_followers():
+    flight: SingleFlight[int] = SingleFlight()
+    calls = []
+
+    async def fn() -> int:
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 42
+
+    leader = asyncio.create_task(flight.do('k', fn))
+    await asyncio.sleep(0)
+    followers = [asyncio.create_task(flight.do('k', fn)) for _ in range(2)]
+    await asyncio.sleep(0)
+    leader.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert await asyncio.gather(*followers) == [42, 42]
+    assert len(calls) == 1
+    assert 'k' not in flight
+
+
+@pytest.mark.asyncio
+async def test_cancel_when_all_callers_cancelled():
+    flight: SingleFlight[int] = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def fn() -> int:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return 0
+
+    callers = [asyncio.create_task(flight.do('k', fn)) for _ in range(2)]
+    await asyncio.sleep(0)
+    for caller in callers:
+        caller.cancel()
+    await asyncio.gather(*callers, return_exceptions=True)
+    await asyncio.wait_for(cancelled.wait(), 1)
+    await asyncio.sleep(0)
+    assert 'k' not in flight
+
+    # 异常传递给所有调用方
+    async def fail() -> int:
+        await asyncio.sleep(0.01)
+        raise RuntimeError('boom')
+
+    results = await asyncio.gather(flight.do('k', fail), flight.do('k', fail), return_exceptions=True)
+    assert [type(result) for result in results] == [RuntimeError, RuntimeError]
@@ -0,0 +1,64 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from a2a.server.agent_execution import RequestContext
+from a2a.server.events import EventQueue
+from a2a.server.tasks import TaskUpdater
+from a2a.types import TaskState
+from a2a.utils import new_agent_text_message
+
+from server.a2a2.agent_execution.sync_agent_executor import BlockingProxy, SyncAgentExecutor
+from server.metrics.runtime import SYNC_EXECUTOR_CALLS
+
+
+class BlockingAgentExecutor(SyncAgentExecutor):
+    max_workers = 2
+
+    def execute_sync(self, context: RequestContext, event_queue: BlockingProxy) -> None:
+        time.sleep(0.1)
+        updater = self.blocking(TaskUpdater(event_queue.target, context.task_id, context.context_id))
+        updater.update_status(TaskState.working)
+        event_queue.enqueue_event(new_agent_text_message(threading.current_thread().name))
+
+
+@pytest.mark.asyncio
+async def test_sync_agent_executor_does_not_block_loop():
+    executor = BlockingAgentExecutor()
+    # 还没有执行过时没有可回调的事件循环
+    with pytest.raises(RuntimeError):
+        executor.blocking(EventQueue())
+    queues = [EventQueue() for _ in range(4)]
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticker = asyncio.create_task(tick())
+    runs = [asyncio.create_task(executor.execute(RequestContext(task_id=f't{i}', context_id='c'), queue))
+            for i, queue in enumerate(queues)]
+    await asyncio.sleep(0.05)
+    assert executor.stats() == {'max_workers': 2, 'active': 2, 'queued': 2, 'completed': 0}
+    samples = dict(SYNC_EXECUTOR_CALLS._callback())
+    assert samples[('BlockingAgentExecutor', 'active')] == 2
+    assert samples[('BlockingAgentExecutor', 'queued')] == 2
+    # 排队中的调用被取消后不再计入
+    runs[-1].cancel()
+    await asyncio.sleep(0)
+    assert executor.stats()['queued'] == 1
+    await asyncio.gather(*runs[:-1])
+    ticker.cancel()
+    # 两轮，每轮 0.1s，期间事件循环仍在运行
+    assert ticks >= 10
+    assert executor.stats() == {'max_workers': 2, 'active': 0, 'queued': 0, 'completed': 3}
+    for queue in queues[:-1]:
+        status = await queue.dequeue_event()
+        message = await queue.dequeue_event()
+        assert status.status.state == TaskState.working
+        assert message.parts[0].root.text.startswith('BlockingAgentExecutor')
+    executor.close()